@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from apps.catalog.models import Book, Copy, StorageLocation
+from apps.catalog.models import BibliographicRecord, Book, Copy, StorageLocation
 
 # Register your models here.
 admin.site.register(Book)
 admin.site.register(StorageLocation)
 admin.site.register(Copy)
+admin.site.register(BibliographicRecord)
@@ -1,17 +1,59 @@
 from django import forms
-from django.core.validators import RegexValidator
+
+from apps.catalog.models import Copy, StorageLocation
+from apps.catalog.utils import normalize_isbn
 
 
 # Create the form class.
 class ISBNCheckForm(forms.Form):
     isbn = forms.CharField(
         label="ISBN",
-        max_length=13,
-        help_text="13桁の数字をハイフンなしで入力してください。",
-        validators=[
-            RegexValidator(
-                regex=r"^\d{13}$",
-                message="ISBNは13桁の数字で入力してください（ハイフンなし）。",
+        max_length=17,
+        help_text="13桁（または10桁）のISBNを入力してください。ハイフンは省略できます。",
+    )
+
+    def clean_isbn(self):
+        isbn = normalize_isbn(self.cleaned_data["isbn"])
+        if isbn is None:
+            raise forms.ValidationError(
+                "ISBNが正しくありません。桁数とチェックディジットを確認してください。"
             )
-        ],
+        return isbn
+
+
+class CopyForm(forms.ModelForm):
+    # 同じ保存場所・状態の蔵書をまとめて登録する冊数
+    quantity = forms.IntegerField(
+        label="冊数",
+        min_value=1,
+        max_value=100,
+        initial=1,
+        required=False,
+        help_text="同じ保存場所・状態で登録する冊数（最大100冊）",
+    )
+
+    class Meta:
+        model = Copy
+        fields = ["location", "status"]
+
+    def clean_quantity(self):
+        return self.cleaned_data["quantity"] or 1
+
+
+class CopyManifestForm(forms.Form):
+    file = forms.FileField(
+        label="納品リスト",
+        help_text=(
+            "CSV（isbn, location, quantity 列）または NDJSON（.ndjson / .jsonl）"
+            "のファイルを指定してください。文字コードは UTF-8 です。"
+        ),
+    )
+    location = forms.ModelChoiceField(
+        queryset=StorageLocation.objects.all(),
+        required=False,
+        label="既定の保存場所",
+        help_text="location が空の行に使う保存場所",
+    )
+    status = forms.ChoiceField(
+        choices=Copy.Status.choices, initial=Copy.Status.AVAILABLE, label="状態"
     )
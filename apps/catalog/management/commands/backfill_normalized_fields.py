@@ -0,0 +1,44 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        "書籍の検索用に正規化した値（title_normalized など）と読みを設定し直します。"
+        "QuerySet.update などで Book を直接更新した後や、正規化の規則・読みの変換器を"
+        "変えた後に実行してください。続けて rebuild_book_ngrams も実行してください。"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="1回に更新する書籍の数"
+        )
+
+    def handle(self, *args, **options):
+        fields = [
+            *(f"{field}_normalized" for field in Book.NORMALIZED_FIELDS),
+            *(f"{field}_reading" for field in Book.READING_FIELDS),
+        ]
+        books = (
+            Book.objects.only(*Book.NORMALIZED_FIELDS, *fields)
+            .order_by("pk")
+            .iterator(chunk_size=options["batch_size"])
+        )
+        total = updated = 0
+        while batch := list(islice(books, options["batch_size"])):
+            changed = []
+            for book in batch:
+                before = [getattr(book, field) for field in fields]
+                book.normalize_search_fields()
+                if before != [getattr(book, field) for field in fields]:
+                    changed.append(book)
+            Book.objects.bulk_update(changed, fields)
+            total += len(batch)
+            updated += len(changed)
+            self.stdout.write(f"{total} 冊を処理しました")
+        self.stdout.write(
+            self.style.SUCCESS(f"完了: {total} 冊中 {updated} 冊を更新しました")
+        )
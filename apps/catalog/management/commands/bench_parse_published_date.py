@@ -0,0 +1,54 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.utils import parse_published_date, parse_published_dates
+
+
+def sample_published_dates(size, seed=0):
+    """
+    一括取り込みで見かける出版日の文字列（不正な値を含む）を size 件生成する。
+    """
+    rng = random.Random(seed)
+    generators = [
+        lambda: f"{rng.randint(1900, 2025)}",
+        lambda: f"{rng.randint(1900, 2025)}-{rng.randint(1, 12):02d}",
+        lambda: f"{rng.randint(1900, 2025)}-{rng.randint(1, 12):02d}"
+        f"-{rng.randint(1, 28):02d}",
+        lambda: f"{rng.randint(1900, 2025)}-02-30",
+        lambda: f"{rng.randint(1900, 2025)}.{rng.randint(1, 12)}",
+        lambda: "",
+        lambda: "不明",
+    ]
+    return [rng.choice(generators)() for _ in range(size)]
+
+
+class Command(BaseCommand):
+    help = (
+        "parse_published_date を1件ずつ呼ぶ場合と parse_published_dates で"
+        "まとめて解析する場合の速度を比較します。"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100_000, help="解析する件数")
+        parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+
+    def handle(self, *args, **options):
+        values = sample_published_dates(options["size"])
+
+        expected = [parse_published_date(value) for value in values]
+        if parse_published_dates(values) != expected:
+            raise CommandError("parse_published_dates の結果が一致しません。")
+
+        def best(fn):
+            return min(timeit.repeat(fn, number=1, repeat=options["repeat"]))
+
+        scalar = best(lambda: [parse_published_date(value) for value in values])
+        batch = best(lambda: parse_published_dates(values))
+
+        self.stdout.write(f"parse_published_date:  {scalar:.3f} 秒")
+        self.stdout.write(f"parse_published_dates: {batch:.3f} 秒")
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(values)} 件で {scalar / batch:.1f} 倍高速")
+        )
@@ -0,0 +1,215 @@
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from apps.catalog.models import Book, Copy, StorageLocation
+from apps.catalog.services.book_metadata_service import (
+    BookMetadataFetchError,
+    BookMetadataService,
+)
+from apps.catalog.signals import books_bulk_created
+from apps.catalog.utils import normalize_isbn
+
+
+class Command(BaseCommand):
+    help = (
+        "ISBN の一覧（CSV）から書籍と蔵書を一括登録します。"
+        "CSV には isbn 列が必要で、quantity（冊数）・location（保存場所名）列は任意です。"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="読み込む CSV ファイル")
+        parser.add_argument(
+            "--location",
+            help="location 列がない行に使う保存場所名",
+        )
+        parser.add_argument(
+            "--status",
+            default=Copy.Status.AVAILABLE,
+            choices=Copy.Status.values,
+            help="登録する蔵書の状態（既定: available）",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=8, help="書誌情報を並列取得するスレッド数"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="1トランザクションで処理する行数",
+        )
+        parser.add_argument(
+            "--state-file",
+            help="進捗を保存するファイル（既定: <csv_path>.progress.json）",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="進捗ファイルに記録された行の続きから再開する",
+        )
+
+    def handle(self, *args, **options):
+        csv_path = Path(options["csv_path"])
+        if not csv_path.exists():
+            raise CommandError(f"{csv_path} が見つかりません。")
+
+        state_path = Path(options["state_file"] or f"{csv_path}.progress.json")
+        start_row = 0
+        if options["resume"] and state_path.exists():
+            start_row = json.loads(state_path.read_text())["row"]
+            self.stdout.write(
+                f"{start_row} 行目まで処理済みのため、続きから再開します。"
+            )
+
+        self.status = options["status"]
+        self.default_location = None
+        if options["location"]:
+            try:
+                self.default_location = StorageLocation.objects.get(
+                    name=options["location"]
+                )
+            except StorageLocation.DoesNotExist:
+                raise CommandError(f"保存場所「{options['location']}」が存在しません。")
+        self.locations = {}
+
+        self.totals = {"books": 0, "copies": 0, "skipped": 0}
+        started = time.monotonic()
+
+        with open(csv_path, newline="", encoding="utf-8-sig") as f, ThreadPoolExecutor(
+            max_workers=options["workers"]
+        ) as executor:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "isbn" not in reader.fieldnames:
+                raise CommandError("CSV に isbn 列がありません。")
+
+            rows = enumerate(reader, start=1)
+            # 再開時は処理済みの行を読み飛ばす（ファイル全体は読み込まない）
+            for _ in islice(rows, start_row):
+                pass
+
+            while chunk := list(islice(rows, options["chunk_size"])):
+                self.import_chunk([row for _, row in chunk], executor)
+                last_row = chunk[-1][0]
+                state_path.write_text(json.dumps({"row": last_row}))
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{last_row} 行目まで処理しました "
+                    f"（書籍 {self.totals['books']} 件, {self._rate(elapsed)} 冊/秒）"
+                )
+
+        elapsed = time.monotonic() - started
+        state_path.unlink(missing_ok=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"完了: 書籍 {self.totals['books']} 件, 蔵書 {self.totals['copies']} 件を登録、"
+                f"{self.totals['skipped']} 行をスキップしました "
+                f"（{elapsed:.1f} 秒, {self._rate(elapsed)} 冊/秒）"
+            )
+        )
+
+    def import_chunk(self, rows, executor):
+        entries = []
+        for row in rows:
+            isbn = normalize_isbn(row.get("isbn", ""))
+            location = self.resolve_location(row.get("location"))
+            try:
+                quantity = int(row.get("quantity") or 1)
+            except ValueError:
+                quantity = 0
+            if isbn is None or location is None or quantity < 1:
+                self.skip(row, "ISBN・保存場所・冊数のいずれかが不正です")
+                continue
+            entries.append((isbn, location, quantity))
+
+        book_ids = dict(
+            Book.objects.filter(isbn__in={isbn for isbn, _, _ in entries}).values_list(
+                "isbn", "id"
+            )
+        )
+
+        # 未登録の ISBN だけ、書誌情報をスレッドプールで並列に取得する
+        new_isbns = [
+            isbn
+            for isbn in dict.fromkeys(isbn for isbn, _, _ in entries)
+            if isbn not in book_ids
+        ]
+        new_books = [
+            book
+            for book in map(
+                self.build_book, executor.map(self.fetch_metadata, new_isbns)
+            )
+            if book is not None
+        ]
+
+        # bulk_create では save が呼ばれないため、検索用の値をここで設定する
+        for book in new_books:
+            book.normalize_search_fields()
+
+        with transaction.atomic():
+            Book.objects.bulk_create(new_books)
+            books_bulk_created.send(sender=Book, books=new_books)
+            book_ids.update((book.isbn, book.id) for book in new_books)
+
+            copies = []
+            for isbn, location, quantity in entries:
+                if isbn not in book_ids:
+                    self.skip({"isbn": isbn}, "書誌情報を取得できませんでした")
+                    continue
+                copies.extend(
+                    Copy(book_id=book_ids[isbn], location=location, status=self.status)
+                    for _ in range(quantity)
+                )
+            Copy.objects.bulk_create(copies)
+
+        self.totals["books"] += len(new_books)
+        self.totals["copies"] += len(copies)
+
+    def fetch_metadata(self, isbn):
+        try:
+            return BookMetadataService.lookup(isbn)
+        except BookMetadataFetchError:
+            return None
+        finally:
+            # ミラーの参照で開いたワーカースレッドの DB 接続を閉じる
+            connection.close()
+
+    def build_book(self, metadata):
+        """
+        取得元の書誌情報から Book を組み立てる。bulk_create ではバリデーションが
+        行われないため、load_bibliographic_dump と同じく文字列を列の長さに
+        切り詰め、タイトルのないものは登録しない（その行は後でスキップされる）。
+        """
+        if not metadata or not str(metadata.get("title") or "").strip():
+            return None
+
+        values = {}
+        for name, value in metadata.items():
+            field = Book._meta.get_field(name)
+            if isinstance(field, models.URLField):
+                # 途中で切った URL は使えないため、長すぎるものは空にする
+                value = value if len(value or "") <= field.max_length else ""
+            elif isinstance(field, models.CharField) and field.max_length:
+                value = str(value or "").strip()[: field.max_length]
+            values[name] = value
+        return Book(**values)
+
+    def resolve_location(self, name):
+        if not name:
+            return self.default_location
+        if name not in self.locations:
+            self.locations[name] = StorageLocation.objects.filter(name=name).first()
+        return self.locations[name]
+
+    def skip(self, row, reason):
+        self.totals["skipped"] += 1
+        self.stderr.write(f"スキップ: {row.get('isbn', '')} - {reason}")
+
+    def _rate(self, elapsed):
+        return f"{self.totals['books'] / elapsed:.1f}" if elapsed > 0 else "-"
@@ -0,0 +1,131 @@
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.models import BibliographicRecord
+from apps.catalog.services.bibliographic_dump import (
+    iter_jsonl_records,
+    iter_marc_records,
+)
+from apps.catalog.utils import normalize_isbn, parse_published_dates
+
+FORMATS_BY_SUFFIX = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".mrc": "marc",
+    ".marc": "marc",
+}
+
+UPDATE_FIELDS = [
+    "title",
+    "author",
+    "publisher",
+    "published_date",
+    "published_date_precision",
+    "image_url",
+    "description",
+    "source",
+    "updated_at",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "書誌データの一括ダンプ（JSONL または MARC21）を読み込み、"
+        "書誌データのミラー（BibliographicRecord）に登録・更新します。"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="読み込むダンプファイル")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "marc"],
+            help="ダンプの形式（省略時は拡張子から判定）",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="1回の upsert で書き込む件数"
+        )
+        parser.add_argument("--source", default="", help="取り込み元の名前")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} が見つかりません。")
+
+        dump_format = options["format"] or FORMATS_BY_SUFFIX.get(path.suffix.lower())
+        if dump_format is None:
+            raise CommandError("--format で jsonl か marc を指定してください。")
+
+        self.source = options["source"][:50]
+        self.skipped = 0
+        loaded = 0
+        started = time.monotonic()
+
+        if dump_format == "jsonl":
+            f = open(path, encoding="utf-8")
+            raw_records = iter_jsonl_records(f)
+        else:
+            f = open(path, "rb")
+            raw_records = iter_marc_records(f)
+
+        with f:
+            records = filter(None, map(self.clean, raw_records))
+            while batch := list(islice(records, options["batch_size"])):
+                loaded += self.upsert(batch)
+                self.stdout.write(f"{loaded} 件を登録しました")
+
+        elapsed = time.monotonic() - started
+        rate = f"{loaded / elapsed:.0f}" if elapsed > 0 else "-"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"完了: {loaded} 件を登録・更新、{self.skipped} 件をスキップしました "
+                f"（{elapsed:.1f} 秒, {rate} 件/秒）"
+            )
+        )
+
+    def clean(self, data):
+        isbn = normalize_isbn(str(data.get("isbn") or ""))
+        title = str(data.get("title") or "").strip()
+        if isbn is None or not title:
+            self.skipped += 1
+            return None
+
+        author = data.get("author") or ""
+        if isinstance(author, list):
+            author = ", ".join(author)
+        image_url = str(data.get("image_url") or "")
+        return {
+            "isbn": isbn,
+            "title": title[:255],
+            "author": str(author)[:255],
+            "publisher": str(data.get("publisher") or "")[:255],
+            # 出版日はバッチ単位で parse_published_dates にまとめて渡す
+            "published_date": str(data.get("published_date") or ""),
+            "image_url": image_url if len(image_url) <= 200 else "",
+            "description": str(data.get("description") or ""),
+        }
+
+    def upsert(self, batch):
+        # 同じ ISBN が1回の upsert に含まれるとエラーになるため、後のレコードを優先する
+        unique = list({row["isbn"]: row for row in batch}.values())
+        published_dates = parse_published_dates(
+            row.pop("published_date") for row in unique
+        )
+        records = [
+            BibliographicRecord(
+                **row,
+                published_date=published_date,
+                published_date_precision=precision,
+                source=self.source,
+            )
+            for row, (published_date, precision) in zip(unique, published_dates)
+        ]
+        BibliographicRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["isbn"],
+            update_fields=UPDATE_FIELDS,
+        )
+        return len(records)
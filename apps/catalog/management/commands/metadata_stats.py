@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.services.book_metadata_service import BookMetadataService
+from apps.catalog.services.metadata_providers import get_providers
+
+
+class Command(BaseCommand):
+    help = "書誌情報キャッシュのヒット数・ミス数と、取得元ごとの成功率・所要時間を表示します。"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="表示後にカウンターをリセットする"
+        )
+
+    def handle(self, *args, **options):
+        cache = BookMetadataService.cache
+        stats = cache.stats()
+        self.stdout.write(
+            f"cache hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={stats['hit_rate']:.1%}"
+        )
+
+        providers = [provider.name for provider in get_providers()]
+        for name in providers:
+            stats = cache.provider_stats(name)
+            self.stdout.write(
+                f"provider {name}: calls={stats['calls']} "
+                f"success_rate={stats['success_rate']:.1%} "
+                f"not_found={stats['not_found']} failure={stats['failure']} "
+                f"avg_latency={stats['avg_latency_ms']:.0f}ms"
+            )
+
+        if options["reset"]:
+            cache.reset_stats(providers)
+            self.stdout.write("カウンターをリセットしました。")
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.catalog.models import Book, Copy
+
+
+def actual_count(status):
+    """書籍ごとの、状態が status の蔵書の実際の数を返すサブクエリ"""
+    return Coalesce(
+        Subquery(
+            Copy.objects.filter(book=OuterRef("pk"), status=status)
+            .order_by()
+            .values("book")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "書籍の蔵書数のカウンター（available_copies / loaned_copies）を"
+        "実際の蔵書の状態と照合し、ずれている書籍を修復します。"
+        "QuerySet.update や QuerySet.delete で蔵書を直接変更した後に実行してください。"
+    )
+    # 1回の UPDATE で修復する書籍の数
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="ずれている書籍を表示するだけにする"
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Book.objects.annotate(
+                actual_available=Count(
+                    "copies", filter=Q(copies__status=Copy.Status.AVAILABLE)
+                ),
+                actual_loaned=Count(
+                    "copies", filter=Q(copies__status=Copy.Status.LOANED)
+                ),
+            )
+            .exclude(
+                available_copies=F("actual_available"),
+                loaned_copies=F("actual_loaned"),
+            )
+            .values_list("pk", "available_copies", "loaned_copies")
+            .order_by("pk")
+        )
+        for pk, available, loaned in drifted:
+            self.stdout.write(
+                f"book {pk}: available_copies={available} loaned_copies={loaned}"
+            )
+        if options["dry_run"] or not drifted:
+            self.stdout.write(f"ずれている書籍: {len(drifted)} 冊")
+            return
+
+        # 照合から修復までの間の貸出・返却を上書きしないよう、数え直しは UPDATE の中で行う
+        pks = [pk for pk, _, _ in drifted]
+        fixed = 0
+        for start in range(0, len(pks), self.batch_size):
+            fixed += Book.objects.filter(
+                pk__in=pks[start : start + self.batch_size]
+            ).update(
+                available_copies=actual_count(Copy.Status.AVAILABLE),
+                loaned_copies=actual_count(Copy.Status.LOANED),
+            )
+        self.stdout.write(self.style.SUCCESS(f"完了: {fixed} 冊を修復しました"))
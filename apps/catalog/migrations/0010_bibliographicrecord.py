@@ -0,0 +1,74 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_alter_book_isbn"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BibliographicRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "isbn",
+                    models.CharField(max_length=13, unique=True, verbose_name="ISBN"),
+                ),
+                ("title", models.CharField(max_length=255, verbose_name="タイトル")),
+                (
+                    "author",
+                    models.CharField(blank=True, max_length=255, verbose_name="著者"),
+                ),
+                (
+                    "publisher",
+                    models.CharField(blank=True, max_length=255, verbose_name="出版社"),
+                ),
+                (
+                    "published_date",
+                    models.DateField(blank=True, null=True, verbose_name="出版日"),
+                ),
+                (
+                    "published_date_precision",
+                    models.CharField(
+                        choices=[
+                            ("unknown", "不明"),
+                            ("year", "年"),
+                            ("month", "年月"),
+                            ("day", "年月日"),
+                        ],
+                        default="unknown",
+                        max_length=10,
+                        verbose_name="出版日の精度",
+                    ),
+                ),
+                ("image_url", models.URLField(blank=True, verbose_name="画像用リンク")),
+                ("description", models.TextField(blank=True, verbose_name="内容紹介")),
+                (
+                    "source",
+                    models.CharField(
+                        blank=True, max_length=50, verbose_name="取り込み元"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+            ],
+            options={
+                "verbose_name": "書誌データ",
+                "verbose_name_plural": "書誌データ（ミラー）",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_bibliographicrecord"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="cover_path",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="image_url から取得して保存した書影（縮小版）のパスの接頭辞",
+                max_length=255,
+                verbose_name="書影の保存先",
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:40
+
+import unicodedata
+
+from django.db import migrations, models
+
+NORMALIZED_FIELDS = ("title", "author", "publisher")
+
+# この時点の正規化の規則（apps.catalog.normalization）をここに固定しておく
+HIRAGANA_TO_KATAKANA = {
+    code: code + 0x60 for code in [*range(0x3041, 0x3097), 0x309D, 0x309E]
+}
+
+
+def normalize_search_text(value):
+    text = unicodedata.normalize("NFKC", value or "").casefold()
+    return " ".join(text.translate(HIRAGANA_TO_KATAKANA).split())
+
+
+def backfill_normalized_fields(apps, schema_editor):
+    Book = apps.get_model("catalog", "Book")
+    books = []
+    for book in Book.objects.only(*NORMALIZED_FIELDS).iterator(chunk_size=1000):
+        for field in NORMALIZED_FIELDS:
+            value = normalize_search_text(getattr(book, field))[:255]
+            setattr(book, f"{field}_normalized", value)
+        books.append(book)
+        if len(books) >= 1000:
+            Book.objects.bulk_update(
+                books, [f"{field}_normalized" for field in NORMALIZED_FIELDS]
+            )
+            books = []
+    Book.objects.bulk_update(
+        books, [f"{field}_normalized" for field in NORMALIZED_FIELDS]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_book_cover_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="author_normalized",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="著者（検索用）",
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="publisher_normalized",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="出版社（検索用）",
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="title_normalized",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="タイトル（検索用）",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["title_normalized"], name="catalog_boo_title_n_7819a1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["author_normalized"], name="catalog_boo_author__6a5e31_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["publisher_normalized"], name="catalog_boo_publish_7d80ae_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_fields, migrations.RunPython.noop),
+    ]
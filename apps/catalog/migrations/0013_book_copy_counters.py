@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTER_FIELDS = {"available": "available_copies", "loaned": "loaned_copies"}
+
+
+def backfill_copy_counters(apps, schema_editor):
+    Book = apps.get_model("catalog", "Book")
+    Copy = apps.get_model("catalog", "Copy")
+    for status, field in COUNTER_FIELDS.items():
+        counts = (
+            Copy.objects.filter(book=OuterRef("pk"), status=status)
+            .order_by()
+            .values("book")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        Book.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_book_normalized_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="available_copies",
+            field=models.PositiveIntegerField(
+                db_index=True,
+                default=0,
+                editable=False,
+                verbose_name="貸出可能な蔵書数",
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="loaned_copies",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="貸出中の蔵書数"
+            ),
+        ),
+        migrations.RunPython(backfill_copy_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0013_book_copy_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="available_copies",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="貸出可能な蔵書数"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["-available_copies", "id"], name="catalog_book_available_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                condition=models.Q(("available_copies__gt", 0)),
+                fields=["id"],
+                name="catalog_book_available_now_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0014_book_availability_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="author_reading",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="著者の読み（検索用）",
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="title_reading",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="タイトルの読み（検索用）",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["title_reading"], name="catalog_boo_title_r_643ad8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["author_reading"], name="catalog_boo_author__3f503a_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0015_book_reading_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="loan_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="貸出回数"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["title_normalized", "id"], name="catalog_book_title_sort_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["-published_date", "id"], name="catalog_book_newest_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["-loan_count", "id"], name="catalog_book_popular_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0016_book_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_boo_title_n_7819a1_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_boo_author__6a5e31_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_boo_publish_7d80ae_idx",
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0017_remove_book_normalized_btree_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_boo_title_r_643ad8_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_boo_author__3f503a_idx",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+import apps.core.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_remove_book_reading_btree_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="book",
+            name="catalog_book_newest_idx",
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=apps.core.indexes.NullsOrderingIndex(
+                models.OrderBy(
+                    models.F("published_date"), descending=True, nulls_last=True
+                ),
+                models.F("id"),
+                name="catalog_book_newest_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,14 @@
+from collections import Counter
+
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+
+from apps.catalog.normalization import normalize_search_text
+from apps.catalog.readings import get_reading_converter
+from apps.catalog.signals import copies_bulk_created
+from apps.core.indexes import NullsOrderingIndex
 
 
 # Create your models here.
@@ -57,6 +65,13 @@ class Book(models.Model):
         verbose_name="画像用リンク",
         help_text="書籍のカバー画像のURLを入力してください（任意）。",
     )
+    cover_path = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name="書影の保存先",
+        help_text="image_url から取得して保存した書影（縮小版）のパスの接頭辞",
+    )
     edition = models.PositiveIntegerField(
         verbose_name="版数",
         blank=True,
@@ -69,6 +84,77 @@ class Book(models.Model):
         help_text="本の概要や見どころなどを、利用者向けに簡単に説明してください（任意）。",
     )
 
+    # 検索用に正規化した値（normalize_search_text）。保存時に自動で設定する
+    title_normalized = models.CharField(
+        max_length=255, blank=True, editable=False, verbose_name="タイトル（検索用）"
+    )
+    author_normalized = models.CharField(
+        max_length=255, blank=True, editable=False, verbose_name="著者（検索用）"
+    )
+    publisher_normalized = models.CharField(
+        max_length=255, blank=True, editable=False, verbose_name="出版社（検索用）"
+    )
+    # 検索用の読み（CATALOG_READING_CONVERTER で求め、カタカナに正規化する）。
+    # 漢字のタイトル・著者を、ひらがな・カタカナの読みでも検索できるようにする
+    title_reading = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name="タイトルの読み（検索用）",
+    )
+    author_reading = models.CharField(
+        max_length=255, blank=True, editable=False, verbose_name="著者の読み（検索用）"
+    )
+
+    # 状態ごとの蔵書の数（Copy の保存・削除・bulk_create で更新する）。
+    # 検索結果の一覧で copies を集計せずに済むよう、非正規化して持つ
+    available_copies = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="貸出可能な蔵書数"
+    )
+    loaned_copies = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="貸出中の蔵書数"
+    )
+    # これまでの貸出回数（LoanService.loan_copy で F 式で増やす）。人気順の並べ替えに使う
+    loan_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="貸出回数"
+    )
+
+    # 正規化した値を持つフィールド
+    NORMALIZED_FIELDS = ("title", "author", "publisher")
+    # 読みを持つフィールド
+    READING_FIELDS = ("title", "author")
+
+    def normalize_search_fields(self):
+        """
+        検索用に正規化した値と読みを設定する。bulk_create の前にも呼び出すこと。
+        """
+        for field in self.NORMALIZED_FIELDS:
+            value = normalize_search_text(getattr(self, field))[:255]
+            setattr(self, f"{field}_normalized", value)
+        converter = get_reading_converter()
+        for field in self.READING_FIELDS:
+            reading = converter.reading(getattr(self, field))
+            setattr(self, f"{field}_reading", normalize_search_text(reading)[:255])
+
+    def save(self, *args, **kwargs):
+        self.normalize_search_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                *(
+                    f"{field}_normalized"
+                    for field in self.NORMALIZED_FIELDS
+                    if field in update_fields
+                ),
+                *(
+                    f"{field}_reading"
+                    for field in self.READING_FIELDS
+                    if field in update_fields
+                ),
+            }
+        super().save(*args, **kwargs)
+
     def clean(self):
         # 出版日がNoneの場合に精度が不明でない場合はエラー
         if (
@@ -95,6 +181,29 @@ class Book(models.Model):
     class Meta:
         verbose_name = "本"
         verbose_name_plural = "本マスター"
+        indexes = [
+            # 書籍検索の「貸出可能な蔵書が多い順」の並べ替え用
+            models.Index(
+                fields=["-available_copies", "id"], name="catalog_book_available_idx"
+            ),
+            # 書籍検索の「貸出可能な本のみ」の絞り込み用（貸出可能な書籍だけの部分索引）
+            models.Index(
+                fields=["id"],
+                condition=models.Q(available_copies__gt=0),
+                name="catalog_book_available_now_idx",
+            ),
+            # 書籍検索の「タイトル順」「新しい順」「よく借りられている順」の並べ替え用。
+            # キーセットのページ分割の順序（NULL の出版日は末尾）と揃える
+            models.Index(
+                fields=["title_normalized", "id"], name="catalog_book_title_sort_idx"
+            ),
+            NullsOrderingIndex(
+                F("published_date").desc(nulls_last=True),
+                "id",
+                name="catalog_book_newest_idx",
+            ),
+            models.Index(fields=["-loan_count", "id"], name="catalog_book_popular_idx"),
+        ]
 
 
 class StorageLocation(models.Model):
@@ -108,12 +217,31 @@ class StorageLocation(models.Model):
         verbose_name_plural = "保存場所マスター"
 
 
+class CopyQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # save を経由しないため、Book の蔵書数のカウンターをここで更新する
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            Copy.update_book_counters(
+                (copy.book_id, copy.status, 1) for copy in created
+            )
+            copies_bulk_created.send(sender=Copy, copies=created)
+        return created
+
+
 class Copy(models.Model):
     class Status(models.TextChoices):
         AVAILABLE = "available", "貸出可能"
         LOANED = "loaned", "貸出中"
         DISCARDED = "discarded", "廃棄済み"
 
+    # 状態ごとに数を持つ Book のカウンター列
+    COUNTER_FIELDS = {
+        Status.AVAILABLE: "available_copies",
+        Status.LOANED: "loaned_copies",
+    }
+
     book = models.ForeignKey(
         Book, on_delete=models.CASCADE, related_name="copies", verbose_name="書籍"
     )
@@ -127,9 +255,107 @@ class Copy(models.Model):
     )
     registered_date = models.DateField(auto_now_add=True, verbose_name="登録日")
 
+    objects = CopyQuerySet.as_manager()
+
+    @classmethod
+    def update_book_counters(cls, changes):
+        """
+        Book の蔵書数のカウンターを F 式で増減する。
+
+        Args:
+            changes: (book_id, 状態, 増減数) のイテラブル
+        """
+        deltas = Counter()
+        for book_id, status, delta in changes:
+            if status in cls.COUNTER_FIELDS:
+                deltas[book_id, cls.COUNTER_FIELDS[status]] += delta
+
+        updates = {}
+        for (book_id, field), delta in deltas.items():
+            if delta:
+                updates.setdefault(book_id, {})[field] = F(field) + delta
+        for book_id, fields in updates.items():
+            Book.objects.filter(pk=book_id).update(**fields)
+
+    def _locked_state(self):
+        """保存済みの (book_id, 状態) を行ロックを取って読む。未保存なら None"""
+        if self.pk is None:
+            return None
+        return (
+            Copy.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("book_id", "status")
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        # 同じ蔵書を別のインスタンスで更新していても数がずれないよう、
+        # 変更前の状態はデータベースから読む
+        with transaction.atomic():
+            previous = self._locked_state()
+            super().save(*args, **kwargs)
+            changes = [(self.book_id, self.status, 1)]
+            if previous:
+                changes.append((*previous, -1))
+            Copy.update_book_counters(changes)
+
+    def delete(self, *args, **kwargs):
+        # QuerySet.delete ではカウンターは更新されない（reconcile_copy_counts で修復する）
+        with transaction.atomic():
+            previous = self._locked_state()
+            result = super().delete(*args, **kwargs)
+            if previous:
+                Copy.update_book_counters([(*previous, -1)])
+        return result
+
     def __str__(self):
         return f"{self.book} - {self.location.name} - {self.get_status_display()}"
 
     class Meta:
         verbose_name = "蔵書"
         verbose_name_plural = "蔵書"
+
+
+class BibliographicRecord(models.Model):
+    """
+    外部の書誌データ（JSONL や MARC の一括ダンプ）を取り込んだミラー。
+    書籍登録時は外部APIより先にこのテーブルを参照する。
+    """
+
+    isbn = models.CharField(max_length=13, unique=True, verbose_name="ISBN")
+    title = models.CharField(max_length=255, verbose_name="タイトル")
+    author = models.CharField(max_length=255, blank=True, verbose_name="著者")
+    publisher = models.CharField(max_length=255, blank=True, verbose_name="出版社")
+    published_date = models.DateField(blank=True, null=True, verbose_name="出版日")
+    published_date_precision = models.CharField(
+        max_length=10,
+        choices=Book.PublishedDatePrecision.choices,
+        default=Book.PublishedDatePrecision.UNKNOWN,
+        verbose_name="出版日の精度",
+    )
+    image_url = models.URLField(blank=True, verbose_name="画像用リンク")
+    description = models.TextField(blank=True, verbose_name="内容紹介")
+    source = models.CharField(max_length=50, blank=True, verbose_name="取り込み元")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
+
+    def to_metadata(self):
+        """
+        BookCreateView のフォーム初期値として使える dict を返す。
+        """
+        return {
+            "isbn": self.isbn,
+            "title": self.title,
+            "author": self.author,
+            "publisher": self.publisher,
+            "published_date": self.published_date,
+            "published_date_precision": self.published_date_precision,
+            "image_url": self.image_url,
+            "description": self.description,
+        }
+
+    def __str__(self):
+        return f"{self.title}（{self.isbn}）"
+
+    class Meta:
+        verbose_name = "書誌データ"
+        verbose_name_plural = "書誌データ（ミラー）"
@@ -0,0 +1,19 @@
+import unicodedata
+
+# ひらがな（ぁ〜ゖ, ゝ, ゞ）をカタカナに変換する表
+HIRAGANA_TO_KATAKANA = {
+    code: code + 0x60 for code in [*range(0x3041, 0x3097), 0x309D, 0x309E]
+}
+
+
+def normalize_search_text(value):
+    """
+    検索で表記の揺れを吸収するため、文字列を正規化する。
+
+    - NFKC 正規化（全角英数字・記号を半角に、半角カタカナを全角に）
+    - 大文字・小文字の区別をなくす（casefold）
+    - ひらがなをカタカナに揃える
+    - 連続する空白を1つにまとめ、前後の空白を除く
+    """
+    text = unicodedata.normalize("NFKC", value or "").casefold()
+    return " ".join(text.translate(HIRAGANA_TO_KATAKANA).split())
@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class ReadingConverter:
+    """
+    書籍のタイトル・著者の読み（よみがな）を求める変換器。
+
+    reading は text の読みをひらがなかカタカナで返す（検索用に保存するときに
+    normalize_search_text でカタカナに揃える）。読みを求められなければ空文字を返す。
+    この基底クラスは変換器が使えない環境用で、常に空文字を返す。
+    available は読みを求められる変換器かどうかで、検索画面の案内の表示に使う。
+    """
+
+    available = False
+
+    def reading(self, text):
+        return ""
+
+
+class PykakasiReadingConverter(ReadingConverter):
+    """
+    pykakasi（辞書を同梱した、外部サービスを使わない変換器）で漢字の読みを求める。
+    """
+
+    available = True
+
+    def __init__(self):
+        try:
+            import pykakasi
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "読みの変換に pykakasi を使うには、pip install pykakasi を実行してください。"
+            ) from exc
+        self.kakasi = pykakasi.kakasi()
+
+    def reading(self, text):
+        # 空白で区切った語ごとに変換し、語の区切りを残す
+        return " ".join(
+            "".join(item["kana"] for item in self.kakasi.convert(word))
+            for word in text.split()
+        )
+
+
+@lru_cache
+def load_reading_converter(path):
+    if path:
+        return import_string(path)()
+    # 未設定の場合は、pykakasi がインストールされていれば使う
+    try:
+        return PykakasiReadingConverter()
+    except ImproperlyConfigured:
+        return ReadingConverter()
+
+
+def get_reading_converter():
+    """
+    settings.CATALOG_READING_CONVERTER に設定された読みの変換器を返す。
+    変換器の作成（辞書の読み込み）は重いため、設定ごとに1回だけ作成する。
+    """
+    return load_reading_converter(settings.CATALOG_READING_CONVERTER)
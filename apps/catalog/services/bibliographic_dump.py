@@ -0,0 +1,90 @@
+import json
+import re
+from collections import defaultdict
+
+# MARC（ISO 2709）の区切り文字
+RECORD_TERMINATOR = b"\x1d"
+FIELD_TERMINATOR = b"\x1e"
+SUBFIELD_DELIMITER = "\x1f"
+
+ISBN_PREFIX_RE = re.compile(r"[\dXx\-]+")
+YEAR_RE = re.compile(r"\d{4}")
+
+
+def iter_jsonl_records(file):
+    """
+    JSONL 形式のダンプを1行ずつ読み、書誌情報の dict を返すジェネレーター。
+    解析できない行は空の dict として返す（呼び出し側で不正な行として数える）。
+
+    各行のキー: isbn, title, author（文字列またはリスト）, publisher,
+    published_date, image_url, description
+    """
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield {}
+            continue
+        yield data if isinstance(data, dict) else {}
+
+
+def iter_marc_records(file, chunk_size=64 * 1024):
+    """
+    MARC21（ISO 2709）形式のダンプを1レコードずつ読み、書誌情報の dict を返す
+    ジェネレーター。ファイルは chunk_size ずつ読むため、メモリ使用量は
+    レコード1件分＋chunk_size に収まる。
+    """
+    buffer = b""
+    while chunk := file.read(chunk_size):
+        buffer += chunk
+        *records, buffer = buffer.split(RECORD_TERMINATOR)
+        for raw in records:
+            if raw.strip():
+                yield parse_marc_record(raw)
+    if buffer.strip():
+        yield parse_marc_record(buffer)
+
+
+def parse_marc_record(raw):
+    """
+    MARC21 のレコード1件を解析する。UTF-8 で符号化されていることを前提とする。
+    """
+    try:
+        base_address = int(raw[12:17])
+    except ValueError:
+        return {}
+
+    fields = defaultdict(list)
+    directory = raw[24 : base_address - 1]
+    for i in range(0, len(directory) - len(directory) % 12, 12):
+        entry = directory[i : i + 12]
+        try:
+            tag = entry[:3].decode("ascii")
+            length, start = int(entry[3:7]), int(entry[7:12])
+        except (UnicodeDecodeError, ValueError):
+            continue
+        data = raw[base_address + start : base_address + start + length]
+        fields[tag].append(data.rstrip(FIELD_TERMINATOR).decode("utf-8", "replace"))
+
+    def subfield(tags, code):
+        for tag in tags:
+            for data in fields.get(tag, []):
+                # 先頭2文字はインディケーター
+                for part in data.split(SUBFIELD_DELIMITER)[1:]:
+                    if part[:1] == code and part[1:].strip():
+                        return part[1:].strip()
+        return ""
+
+    isbn_match = ISBN_PREFIX_RE.match(subfield(["020"], "a"))
+    year_match = YEAR_RE.search(subfield(["264", "260"], "c"))
+    return {
+        "isbn": isbn_match.group() if isbn_match else "",
+        "title": subfield(["245"], "a").rstrip(" /:;,."),
+        "author": subfield(["100", "110", "700"], "a").rstrip(" ,."),
+        "publisher": subfield(["264", "260"], "b").rstrip(" ,:;"),
+        "published_date": year_match.group() if year_match else "",
+        "description": subfield(["520"], "a"),
+    }
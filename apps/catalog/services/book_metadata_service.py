@@ -0,0 +1,222 @@
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+
+from apps.catalog.models import BibliographicRecord
+from apps.catalog.services.metadata_cache import MetadataCache
+from apps.catalog.services.metadata_providers import (
+    get_providers,
+    is_complete,
+    merge_records,
+)
+from apps.catalog.services.single_flight import SingleFlight
+from apps.catalog.utils import normalize_isbn
+
+logger = logging.getLogger(__name__)
+
+
+class BookMetadataFetchError(Exception):
+    """外部APIから書誌情報を取得できなかった場合に送出される例外"""
+
+
+class BookMetadataService:
+    cache = MetadataCache()
+    single_flight = SingleFlight(namespace=MetadataCache.key_prefix)
+
+    _executors = {}
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def lookup(cls, isbn):
+        """
+        ISBN から書誌情報を取得する。
+        キャッシュにあればそれを返し、次に書誌データのミラー（BibliographicRecord）を
+        参照する。どちらにもなければ各取得元（Google Books API など）に
+        並列で問い合わせて結果をキャッシュする。見つからなかった結果も短期間キャッシュする。
+        同じ ISBN への同時の問い合わせは、スレッド間・ワーカー間でまとめて1回にする。
+        ISBN の形式・チェックディジットが不正な場合は API を呼ばずに None を返す。
+
+        Returns:
+            dict or None: BookCreateView のフォーム初期値として使える書誌情報。
+                書籍が見つからなかった場合は None。
+
+        Raises:
+            BookMetadataFetchError: API からの情報取得に失敗した場合
+        """
+        isbn = normalize_isbn(isbn)
+        if isbn is None:
+            return None
+
+        metadata = cls.cache.get(isbn)
+        if metadata == MetadataCache.NOT_FOUND:
+            return None
+        if metadata is not None:
+            return metadata
+
+        record = BibliographicRecord.objects.filter(isbn=isbn).first()
+        if record is not None:
+            metadata = record.to_metadata()
+            cls.cache.set(isbn, metadata)
+            return metadata
+
+        metadata = cls.single_flight.do(
+            isbn,
+            lambda: cls._fetch_and_cache(isbn),
+            peek=lambda: cls.cache.peek(isbn),
+        )
+        if metadata == MetadataCache.NOT_FOUND:
+            return None
+        return metadata
+
+    @classmethod
+    def prefetch(cls, isbn):
+        """
+        書誌情報の取得をバックグラウンドで開始し、キャッシュを温めておく。
+        取得中に lookup が呼ばれた場合は、single-flight により同じ取得結果を待つ。
+
+        Returns:
+            concurrent.futures.Future: 先読みの完了を表す Future
+        """
+        executor = cls._get_executor(
+            "prefetch", settings.BOOK_METADATA_PREFETCH_WORKERS
+        )
+        return executor.submit(cls._prefetch, isbn)
+
+    @classmethod
+    def _prefetch(cls, isbn):
+        try:
+            cls.lookup(isbn)
+        except BookMetadataFetchError:
+            # 先読みの失敗は、画面表示時の lookup で改めて扱う
+            logger.info("prefetch of metadata for %s failed", isbn, exc_info=True)
+        except Exception:
+            # 戻り値の Future は誰も参照しないため、ここで記録しないと失われる
+            logger.exception("unexpected error while prefetching metadata for %s", isbn)
+        finally:
+            # ミラーの参照で開いたこのスレッドの DB 接続を閉じる
+            connection.close()
+
+    @classmethod
+    def _fetch_and_cache(cls, isbn):
+        metadata, pending = cls._fan_out(isbn)
+        if metadata is None:
+            cls.cache.set_not_found(isbn)
+        else:
+            cls.cache.set(isbn, metadata)
+
+        # 予算内に間に合わなかった取得元の結果は、届き次第キャッシュへ補完する
+        for future in pending:
+            future.add_done_callback(functools.partial(cls._merge_late_result, isbn))
+
+        return MetadataCache.NOT_FOUND if metadata is None else metadata
+
+    @classmethod
+    def fetch(cls, isbn):
+        """
+        各取得元から書誌情報を取得する（キャッシュは参照しない）。
+        """
+        return cls._fan_out(isbn)[0]
+
+    @classmethod
+    def _fan_out(cls, isbn):
+        """
+        settings.BOOK_METADATA_PROVIDERS の取得元に並列で問い合わせる。
+
+        settings.BOOK_METADATA_LATENCY_BUDGET 秒以内に届いた結果を、届いた順に
+        優先してまとめ、必須項目が揃った時点で待つのをやめる。
+
+        Returns:
+            tuple: (書誌情報 dict または None, まだ応答のない Future の集合)
+
+        Raises:
+            BookMetadataFetchError: 予算内に応答できた取得元が1つもなかった場合
+        """
+        executor = cls._get_executor("fetch", settings.BOOK_METADATA_FETCH_WORKERS)
+        futures = [
+            executor.submit(cls._call_provider, provider, isbn)
+            for provider in get_providers()
+        ]
+        deadline = time.monotonic() + settings.BOOK_METADATA_LATENCY_BUDGET
+
+        metadata = None
+        answered = 0
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(0, deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            # 同時に届いた結果は、設定された取得元の順に優先する
+            for future in sorted(done, key=futures.index):
+                try:
+                    record = future.result()
+                except Exception:
+                    continue
+                answered += 1
+                if record:
+                    metadata = (
+                        record if metadata is None else merge_records(metadata, record)
+                    )
+            if metadata is not None and is_complete(metadata):
+                break
+
+        if metadata is None:
+            if answered == 0:
+                raise BookMetadataFetchError(
+                    f"no metadata provider answered for {isbn}"
+                )
+            return None, pending
+        return {"isbn": isbn, **metadata}, pending
+
+    @classmethod
+    def _call_provider(cls, provider, isbn):
+        started = time.monotonic()
+        try:
+            record = provider.fetch(isbn)
+        except Exception:
+            cls.cache.record_provider_call(
+                provider.name, "failure", time.monotonic() - started
+            )
+            logger.warning("metadata provider %s failed", provider.name, exc_info=True)
+            raise
+        cls.cache.record_provider_call(
+            provider.name,
+            "success" if record else "not_found",
+            time.monotonic() - started,
+        )
+        return record
+
+    @classmethod
+    def _merge_late_result(cls, isbn, future):
+        try:
+            record = future.result()
+        except Exception:
+            return
+        if not record:
+            return
+
+        cached = cls.cache.peek(isbn)
+        if isinstance(cached, dict):
+            metadata = merge_records(cached, record)
+        else:
+            metadata = {"isbn": isbn, **record}
+        cls.cache.set(isbn, metadata)
+
+    @classmethod
+    def _get_executor(cls, name, max_workers):
+        # 取得元への問い合わせと先読みは、互いを待ち合わせてもプールが詰まらないよう別のプールで動かす
+        with cls._executor_lock:
+            if name not in cls._executors:
+                cls._executors[name] = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f"book-metadata-{name}",
+                )
+            return cls._executors[name]
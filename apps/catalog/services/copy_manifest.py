@@ -0,0 +1,138 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+
+from apps.catalog.models import Book, Copy, StorageLocation
+from apps.catalog.utils import normalize_isbn
+
+# 1行で登録できる冊数の上限
+MAX_QUANTITY = 1000
+
+
+def iter_csv_rows(lines):
+    """
+    CSV の納品リストを1行ずつ読み、(行番号, 行の dict) を返すジェネレーター。
+    列名は小文字にそろえる（isbn, location, quantity）。
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {
+            key.strip().lower(): (value or "").strip()
+            for key, value in row.items()
+            # 列が余分な行の余りの値（キーが None）は無視する
+            if key is not None
+        }
+
+
+def iter_ndjson_rows(lines):
+    """
+    NDJSON の納品リストを1行ずつ読み、(行番号, 行の dict) を返すジェネレーター。
+    解析できない行は dict の代わりに None を返す。
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            yield line_number, None
+            continue
+        yield line_number, {
+            key.lower(): str(value).strip()
+            for key, value in data.items()
+            if value is not None
+        }
+
+
+class CopyManifestImporter:
+    """
+    納品リスト（ISBN・保存場所・冊数）から蔵書をまとめて登録する。
+
+    行は chunk_size 行ずつ処理し、チャンクごとに ISBN を1回のクエリで書籍に解決して
+    蔵書を bulk_create する。行全体を読み込まないため、行数によらず使用メモリは一定。
+    """
+
+    def __init__(
+        self, status=Copy.Status.AVAILABLE, default_location=None, chunk_size=500
+    ):
+        self.status = status
+        self.default_location = default_location
+        self.chunk_size = chunk_size
+        self.locations = {}
+        self.created = 0
+        self.rejected = 0
+
+    def run(self, rows):
+        """
+        rows（(行番号, 行の dict) のイテラブル）を登録し、登録できなかった行を
+        (行番号, 行の dict, 理由) として行番号順に返すジェネレーター。
+        """
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield from self._import_chunk(chunk)
+
+    def _import_chunk(self, chunk):
+        rejected = []
+        accepted = []
+        for line_number, row in chunk:
+            if row is None:
+                rejected.append((line_number, {}, "行を解析できません"))
+                continue
+            reason, parsed = self._parse_row(row)
+            if reason:
+                rejected.append((line_number, row, reason))
+            else:
+                accepted.append((line_number, row, *parsed))
+
+        books = Book.objects.in_bulk(
+            {isbn for _, _, isbn, _, _ in accepted}, field_name="isbn"
+        )
+        copies = []
+        for line_number, row, isbn, location, quantity in accepted:
+            book = books.get(isbn)
+            if book is None:
+                rejected.append((line_number, row, "書籍が登録されていません"))
+                continue
+            copies.extend(
+                Copy(book=book, location=location, status=self.status)
+                for _ in range(quantity)
+            )
+
+        with transaction.atomic():
+            Copy.objects.bulk_create(copies, batch_size=1000)
+
+        self.created += len(copies)
+        self.rejected += len(rejected)
+        return sorted(rejected, key=lambda r: r[0])
+
+    def _parse_row(self, row):
+        isbn = normalize_isbn(row.get("isbn", ""))
+        if isbn is None:
+            return "ISBN が正しくありません", None
+
+        try:
+            quantity = int(row.get("quantity") or 1)
+        except ValueError:
+            quantity = 0
+        if not 1 <= quantity <= MAX_QUANTITY:
+            return f"冊数は 1〜{MAX_QUANTITY} で指定してください", None
+
+        location_name = row.get("location", "")
+        location = self._get_location(location_name)
+        if location is None:
+            if location_name:
+                return f"保存場所「{location_name}」が存在しません", None
+            return "保存場所が指定されていません", None
+
+        return None, (isbn, location, quantity)
+
+    def _get_location(self, name):
+        if not name:
+            return self.default_location
+        if name not in self.locations:
+            self.locations[name] = StorageLocation.objects.filter(name=name).first()
+        return self.locations[name]
@@ -0,0 +1,186 @@
+import functools
+import hashlib
+import io
+import logging
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from apps.catalog.models import Book
+from apps.catalog.services.metadata_client import (
+    MetadataClientError,
+    build_metadata_client,
+)
+from apps.catalog.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 画素数の大きすぎる画像（展開するとメモリを使い果たすもの）は開かない
+Image.MAX_IMAGE_PIXELS = settings.BOOK_COVER_MAX_PIXELS
+
+
+class CoverUnavailableError(Exception):
+    """書影を取得・変換できなかった場合に送出される例外"""
+
+
+@functools.cache
+def get_cover_client(origin):
+    """
+    書影の配信元（scheme://host）ごとのクライアントを返す（プロセス内で共有）。
+    配信元ごとにサーキットブレーカーを持たせ、障害中の配信元への取得を止める。
+    """
+    return build_metadata_client(origin)
+
+
+class CoverService:
+    """
+    Book.image_url の書影を一度だけ取得し、settings.BOOK_COVER_SIZES の縮小版を
+    ストレージ（既定では MEDIA_ROOT）に保存する。保存先の接頭辞は Book.cover_path に記録する。
+    """
+
+    directory = "covers"
+    MAX_REDIRECTS = 3
+    single_flight = SingleFlight(namespace="catalog:cover")
+
+    @classmethod
+    def cover_path_for(cls, book):
+        """
+        image_url に対応する保存先の接頭辞。image_url が変われば別のパスになる。
+        """
+        digest = hashlib.sha256(book.image_url.encode()).hexdigest()[:16]
+        return f"{cls.directory}/{book.isbn}-{digest}"
+
+    @classmethod
+    def is_allowed_url(cls, url):
+        """
+        書影として取得してよい URL か。http(s) で、ホストが
+        settings.BOOK_COVER_ALLOWED_HOSTS に含まれるものだけを許可する。
+        先頭が "." の項目は、そのドメインのサブドメインにも一致する。
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return False
+        host = parts.hostname
+        return any(
+            host == pattern or (pattern.startswith(".") and host.endswith(pattern))
+            for pattern in settings.BOOK_COVER_ALLOWED_HOSTS
+        )
+
+    @classmethod
+    def variant_path(cls, cover_path, size):
+        return f"{cover_path}-{size}.jpg"
+
+    @classmethod
+    def get_variant(cls, book, size):
+        """
+        縮小版を用意し、(ストレージ上のパス, ETag) を返す。
+
+        Raises:
+            CoverUnavailableError: image_url がない、または書影を取得・変換できない場合
+        """
+        if not book.image_url:
+            raise CoverUnavailableError(f"book {book.pk} has no image_url")
+        if not cls.is_allowed_url(book.image_url):
+            raise CoverUnavailableError(f"book {book.pk} has a disallowed image_url")
+
+        cover_path = cls.cover_path_for(book)
+        path = cls.variant_path(cover_path, size)
+        if book.cover_path != cover_path or not default_storage.exists(path):
+            # 同じ書影への同時アクセスでは、取得・変換を1回だけ行う
+            cls.single_flight.do(cover_path, lambda: cls._store(book, cover_path))
+        return path, f'"{cover_path.rsplit("/", 1)[-1]}-{size}"'
+
+    @classmethod
+    def _store(cls, book, cover_path):
+        try:
+            content = cls._download(book.image_url)
+            with Image.open(io.BytesIO(content)) as image:
+                if image.width * image.height > settings.BOOK_COVER_MAX_PIXELS:
+                    raise Image.DecompressionBombError(
+                        f"image has too many pixels: {image.width}x{image.height}"
+                    )
+                image.load()
+                variants = {
+                    size: cls._resize(image, width)
+                    for size, width in settings.BOOK_COVER_SIZES.items()
+                }
+        except (
+            CoverUnavailableError,
+            MetadataClientError,
+            requests.RequestException,
+            OSError,
+            Image.DecompressionBombError,
+        ) as e:
+            logger.warning("cover for book %s is unavailable: %s", book.pk, e)
+            raise CoverUnavailableError(str(e)) from e
+
+        for size, content in variants.items():
+            path = cls.variant_path(cover_path, size)
+            # 既存のファイルがあると別名で保存されるため、先に削除する
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            default_storage.save(path, ContentFile(content))
+
+        # image_url が変わる前の書影は不要になるため削除する
+        if book.cover_path and book.cover_path != cover_path:
+            for size in settings.BOOK_COVER_SIZES:
+                default_storage.delete(cls.variant_path(book.cover_path, size))
+
+        Book.objects.filter(pk=book.pk).update(cover_path=cover_path)
+        book.cover_path = cover_path
+
+    @classmethod
+    def _open(cls, url):
+        """
+        書影の URL にリクエストを送り、本文を読む前のレスポンスを返す。
+        リダイレクトは自動ではたどらず、転送先ごとに is_allowed_url で検査してから
+        MAX_REDIRECTS 回までたどる（許可していないホストへの転送で内部のサーバーに
+        アクセスさせないため）。
+        """
+        for _ in range(cls.MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            client = get_cover_client(f"{parts.scheme}://{parts.netloc}")
+            response = client.get(url=url, stream=True, allow_redirects=False)
+            if response.status_code == 200:
+                return response
+            response.close()
+            location = response.headers.get("Location")
+            if not location:
+                raise CoverUnavailableError(f"{url} redirected without a location")
+            url = urljoin(url, location)
+            if not cls.is_allowed_url(url):
+                raise CoverUnavailableError(f"redirected to a disallowed url: {url}")
+        raise CoverUnavailableError(f"too many redirects for {url}")
+
+    @classmethod
+    def _download(cls, url):
+        """
+        書影の本文を、settings.BOOK_COVER_MAX_BYTES を上限として読み込む。
+        """
+        max_bytes = settings.BOOK_COVER_MAX_BYTES
+        response = cls._open(url)
+        try:
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise CoverUnavailableError(f"{url} is too large ({declared} bytes)")
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                content += chunk
+                if len(content) > max_bytes:
+                    raise CoverUnavailableError(f"{url} exceeds {max_bytes} bytes")
+            return bytes(content)
+        finally:
+            response.close()
+
+    @classmethod
+    def _resize(cls, image, width):
+        resized = image.convert("RGB")
+        # 縦横比を保ったまま、幅が width 以下になるよう縮小する（拡大はしない）
+        resized.thumbnail((width, width * 4))
+        buffer = io.BytesIO()
+        resized.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
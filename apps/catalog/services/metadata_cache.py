@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core.cache import caches
+
+
+class MetadataCache:
+    """
+    ISBN をキーとして書誌情報を保持するキャッシュ。
+
+    Django のキャッシュフレームワーク上に構築している。
+    - 保持期間（TTL）は settings.BOOK_METADATA_CACHE_TIMEOUT
+    - 容量超過時の追い出しはキャッシュバックエンドに従う（LocMemCache は LRU）
+    - 「見つからなかった」という結果も NOT_FOUND として短期間
+      （settings.BOOK_METADATA_NEGATIVE_CACHE_TIMEOUT）保持する
+    - ヒット数・ミス数も同じキャッシュに記録するため、共有バックエンド
+      （Redis, Memcached など）を使えば全ワーカーの合計値になる
+    """
+
+    key_prefix = "catalog:metadata"
+
+    # 書籍が見つからなかったことを表す値（pickle 後も比較できるよう文字列にしている）
+    NOT_FOUND = "__not_found__"
+
+    PROVIDER_STATS = ("success", "not_found", "failure", "elapsed_ms")
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        # キャッシュのインスタンスはスレッドごとに異なるため、毎回取得する
+        return caches[self.alias]
+
+    def _key(self, isbn):
+        return f"{self.key_prefix}:{isbn}"
+
+    def _stats_key(self, name):
+        return f"{self.key_prefix}:stats:{name}"
+
+    def get(self, isbn):
+        """
+        キャッシュ済みの書誌情報を返す。キャッシュになければ None を、
+        見つからなかったことがキャッシュされていれば NOT_FOUND を返す。
+        """
+        metadata = self.cache.get(self._key(isbn))
+        self._increment("hits" if metadata is not None else "misses")
+        return metadata
+
+    def peek(self, isbn):
+        """
+        ヒット数・ミス数を記録せずにキャッシュを参照する。
+        """
+        return self.cache.get(self._key(isbn))
+
+    def set(self, isbn, metadata):
+        self.cache.set(
+            self._key(isbn), metadata, timeout=settings.BOOK_METADATA_CACHE_TIMEOUT
+        )
+
+    def set_not_found(self, isbn):
+        self.cache.set(
+            self._key(isbn),
+            self.NOT_FOUND,
+            timeout=settings.BOOK_METADATA_NEGATIVE_CACHE_TIMEOUT,
+        )
+
+    def delete(self, isbn):
+        self.cache.delete(self._key(isbn))
+
+    def stats(self):
+        """
+        ヒット数・ミス数・ヒット率を返す。
+        """
+        hits = self.cache.get(self._stats_key("hits"), 0)
+        misses = self.cache.get(self._stats_key("misses"), 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def record_provider_call(self, provider, outcome, elapsed):
+        """
+        取得元ごとの呼び出し結果（success / not_found / failure）と所要時間を記録する。
+        """
+        self._increment(f"provider:{provider}:{outcome}")
+        self._increment(f"provider:{provider}:elapsed_ms", round(elapsed * 1000))
+
+    def provider_stats(self, provider):
+        """
+        取得元ごとの呼び出し回数・成功率・平均所要時間を返す。
+        """
+        counts = self.cache.get_many(
+            [
+                self._stats_key(f"provider:{provider}:{name}")
+                for name in self.PROVIDER_STATS
+            ]
+        )
+        success, not_found, failure, elapsed_ms = (
+            counts.get(self._stats_key(f"provider:{provider}:{name}"), 0)
+            for name in self.PROVIDER_STATS
+        )
+        calls = success + not_found + failure
+        return {
+            "calls": calls,
+            "success": success,
+            "not_found": not_found,
+            "failure": failure,
+            "success_rate": success / calls if calls else 0.0,
+            "avg_latency_ms": elapsed_ms / calls if calls else 0.0,
+        }
+
+    def reset_stats(self, providers=()):
+        keys = [self._stats_key("hits"), self._stats_key("misses")]
+        keys += [
+            self._stats_key(f"provider:{provider}:{name}")
+            for provider in providers
+            for name in self.PROVIDER_STATS
+        ]
+        self.cache.delete_many(keys)
+
+    def _increment(self, name, delta=1):
+        key = self._stats_key(name)
+        # add はキーが存在しない場合のみ成功するため、初回の競合でも値を失わない
+        if not self.cache.add(key, delta, timeout=None):
+            try:
+                self.cache.incr(key, delta)
+            except ValueError:
+                # add と incr の間に追い出された場合は、カウントを諦める
+                pass
@@ -0,0 +1,229 @@
+import functools
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataClientError(Exception):
+    """書誌情報APIへのリクエストが失敗した場合に送出される例外"""
+
+
+class CircuitOpenError(MetadataClientError):
+    """サーキットブレーカーが開いているため、リクエストを送らなかった場合の例外"""
+
+
+class CircuitBreaker:
+    """
+    連続した失敗が閾値に達すると「開いた」状態になり、一定時間リクエストを遮断する。
+
+    - CLOSED: 通常状態。失敗が failure_threshold 回連続すると OPEN へ
+    - OPEN: reset_timeout 秒間はすべてのリクエストを即座に拒否する
+    - HALF_OPEN: reset_timeout 経過後、1件だけ試行を許可する。
+      成功すれば CLOSED、失敗すれば再び OPEN へ
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and self.clock() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # HALF_OPEN: 試行は同時に1件まで
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class MetadataClient:
+    """
+    書誌情報APIを呼び出すための HTTP クライアント。
+
+    - 接続・読み込みそれぞれにタイムアウトを設定する
+    - 接続エラー、タイムアウト、5xx / 429 の場合は、ジッター付きの指数バックオフで
+      max_retries 回まで再試行する
+    - 再試行しても失敗した呼び出しはサーキットブレーカーに記録し、
+      ブレーカーが開いている間はリクエストを送らずに CircuitOpenError を送出する
+    """
+
+    RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        base_url,
+        *,
+        connect_timeout=3.05,
+        read_timeout=5.0,
+        max_retries=2,
+        backoff_base=0.2,
+        backoff_max=2.0,
+        breaker=None,
+        sleep=time.sleep,
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # Session はスレッド間で共有しないよう、スレッドごとに作成して接続を再利用する
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def get(self, params=None, *, url=None, stream=False, allow_redirects=True):
+        """
+        base_url（url を指定した場合はその URL）に GET リクエストを送り、
+        ステータス 200 のレスポンスを返す。stream=True の場合、本文は呼び出し側が
+        iter_content で読み、読み終えたら close する。
+        allow_redirects=False の場合はリダイレクトをたどらず、3xx のレスポンスも
+        そのまま返す（転送先の検査は呼び出し側で行う）。
+
+        Raises:
+            CircuitOpenError: サーキットブレーカーが開いている場合
+            MetadataClientError: 再試行しても 200 が得られなかった場合
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"circuit open for {self.base_url}")
+
+        try:
+            response = self._get_with_retries(
+                url or self.base_url, params, stream, allow_redirects
+            )
+        except Exception:
+            # 想定外の例外でも記録しないと、HALF_OPEN の試行中のまま戻らなくなる
+            self.breaker.record_failure()
+            raise
+
+        # 4xx など再試行しないエラーは、相手先の障害ではないためブレーカーでは成功扱い
+        self.breaker.record_success()
+        redirected = response.status_code in requests.models.REDIRECT_STATI
+        if response.status_code != 200 and (allow_redirects or not redirected):
+            response.close()
+            raise MetadataClientError(
+                f"{url or self.base_url} returned status {response.status_code}"
+            )
+        return response
+
+    def get_json(self, params=None):
+        response = self.get(params)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise MetadataClientError(f"{self.base_url}: invalid JSON") from e
+
+    def _get_with_retries(self, url, params, stream=False, allow_redirects=True):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(
+                    url,
+                    params=params,
+                    timeout=self.timeout,
+                    stream=stream,
+                    allow_redirects=allow_redirects,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = MetadataClientError(f"{url}: {e}")
+            except requests.RequestException as e:
+                # リダイレクトの繰り返し・不正な応答などは、再試行しても変わらない
+                raise MetadataClientError(f"{url}: {e}") from e
+            else:
+                if response.status_code not in self.RETRYABLE_STATUS_CODES:
+                    return response
+                response.close()
+                error = MetadataClientError(
+                    f"{url} returned status {response.status_code}"
+                )
+
+            if attempt < self.max_retries:
+                logger.info("retrying %s (attempt %d): %s", url, attempt + 1, error)
+                self.sleep(self._backoff(attempt))
+        raise error
+
+    def _backoff(self, attempt):
+        # Full Jitter: 0 〜 min(上限, base * 2^attempt) の一様乱数
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+def build_metadata_client(base_url):
+    """
+    settings のタイムアウト・再試行・ブレーカー設定でクライアントを構築する。
+    """
+    return MetadataClient(
+        base_url,
+        connect_timeout=settings.BOOK_METADATA_CONNECT_TIMEOUT,
+        read_timeout=settings.BOOK_METADATA_READ_TIMEOUT,
+        max_retries=settings.BOOK_METADATA_MAX_RETRIES,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.BOOK_METADATA_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.BOOK_METADATA_CIRCUIT_RESET_TIMEOUT,
+        ),
+    )
+
+
+@functools.cache
+def get_google_books_client():
+    """
+    Google Books API 用クライアントを返す（プロセス内で共有）。
+    """
+    return build_metadata_client(settings.GOOGLE_BOOKS_API_URL)
@@ -0,0 +1,196 @@
+import functools
+import re
+import xml.etree.ElementTree as ET
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from apps.catalog.services.metadata_client import (
+    build_metadata_client,
+    get_google_books_client,
+)
+from apps.catalog.utils import parse_published_date
+
+# 書誌情報として扱う項目（isbn はサービス側で付与する）
+METADATA_FIELDS = (
+    "title",
+    "author",
+    "publisher",
+    "published_date",
+    "published_date_precision",
+    "image_url",
+    "description",
+)
+
+# これらがすべて揃っていれば「完全な」書誌情報とみなす
+REQUIRED_FIELDS = ("title", "author", "publisher", "published_date")
+
+PUBDATE_RE = re.compile(r"^(\d{4})(?:[-./]?(\d{1,2})(?:[-./]?(\d{1,2}))?)?")
+
+
+def is_complete(record):
+    return all(record.get(field) for field in REQUIRED_FIELDS)
+
+
+def merge_records(primary, secondary):
+    """
+    primary の空欄を secondary の値で補った書誌情報を返す。
+    出版日は精度とセットで補う。
+    """
+    merged = dict(primary)
+    for field in METADATA_FIELDS:
+        if field == "published_date_precision":
+            continue
+        if not merged.get(field) and secondary.get(field):
+            merged[field] = secondary[field]
+            if field == "published_date":
+                merged["published_date_precision"] = secondary[
+                    "published_date_precision"
+                ]
+    return merged
+
+
+def parse_pubdate(value):
+    """
+    「20200115」「2020-01」「2020.1」など提供元ごとに異なる出版日の表記を
+    parse_published_date が解釈できる形式に揃えて解析する。
+    """
+    match = PUBDATE_RE.match((value or "").strip())
+    if not match:
+        return parse_published_date("")
+    year, month, day = match.groups()
+    normalized = "-".join(part for part in (year, month, day) if part)
+    return parse_published_date(normalized)
+
+
+class MetadataProvider:
+    """
+    書誌情報の取得元。
+
+    fetch は METADATA_FIELDS をキーとする dict を返し、見つからなければ None を返す。
+    通信に失敗した場合は MetadataClientError を送出する。
+    """
+
+    name = ""
+    base_url_setting = ""
+
+    @functools.cached_property
+    def client(self):
+        return build_metadata_client(getattr(settings, self.base_url_setting))
+
+    def fetch(self, isbn):
+        raise NotImplementedError
+
+
+class GoogleBooksProvider(MetadataProvider):
+    name = "google_books"
+
+    @property
+    def client(self):
+        return get_google_books_client()
+
+    def fetch(self, isbn):
+        data = self.client.get_json(params={"q": f"isbn:{isbn}"})
+        if data.get("totalItems", 0) == 0:
+            return None
+
+        volume_info = data["items"][0]["volumeInfo"]
+        published_date, published_date_precision = parse_published_date(
+            volume_info.get("publishedDate", "")
+        )
+        return {
+            "title": volume_info.get("title", ""),
+            # 複数の著者をカンマ区切りの文字列に変換
+            "author": ", ".join(volume_info.get("authors", [])),
+            "publisher": volume_info.get("publisher", ""),
+            "published_date": published_date,
+            "published_date_precision": published_date_precision,
+            "image_url": volume_info.get("imageLinks", {}).get("thumbnail", ""),
+            "description": volume_info.get("description", ""),
+        }
+
+
+class OpenBDProvider(MetadataProvider):
+    name = "openbd"
+    base_url_setting = "OPENBD_API_URL"
+
+    # 「山田太郎／著 鈴木花子／訳」の「／著」などの役割表示
+    ROLE_RE = re.compile(r"／\S*")
+
+    def fetch(self, isbn):
+        data = self.client.get_json(params={"isbn": isbn})
+        if not isinstance(data, list) or not data or not data[0]:
+            return None
+
+        summary = data[0].get("summary", {})
+        published_date, published_date_precision = parse_pubdate(
+            summary.get("pubdate", "")
+        )
+        authors = self.ROLE_RE.sub("", summary.get("author", "")).split()
+        return {
+            "title": summary.get("title", ""),
+            "author": ", ".join(authors),
+            "publisher": summary.get("publisher", ""),
+            "published_date": published_date,
+            "published_date_precision": published_date_precision,
+            "image_url": summary.get("cover", ""),
+            "description": self._description(data[0]),
+        }
+
+    def _description(self, record):
+        contents = (
+            record.get("onix", {}).get("CollateralDetail", {}).get("TextContent", [])
+        )
+        return next((c.get("Text", "") for c in contents if c.get("Text")), "")
+
+
+class NDLProvider(MetadataProvider):
+    """国立国会図書館サーチ（OpenSearch）"""
+
+    name = "ndl"
+    base_url_setting = "NDL_OPENSEARCH_URL"
+
+    NAMESPACES = {
+        "dc": "http://purl.org/dc/elements/1.1/",
+        "dcterms": "http://purl.org/dc/terms/",
+    }
+
+    def fetch(self, isbn):
+        response = self.client.get(params={"isbn": isbn, "cnt": 1})
+        item = ET.fromstring(response.content).find("channel/item")
+        if item is None:
+            return None
+
+        def text(path):
+            return item.findtext(path, default="", namespaces=self.NAMESPACES).strip()
+
+        published_date, published_date_precision = parse_pubdate(
+            text("dcterms:issued") or text("dc:date")
+        )
+        # 「山田, 太郎」形式の姓名は「山田 太郎」とし、著者の区切りのカンマと区別する
+        creators = [
+            creator.text.strip().replace(", ", " ")
+            for creator in item.findall("dc:creator", self.NAMESPACES)
+            if creator.text
+        ]
+        return {
+            "title": text("dc:title") or text("title"),
+            "author": ", ".join(creators),
+            "publisher": text("dc:publisher"),
+            "published_date": published_date,
+            "published_date_precision": published_date_precision,
+            "image_url": "",
+            "description": text("description"),
+        }
+
+
+@functools.cache
+def load_providers(paths):
+    return tuple(import_string(path)() for path in paths)
+
+
+def get_providers():
+    """
+    settings.BOOK_METADATA_PROVIDERS に設定された取得元のインスタンスを返す。
+    """
+    return load_providers(tuple(settings.BOOK_METADATA_PROVIDERS))
@@ -0,0 +1,96 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from django.core.cache import caches
+
+
+class SingleFlight:
+    """
+    同じキーに対する同時呼び出しをまとめ、実際の処理を1回だけ実行する。
+
+    - 同一プロセス内: 最初に呼び出したスレッドだけが処理を実行し、
+      後続のスレッドはその結果（または例外）を共有する
+    - ワーカー間: キャッシュの add をロックとして使う。ロックを取れなかった
+      ワーカーは、先行するワーカーが結果をキャッシュに書き込むのを待つ
+    """
+
+    def __init__(
+        self,
+        namespace,
+        alias="default",
+        lock_timeout=30,
+        wait_timeout=15,
+        poll_interval=0.05,
+    ):
+        self.namespace = namespace
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, peek=None):
+        """
+        key ごとに fn() を1回だけ実行し、その結果を返す。
+
+        Args:
+            key (str): まとめる単位となるキー
+            fn (callable): 実際の処理。結果を共有キャッシュへ書き込む責務も持つ
+            peek (callable): 共有キャッシュから結果を読む関数（統計には影響させない）。
+                None を返した場合は「まだ結果がない」とみなす。
+                省略した場合は、ワーカー間でのまとめ合わせは行わない。
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = self._do_across_workers(key, fn, peek)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _do_across_workers(self, key, fn, peek):
+        if peek is None:
+            return fn()
+
+        cache = caches[self.alias]
+        lock_key = f"{self.namespace}:lock:{key}"
+        # ロックの持ち主を識別するトークン。lock_timeout を過ぎて他のワーカーが
+        # 取り直したロックを、誤って解放しないために使う
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+
+        while not cache.add(lock_key, token, timeout=self.lock_timeout):
+            # 他のワーカーが処理中のため、結果がキャッシュに書き込まれるのを待つ
+            time.sleep(self.poll_interval)
+            result = peek()
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                # 待ちきれない場合は、自分で処理する
+                return fn()
+
+        try:
+            # ロックを取得するまでの間に、他のワーカーが書き込んでいれば再利用する
+            result = peek()
+            if result is not None:
+                return result
+            return fn()
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# bulk_create などで post_save を経由せずに Book を登録したときに送る。
+# 引数 books: 登録した Book のリスト（pk 設定済み）
+books_bulk_created = Signal()
+
+# Copy.objects.bulk_create で蔵書を登録したときに送る。
+# 引数 copies: 登録した Copy のリスト
+copies_bulk_created = Signal()
@@ -0,0 +1,255 @@
+import datetime
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.catalog.models import BibliographicRecord, Book, Copy, StorageLocation
+
+
+def fake_lookup(isbn):
+    if isbn == "9784000000017":  # 書誌情報が見つからない ISBN
+        return None
+    return {
+        "isbn": isbn,
+        "title": f"Book {isbn}",
+        "author": "Author",
+        "publisher": "Pub",
+        "published_date": datetime.date(2020, 1, 1),
+        "published_date_precision": Book.PublishedDatePrecision.YEAR,
+        "image_url": "",
+        "description": "",
+    }
+
+
+@pytest.fixture
+def location(db):
+    return StorageLocation.objects.create(name="第1書庫")
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(lines):
+        path = tmp_path / "isbns.csv"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    return write
+
+
+@pytest.mark.django_db
+@patch(
+    "apps.catalog.management.commands.import_isbns.BookMetadataService.lookup",
+    side_effect=fake_lookup,
+)
+class TestImportIsbnsCommand:
+
+    def test_imports_books_and_copies(self, mock_lookup, location, write_csv):
+        path = write_csv(
+            [
+                "isbn,quantity",
+                "9784000000000,2",
+                "4-00-000000-4,1",  # 同じ本の ISBN-10 表記
+                "9781234567897,",
+            ]
+        )
+        out = StringIO()
+
+        call_command("import_isbns", path, location="第1書庫", stdout=out)
+
+        assert Book.objects.count() == 2
+        assert Copy.objects.filter(book__isbn="9784000000000").count() == 3
+        assert Copy.objects.filter(book__isbn="9781234567897").count() == 1
+        assert mock_lookup.call_count == 2
+        assert "冊/秒" in out.getvalue()
+
+    def test_existing_books_are_not_fetched_again(
+        self, mock_lookup, location, write_csv
+    ):
+        Book.objects.create(isbn="9784000000000", title="既存", author="A")
+        path = write_csv(["isbn", "9784000000000"])
+
+        call_command("import_isbns", path, location="第1書庫", stdout=StringIO())
+
+        mock_lookup.assert_not_called()
+        assert Copy.objects.filter(book__title="既存").count() == 1
+
+    def test_invalid_rows_are_skipped(self, mock_lookup, location, write_csv):
+        path = write_csv(
+            [
+                "isbn,location",
+                "9784000000001,第1書庫",  # チェックディジット不正
+                "9784000000000,存在しない書庫",
+                "9784000000017,第1書庫",  # 書誌情報なし
+                "9781234567897,第1書庫",
+            ]
+        )
+        err = StringIO()
+
+        call_command("import_isbns", path, stdout=StringIO(), stderr=err)
+
+        assert list(Book.objects.values_list("isbn", flat=True)) == ["9781234567897"]
+        assert err.getvalue().count("スキップ") == 3
+
+    def test_metadata_is_cleaned_before_bulk_create(
+        self, mock_lookup, location, write_csv
+    ):
+        mock_lookup.side_effect = lambda isbn: {
+            **fake_lookup(isbn),
+            "title": "長" * 300 if isbn == "9784000000000" else " ",
+            "image_url": "https://example.com/" + "a" * 300,
+        }
+        path = write_csv(["isbn", "9784000000000", "9781234567897"])
+        err = StringIO()
+
+        call_command(
+            "import_isbns", path, location="第1書庫", stdout=StringIO(), stderr=err
+        )
+
+        book = Book.objects.get()
+        assert book.isbn == "9784000000000"
+        assert book.title == "長" * 255
+        assert book.image_url == ""
+        assert "9781234567897" in err.getvalue()
+
+    def test_resume_skips_processed_rows(
+        self, mock_lookup, location, write_csv, tmp_path
+    ):
+        path = write_csv(["isbn", "9784000000000", "9781234567897"])
+        state_file = tmp_path / "state.json"
+        state_file.write_text(json.dumps({"row": 1}))
+
+        call_command(
+            "import_isbns",
+            path,
+            location="第1書庫",
+            state_file=state_file,
+            resume=True,
+            stdout=StringIO(),
+        )
+
+        assert list(Book.objects.values_list("isbn", flat=True)) == ["9781234567897"]
+        assert not state_file.exists()
+
+    def test_missing_location_raises(self, mock_lookup, db, write_csv):
+        path = write_csv(["isbn", "9784000000000"])
+
+        with pytest.raises(CommandError):
+            call_command("import_isbns", path, location="なし", stdout=StringIO())
+
+
+def build_marc_record(fields):
+    """
+    (タグ, インディケーター, [(サブフィールドコード, 値), ...]) のリストから
+    MARC21（ISO 2709）のレコードを組み立てる。
+    """
+    directory = b""
+    data = b""
+    for tag, indicators, subfields in fields:
+        body = indicators + "".join(f"\x1f{code}{value}" for code, value in subfields)
+        encoded = body.encode("utf-8") + b"\x1e"
+        directory += f"{tag}{len(encoded):04d}{len(data):05d}".encode()
+        data += encoded
+    base_address = 24 + len(directory) + 1
+    length = base_address + len(data) + 1
+    leader = f"{length:05d}nam a22{base_address:05d}   4500".encode()
+    return leader + directory + b"\x1e" + data + b"\x1d"
+
+
+@pytest.mark.django_db
+class TestLoadBibliographicDumpCommand:
+
+    def test_loads_jsonl(self, tmp_path):
+        path = tmp_path / "dump.jsonl"
+        lines = [
+            {
+                "isbn": "978-4-00-000000-0",
+                "title": "テスト本",
+                "author": ["山田太郎", "鈴木花子"],
+                "publisher": "テスト出版",
+                "published_date": "2020-01",
+            },
+            "not json",
+            {"isbn": "9784000000001", "title": "チェックディジット不正"},
+            {"isbn": "9781234567897", "title": "タイトルのみ"},
+        ]
+        path.write_text(
+            "\n".join(
+                line if isinstance(line, str) else json.dumps(line) for line in lines
+            ),
+            encoding="utf-8",
+        )
+        out = StringIO()
+
+        call_command("load_bibliographic_dump", str(path), source="test", stdout=out)
+
+        record = BibliographicRecord.objects.get(isbn="9784000000000")
+        assert record.author == "山田太郎, 鈴木花子"
+        assert record.published_date == datetime.date(2020, 1, 1)
+        assert record.published_date_precision == "month"
+        assert record.source == "test"
+        assert BibliographicRecord.objects.count() == 2
+        assert "2 件をスキップしました" in out.getvalue()
+
+    def test_loads_marc_and_updates_existing_records(self, tmp_path):
+        BibliographicRecord.objects.create(isbn="9784000000000", title="古いタイトル")
+        record = build_marc_record(
+            [
+                ("020", "  ", [("a", "4000000004 (pbk.)")]),
+                ("100", "1 ", [("a", "山田太郎,")]),
+                ("245", "10", [("a", "テスト本 /"), ("c", "山田太郎")]),
+                ("264", " 1", [("a", "東京 :"), ("b", "テスト出版,"), ("c", "2020.")]),
+            ]
+        )
+        path = tmp_path / "dump.mrc"
+        # 重複したレコードは後のものを優先する
+        path.write_bytes(record * 2)
+
+        call_command(
+            "load_bibliographic_dump", str(path), batch_size=10, stdout=StringIO()
+        )
+
+        record = BibliographicRecord.objects.get(isbn="9784000000000")
+        assert record.title == "テスト本"
+        assert record.author == "山田太郎"
+        assert record.publisher == "テスト出版"
+        assert record.published_date == datetime.date(2020, 1, 1)
+        assert BibliographicRecord.objects.count() == 1
+
+    def test_unknown_format_raises(self, tmp_path):
+        path = tmp_path / "dump.txt"
+        path.write_text("", encoding="utf-8")
+
+        with pytest.raises(CommandError):
+            call_command("load_bibliographic_dump", str(path))
+
+
+def test_bench_parse_published_date():
+    out = StringIO()
+
+    call_command("bench_parse_published_date", size=1000, repeat=1, stdout=out)
+
+    assert "倍高速" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_reconcile_copy_counts(location):
+    book = Book.objects.create(isbn="9784000000001", title="本", author="著者")
+    Copy.objects.create(book=book, location=location, status=Copy.Status.AVAILABLE)
+    Copy.objects.create(book=book, location=location, status=Copy.Status.AVAILABLE)
+    # QuerySet.update はカウンターを更新しない
+    Copy.objects.update(status=Copy.Status.LOANED)
+
+    call_command("reconcile_copy_counts", dry_run=True, stdout=StringIO())
+    book.refresh_from_db()
+    assert (book.available_copies, book.loaned_copies) == (2, 0)
+
+    out = StringIO()
+    call_command("reconcile_copy_counts", stdout=out)
+
+    book.refresh_from_db()
+    assert (book.available_copies, book.loaned_copies) == (0, 2)
+    assert "1 冊を修復しました" in out.getvalue()
@@ -76,6 +76,22 @@ class TestBookModel(TestCase):
             str(context.exception),
         )
 
+    def test_save_sets_normalized_fields(self):
+        book = Book.objects.create(
+            isbn="9876543210125",
+            title="ぱいそん入門",
+            author="ﾔﾏﾀﾞ",
+            publisher="ＡＢＣ出版",
+        )
+        self.assertEqual(book.title_normalized, "パイソン入門")
+        self.assertEqual(book.author_normalized, "ヤマダ")
+        self.assertEqual(book.publisher_normalized, "abc出版")
+
+        book.title = "ＤＪＡＮＧＯ"
+        book.save(update_fields=["title"])
+        book.refresh_from_db()
+        self.assertEqual(book.title_normalized, "django")
+
 
 class TestStorageLocationModel(TestCase):
 
@@ -119,6 +135,36 @@ class TestCopyModel(TestCase):
         )
         self.assertEqual(str(copy), expected_str)
 
+    def test_counters_follow_save_delete_and_bulk_create(self):
+        def counters():
+            self.book.refresh_from_db()
+            return self.book.available_copies, self.book.loaned_copies
+
+        copy = Copy.objects.create(
+            book=self.book, location=self.location, status=Copy.Status.AVAILABLE
+        )
+        self.assertEqual(counters(), (1, 0))
+
+        # 古いインスタンスから保存しても、変更前の状態はデータベースから読む
+        stale = Copy.objects.get(pk=copy.pk)
+        copy.status = Copy.Status.LOANED
+        copy.save()
+        self.assertEqual(counters(), (0, 1))
+        stale.status = Copy.Status.DISCARDED
+        stale.save()
+        self.assertEqual(counters(), (0, 0))
+
+        Copy.objects.bulk_create(
+            [
+                Copy(book=self.book, location=self.location, status=status)
+                for status in (Copy.Status.AVAILABLE, Copy.Status.LOANED)
+            ]
+        )
+        self.assertEqual(counters(), (1, 1))
+
+        Copy.objects.filter(status=Copy.Status.LOANED).get().delete()
+        self.assertEqual(counters(), (1, 0))
+
     def test_status_choices(self):
         valid_statuses = dict(Copy.Status.choices)
         for key in [Copy.Status.AVAILABLE, Copy.Status.LOANED, Copy.Status.DISCARDED]:
@@ -0,0 +1,79 @@
+import builtins
+
+import pytest
+
+from apps.catalog.models import Book
+from apps.catalog.readings import (
+    PykakasiReadingConverter,
+    ReadingConverter,
+    get_reading_converter,
+    load_reading_converter,
+)
+
+# テスト用の読みの変換器（settings.CATALOG_READING_CONVERTER に設定する）
+TEST_CONVERTER = "apps.catalog.tests.test_readings.DictReadingConverter"
+
+
+class DictReadingConverter(ReadingConverter):
+    """決まった語だけを読みに置き換える変換器"""
+
+    available = True
+
+    READINGS = {"山田": "やまだ", "太郎": "たろう", "吾輩": "わがはい", "猫": "ねこ"}
+
+    def reading(self, text):
+        for word, reading in self.READINGS.items():
+            text = text.replace(word, reading)
+        return text
+
+
+@pytest.fixture
+def reading_converter(settings):
+    settings.CATALOG_READING_CONVERTER = TEST_CONVERTER
+
+
+def test_get_reading_converter_uses_setting(reading_converter):
+    assert isinstance(get_reading_converter(), DictReadingConverter)
+    # 変換器は設定ごとに1回だけ作成する
+    assert get_reading_converter() is get_reading_converter()
+
+
+def test_falls_back_when_pykakasi_is_not_installed(monkeypatch):
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == "pykakasi":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    load_reading_converter.cache_clear()
+    try:
+        converter = load_reading_converter("")
+        assert type(converter) is ReadingConverter
+        assert converter.reading("山田") == ""
+        assert not converter.available
+    finally:
+        load_reading_converter.cache_clear()
+
+
+def test_pykakasi_converter_reads_each_word():
+    pytest.importorskip("pykakasi")
+
+    assert PykakasiReadingConverter().reading("山田 太郎") == "ヤマダ タロウ"
+
+
+@pytest.mark.django_db
+def test_save_sets_normalized_readings(reading_converter):
+    book = Book.objects.create(
+        isbn="9784000000000", title="吾輩は猫である", author="山田 太郎"
+    )
+    assert (book.title_reading, book.author_reading) == (
+        "ワガハイハネコデアル",
+        "ヤマダ タロウ",
+    )
+
+    book.author = "山田"
+    book.save(update_fields=["author"])
+    book.refresh_from_db()
+    assert book.author_reading == "ヤマダ"
@@ -0,0 +1,190 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.cache import cache
+
+from apps.catalog.models import BibliographicRecord, Book
+from apps.catalog.services.book_metadata_service import (
+    BookMetadataFetchError,
+    BookMetadataService,
+)
+from apps.catalog.services.metadata_client import get_google_books_client
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    settings.BOOK_METADATA_MAX_RETRIES = 0
+    settings.BOOK_METADATA_PROVIDERS = [GOOGLE_BOOKS_PROVIDER]
+    cache.clear()
+    get_google_books_client.cache_clear()
+    yield
+    cache.clear()
+    get_google_books_client.cache_clear()
+
+
+GOOGLE_BOOKS_PROVIDER = "apps.catalog.services.metadata_providers.GoogleBooksProvider"
+
+
+def make_response(status_code=200, payload=None):
+    response = Mock(status_code=status_code)
+    response.json.return_value = payload
+    return response
+
+
+FOUND_PAYLOAD = {
+    "totalItems": 1,
+    "items": [
+        {
+            "volumeInfo": {
+                "title": "Test Book",
+                "authors": ["Author1", "Author2"],
+                "publisher": "Pub",
+                "publishedDate": "2020-05",
+            }
+        }
+    ],
+}
+
+
+class TestBookMetadataServiceLookup:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_lookup_returns_form_initial(self, mock_get):
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+
+        metadata = BookMetadataService.lookup("9784000000000")
+
+        assert metadata["isbn"] == "9784000000000"
+        assert metadata["title"] == "Test Book"
+        assert metadata["author"] == "Author1, Author2"
+        assert metadata["published_date_precision"] == Book.PublishedDatePrecision.MONTH
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_second_lookup_is_served_from_cache(self, mock_get):
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+
+        first = BookMetadataService.lookup("9784000000000")
+        second = BookMetadataService.lookup("9784000000000")
+
+        assert first == second
+        assert mock_get.call_count == 1
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_stats_count_hits_and_misses(self, mock_get):
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+
+        BookMetadataService.lookup("9784000000000")
+        BookMetadataService.lookup("9784000000000")
+        BookMetadataService.lookup("9784000000000")
+
+        stats = BookMetadataService.cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_api_error_raises_and_is_not_cached(self, mock_get):
+        mock_get.return_value = make_response(status_code=500)
+
+        with pytest.raises(BookMetadataFetchError):
+            BookMetadataService.lookup("9784000000000")
+
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+        assert BookMetadataService.lookup("9784000000000")["title"] == "Test Book"
+
+
+class TestBookMetadataServiceNegativeCache:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_not_found_is_cached(self, mock_get):
+        mock_get.return_value = make_response(payload={"totalItems": 0})
+
+        assert BookMetadataService.lookup("9784000000000") is None
+        assert BookMetadataService.lookup("9784000000000") is None
+
+        assert mock_get.call_count == 1
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_invalid_isbn_never_reaches_api(self, mock_get):
+        assert BookMetadataService.lookup("9784000000001") is None
+        assert BookMetadataService.lookup("12345") is None
+
+        mock_get.assert_not_called()
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_isbn10_is_looked_up_as_isbn13(self, mock_get):
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+
+        metadata = BookMetadataService.lookup("4-00-000000-4")
+
+        assert metadata["isbn"] == "9784000000000"
+        assert mock_get.call_args.kwargs["params"] == {"q": "isbn:9784000000000"}
+
+
+class TestBookMetadataServiceCoalescing:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_concurrent_lookups_share_one_request(self, mock_get):
+        def slow_response(*args, **kwargs):
+            time.sleep(0.2)
+            return make_response(payload=FOUND_PAYLOAD)
+
+        mock_get.side_effect = slow_response
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(BookMetadataService.lookup, ["9784000000000"] * 4)
+            )
+
+        assert mock_get.call_count == 1
+        assert all(r["title"] == "Test Book" for r in results)
+
+
+class TestBookMetadataServicePrefetch:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_prefetch_warms_cache(self, mock_get):
+        mock_get.return_value = make_response(payload=FOUND_PAYLOAD)
+
+        BookMetadataService.prefetch("9784000000000").result(timeout=5)
+        metadata = BookMetadataService.lookup("9784000000000")
+
+        assert metadata["title"] == "Test Book"
+        assert mock_get.call_count == 1
+        assert BookMetadataService.cache.stats()["hits"] == 1
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_prefetch_swallows_fetch_errors(self, mock_get):
+        mock_get.return_value = make_response(status_code=500)
+
+        assert BookMetadataService.prefetch("9784000000000").result(timeout=5) is None
+
+    def test_prefetch_logs_unexpected_errors(self, caplog):
+        with patch.object(
+            BookMetadataService, "lookup", side_effect=RuntimeError("boom")
+        ):
+            future = BookMetadataService.prefetch("9784000000000")
+            assert future.result(timeout=5) is None
+
+        assert "9784000000000" in caplog.text
+        assert "RuntimeError: boom" in caplog.text
+
+
+class TestBookMetadataServiceMirror:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_mirror_is_used_before_api(self, mock_get):
+        BibliographicRecord.objects.create(
+            isbn="9784000000000", title="ミラーの本", publisher="テスト出版"
+        )
+
+        metadata = BookMetadataService.lookup("4-00-000000-4")
+
+        assert metadata["title"] == "ミラーの本"
+        assert metadata["isbn"] == "9784000000000"
+        mock_get.assert_not_called()
+        assert BookMetadataService.cache.peek("9784000000000") == metadata
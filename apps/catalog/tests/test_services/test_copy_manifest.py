@@ -0,0 +1,91 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.catalog.models import Book, Copy, StorageLocation
+from apps.catalog.services.copy_manifest import (
+    CopyManifestImporter,
+    iter_csv_rows,
+    iter_ndjson_rows,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def book():
+    return Book.objects.create(
+        isbn="9784000000000",
+        title="Test Book",
+        author="Author",
+        publisher="Pub",
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+@pytest.fixture
+def location():
+    return StorageLocation.objects.create(name="第1書庫")
+
+
+def test_iter_csv_rows_lowercases_headers():
+    lines = ["ISBN,Location,Quantity\n", "9784000000000,第1書庫,2\n", "9784000000000\n"]
+
+    assert list(iter_csv_rows(lines)) == [
+        (2, {"isbn": "9784000000000", "location": "第1書庫", "quantity": "2"}),
+        (3, {"isbn": "9784000000000", "location": "", "quantity": ""}),
+    ]
+
+
+def test_iter_ndjson_rows_marks_invalid_lines():
+    lines = ['{"isbn": "9784000000000", "quantity": 2}\n', "\n", "not json\n"]
+
+    assert list(iter_ndjson_rows(lines)) == [
+        (1, {"isbn": "9784000000000", "quantity": "2"}),
+        (3, None),
+    ]
+
+
+def test_run_creates_copies_and_reports_rejected_rows(book, location):
+    StorageLocation.objects.create(name="第2書庫")
+    rows = [
+        (2, {"isbn": "978-4-00-000000-0", "location": "第1書庫", "quantity": "3"}),
+        (3, {"isbn": "4000000004", "location": "第2書庫"}),
+        (4, {"isbn": "9784000000001", "location": "第1書庫"}),
+        (5, {"isbn": "9781234567897", "location": "第1書庫"}),
+        (6, {"isbn": "9784000000000", "location": "第9書庫"}),
+        (7, {"isbn": "9784000000000", "location": "第1書庫", "quantity": "0"}),
+        (8, None),
+    ]
+    importer = CopyManifestImporter(chunk_size=4)
+
+    rejected = list(importer.run(rows))
+
+    assert [(line, reason) for line, _, reason in rejected] == [
+        (4, "ISBN が正しくありません"),
+        (5, "書籍が登録されていません"),
+        (6, "保存場所「第9書庫」が存在しません"),
+        (7, "冊数は 1〜1000 で指定してください"),
+        (8, "行を解析できません"),
+    ]
+    assert Copy.objects.filter(book=book, location=location).count() == 3
+    assert Copy.objects.filter(book=book).count() == 4
+    assert (importer.created, importer.rejected) == (4, 5)
+
+
+def test_run_resolves_books_with_one_query_per_chunk(book, location):
+    rows = [(i, {"isbn": "9784000000000"}) for i in range(2, 102)]
+    importer = CopyManifestImporter(default_location=location, chunk_size=100)
+
+    with CaptureQueriesContext(connection) as ctx:
+        list(importer.run(rows))
+
+    book_queries = [
+        q["sql"] for q in ctx.captured_queries if "catalog_book" in q["sql"]
+    ]
+    assert len([sql for sql in book_queries if sql.startswith("SELECT")]) == 1
+    # 蔵書数のカウンターも書籍ごとに1回の UPDATE でまとめて更新する
+    assert len([sql for sql in book_queries if sql.startswith("UPDATE")]) == 1
+    assert Copy.objects.count() == 100
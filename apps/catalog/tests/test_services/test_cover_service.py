@@ -0,0 +1,194 @@
+import datetime
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from apps.catalog.models import Book
+from apps.catalog.services.cover_service import (
+    CoverService,
+    CoverUnavailableError,
+    get_cover_client,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def make_response(content, headers=None):
+    return Mock(
+        status_code=200,
+        headers=headers or {},
+        iter_content=Mock(return_value=[content]),
+    )
+
+
+def make_redirect(location):
+    return Mock(status_code=302, headers={"Location": location})
+
+
+def make_image_response(width=600, height=900):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "navy").save(buffer, format="PNG")
+    return make_response(buffer.getvalue())
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BOOK_METADATA_MAX_RETRIES = 0
+    settings.BOOK_COVER_SIZES = {"thumb": 128, "medium": 320}
+    settings.BOOK_COVER_ALLOWED_HOSTS = ["example.com", ".example.org"]
+    get_cover_client.cache_clear()
+
+
+@pytest.fixture
+def book():
+    return Book.objects.create(
+        isbn="9784000000000",
+        title="Test Book",
+        author="Author",
+        publisher="Pub",
+        published_date=datetime.date(2024, 1, 1),
+        image_url="https://example.com/cover.png",
+    )
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_get_variant_stores_resized_covers_once(mock_get, book):
+    mock_get.return_value = make_image_response()
+
+    path, etag = CoverService.get_variant(book, "thumb")
+    CoverService.get_variant(book, "medium")
+    CoverService.get_variant(Book.objects.get(pk=book.pk), "thumb")
+
+    assert mock_get.call_count == 1
+    book.refresh_from_db()
+    assert path == f"{book.cover_path}-thumb.jpg"
+    assert etag == f'"{book.cover_path.rsplit("/", 1)[-1]}-thumb"'
+    with default_storage.open(path) as f, Image.open(f) as image:
+        assert image.size == (128, 192)
+    with default_storage.open(f"{book.cover_path}-medium.jpg") as f:
+        assert Image.open(f).size == (320, 480)
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_changed_image_url_replaces_cover(mock_get, book):
+    mock_get.return_value = make_image_response()
+    old_path, _ = CoverService.get_variant(book, "thumb")
+
+    book.image_url = "https://example.com/new-cover.png"
+    new_path, _ = CoverService.get_variant(book, "thumb")
+
+    assert new_path != old_path
+    assert mock_get.call_count == 2
+    assert not default_storage.exists(old_path)
+    assert default_storage.exists(new_path)
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_invalid_image_raises(mock_get, book):
+    mock_get.return_value = make_response(b"not an image")
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
+
+    book.refresh_from_db()
+    assert book.cover_path == ""
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_clients_are_shared_per_host(mock_get, book):
+    mock_get.return_value = make_image_response()
+    CoverService.get_variant(book, "thumb")
+    book.image_url = "https://example.com/other.png"
+    CoverService.get_variant(book, "thumb")
+
+    assert get_cover_client.cache_info().currsize == 1
+    assert mock_get.call_args.args == ("https://example.com/other.png",)
+    assert mock_get.call_args.kwargs["stream"] is True
+    assert mock_get.call_args.kwargs["allow_redirects"] is False
+
+
+@pytest.mark.parametrize(
+    "url, allowed",
+    [
+        ("https://example.com/cover.png", True),
+        ("http://cdn.example.org/cover.png", True),
+        ("https://example.org/cover.png", False),
+        ("https://example.com.evil.test/cover.png", False),
+        ("file:///etc/passwd", False),
+        ("http://169.254.169.254/latest/meta-data/", False),
+    ],
+)
+def test_is_allowed_url(url, allowed):
+    assert CoverService.is_allowed_url(url) is allowed
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_disallowed_host_is_not_fetched(mock_get, book):
+    book.image_url = "http://169.254.169.254/latest/meta-data/"
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
+
+    mock_get.assert_not_called()
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_redirect_to_allowed_host_is_followed(mock_get, book):
+    mock_get.side_effect = [
+        make_redirect("http://cdn.example.org/cover.png"),
+        make_image_response(),
+    ]
+
+    CoverService.get_variant(book, "thumb")
+
+    assert mock_get.call_args.args == ("http://cdn.example.org/cover.png",)
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_redirect_to_disallowed_host_is_not_followed(mock_get, book):
+    mock_get.return_value = make_redirect("http://169.254.169.254/latest/meta-data/")
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
+
+    assert mock_get.call_count == 1
+    book.refresh_from_db()
+    assert book.cover_path == ""
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_oversized_body_is_rejected(mock_get, book, settings):
+    settings.BOOK_COVER_MAX_BYTES = 1024
+    response = make_response(b"")
+    response.iter_content.return_value = iter([b"x" * 1000, b"x" * 1000])
+    mock_get.return_value = response
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
+
+    response.close.assert_called_once()
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_oversized_content_length_is_rejected_before_reading(mock_get, book, settings):
+    settings.BOOK_COVER_MAX_BYTES = 1024
+    response = make_response(b"", headers={"Content-Length": "2048"})
+    mock_get.return_value = response
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
+
+    response.iter_content.assert_not_called()
+
+
+@patch("apps.catalog.services.metadata_client.requests.Session.get")
+def test_image_with_too_many_pixels_is_rejected(mock_get, book, settings):
+    settings.BOOK_COVER_MAX_PIXELS = 100 * 100
+    mock_get.return_value = make_image_response(width=200, height=200)
+
+    with pytest.raises(CoverUnavailableError):
+        CoverService.get_variant(book, "thumb")
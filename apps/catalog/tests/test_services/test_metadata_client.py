@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from apps.catalog.services.metadata_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    MetadataClient,
+    MetadataClientError,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    server.responses に積まれた (ステータス, 遅延秒数) を順に返すスタブ。
+    積まれたものが尽きた後は最後の応答を繰り返す。
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            status, delay = (
+                server.responses.pop(0)
+                if len(server.responses) > 1
+                else server.responses[0]
+            )
+        if delay:
+            time.sleep(delay)
+        body = json.dumps({"totalItems": 0}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.responses = [(200, 0)]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/volumes"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(url, breaker=None, **kwargs):
+    kwargs.setdefault("max_retries", 2)
+    return MetadataClient(
+        url,
+        connect_timeout=0.5,
+        read_timeout=kwargs.pop("read_timeout", 0.5),
+        breaker=breaker or CircuitBreaker(failure_threshold=2, reset_timeout=30),
+        sleep=lambda seconds: None,
+        **kwargs,
+    )
+
+
+class TestMetadataClient:
+
+    def test_returns_json_on_success(self, stub_server):
+        client = make_client(stub_server.url)
+
+        assert client.get_json({"q": "isbn:9784000000000"}) == {"totalItems": 0}
+        assert stub_server.request_count == 1
+
+    def test_retries_server_errors_then_succeeds(self, stub_server):
+        stub_server.responses = [(503, 0), (500, 0), (200, 0)]
+        client = make_client(stub_server.url)
+
+        assert client.get_json() == {"totalItems": 0}
+        assert stub_server.request_count == 3
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_gives_up_after_max_retries(self, stub_server):
+        stub_server.responses = [(503, 0)]
+        client = make_client(stub_server.url, max_retries=1)
+
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+        assert stub_server.request_count == 2
+
+    def test_client_error_is_not_retried(self, stub_server):
+        stub_server.responses = [(400, 0)]
+        client = make_client(stub_server.url)
+
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+        assert stub_server.request_count == 1
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_read_timeout_bounds_slow_responses(self, stub_server):
+        stub_server.responses = [(200, 1.0)]
+        client = make_client(stub_server.url, read_timeout=0.1, max_retries=0)
+
+        started = time.monotonic()
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+        assert time.monotonic() - started < 0.9
+
+    def test_breaker_opens_and_short_circuits_requests(self, stub_server):
+        stub_server.responses = [(503, 0)]
+        client = make_client(stub_server.url, max_retries=0)
+
+        for _ in range(2):
+            with pytest.raises(MetadataClientError):
+                client.get_json()
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            client.get_json()
+        # ブレーカーが開いている間はスタブにリクエストが届かない
+        assert stub_server.request_count == 2
+
+    def test_breaker_half_open_trial_closes_on_success(self, stub_server):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        stub_server.responses = [(503, 0), (200, 0)]
+        client = make_client(stub_server.url, breaker=breaker, max_retries=0)
+
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+        with pytest.raises(CircuitOpenError):
+            client.get_json()
+
+        clock.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert client.get_json() == {"totalItems": 0}
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.parametrize(
+        "exception",
+        [requests.TooManyRedirects, requests.exceptions.ChunkedEncodingError],
+    )
+    def test_other_request_errors_release_half_open_trial(
+        self, stub_server, monkeypatch, exception
+    ):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        stub_server.responses = [(503, 0)]
+        client = make_client(stub_server.url, breaker=breaker, max_retries=2)
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+
+        def raise_error(*args, **kwargs):
+            raise exception("boom")
+
+        monkeypatch.setattr(client.session, "get", raise_error)
+        clock.now += 30
+        with pytest.raises(MetadataClientError):
+            client.get_json()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # 失敗した試行は解放され、次の reset_timeout 後にまた試行できる
+        monkeypatch.undo()
+        stub_server.responses = [(200, 0)]
+        clock.now += 30
+        assert client.get_json() == {"totalItems": 0}
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestCircuitBreaker:
+
+    def test_half_open_allows_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 10
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now += 10
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,258 @@
+import datetime
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.cache import cache
+
+from apps.catalog.models import Book
+from apps.catalog.services.book_metadata_service import (
+    BookMetadataFetchError,
+    BookMetadataService,
+)
+from apps.catalog.services.metadata_client import MetadataClientError
+from apps.catalog.services.metadata_providers import (
+    MetadataProvider,
+    NDLProvider,
+    OpenBDProvider,
+    merge_records,
+    parse_pubdate,
+)
+
+ISBN = "9784000000000"
+
+PARTIAL = {
+    "title": "部分的な本",
+    "author": "著者",
+    "publisher": "",
+    "published_date": None,
+    "published_date_precision": Book.PublishedDatePrecision.UNKNOWN,
+    "image_url": "",
+    "description": "",
+}
+COMPLETE = {
+    "title": "完全な本",
+    "author": "著者",
+    "publisher": "出版社",
+    "published_date": datetime.date(2020, 1, 1),
+    "published_date_precision": Book.PublishedDatePrecision.YEAR,
+    "image_url": "",
+    "description": "説明",
+}
+
+
+class PartialProvider(MetadataProvider):
+    name = "partial"
+
+    def fetch(self, isbn):
+        return dict(PARTIAL)
+
+
+class CompleteProvider(MetadataProvider):
+    name = "complete"
+
+    def fetch(self, isbn):
+        return dict(COMPLETE)
+
+
+class SlowCompleteProvider(MetadataProvider):
+    name = "slow_complete"
+
+    def fetch(self, isbn):
+        time.sleep(0.3)
+        return dict(COMPLETE)
+
+
+class NotFoundProvider(MetadataProvider):
+    name = "not_found"
+
+    def fetch(self, isbn):
+        return None
+
+
+class FailingProvider(MetadataProvider):
+    name = "failing"
+
+    def fetch(self, isbn):
+        raise MetadataClientError("down")
+
+
+def provider_path(cls):
+    return f"{__name__}.{cls.__name__}"
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestFanOut:
+
+    def test_first_complete_record_wins(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [
+            provider_path(CompleteProvider),
+            provider_path(SlowCompleteProvider),
+        ]
+
+        started = time.monotonic()
+        metadata = BookMetadataService.lookup(ISBN)
+
+        assert metadata["title"] == "完全な本"
+        assert metadata["isbn"] == ISBN
+        assert time.monotonic() - started < 0.3
+
+    def test_incomplete_record_is_merged_with_later_results(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [
+            provider_path(PartialProvider),
+            provider_path(CompleteProvider),
+        ]
+
+        metadata = BookMetadataService.lookup(ISBN)
+
+        # 先に設定された取得元の値を優先し、空欄だけを補う
+        assert metadata["title"] == "部分的な本"
+        assert metadata["publisher"] == "出版社"
+        assert metadata["published_date"] == datetime.date(2020, 1, 1)
+        assert metadata["published_date_precision"] == "year"
+
+    def test_late_result_fills_cache_after_budget(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [
+            provider_path(PartialProvider),
+            provider_path(SlowCompleteProvider),
+        ]
+        settings.BOOK_METADATA_LATENCY_BUDGET = 0.05
+
+        metadata = BookMetadataService.lookup(ISBN)
+        assert metadata["publisher"] == ""
+
+        time.sleep(0.5)
+        cached = BookMetadataService.lookup(ISBN)
+        assert cached["title"] == "部分的な本"
+        assert cached["publisher"] == "出版社"
+
+    def test_not_found_when_every_provider_answers_none(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [
+            provider_path(NotFoundProvider),
+            provider_path(FailingProvider),
+        ]
+
+        assert BookMetadataService.lookup(ISBN) is None
+
+    def test_error_when_no_provider_answers(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [provider_path(FailingProvider)]
+
+        with pytest.raises(BookMetadataFetchError):
+            BookMetadataService.lookup(ISBN)
+
+    def test_provider_stats_are_recorded(self, settings):
+        settings.BOOK_METADATA_PROVIDERS = [
+            provider_path(CompleteProvider),
+            provider_path(FailingProvider),
+        ]
+
+        BookMetadataService.lookup(ISBN)
+        time.sleep(0.05)
+
+        complete = BookMetadataService.cache.provider_stats("complete")
+        failing = BookMetadataService.cache.provider_stats("failing")
+        assert complete["calls"] == 1
+        assert complete["success_rate"] == 1.0
+        assert failing["failure"] == 1
+        assert failing["success_rate"] == 0.0
+
+
+def test_merge_records_keeps_primary_values():
+    merged = merge_records(COMPLETE, PARTIAL)
+    assert merged == COMPLETE
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("20200115", (datetime.date(2020, 1, 15), "day")),
+        ("202001", (datetime.date(2020, 1, 1), "month")),
+        ("2020.1", (datetime.date(2020, 1, 1), "month")),
+        ("2020", (datetime.date(2020, 1, 1), "year")),
+        ("", (None, "unknown")),
+    ],
+)
+def test_parse_pubdate(value, expected):
+    assert parse_pubdate(value) == expected
+
+
+class TestOpenBDProvider:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_fetch_parses_summary(self, mock_get):
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = [
+            {
+                "summary": {
+                    "title": "テスト本",
+                    "author": "山田太郎／著 鈴木花子／訳",
+                    "publisher": "テスト出版",
+                    "pubdate": "20200115",
+                    "cover": "https://cover.openbd.jp/9784000000000.jpg",
+                },
+                "onix": {
+                    "CollateralDetail": {"TextContent": [{"Text": "内容紹介です"}]}
+                },
+            }
+        ]
+
+        record = OpenBDProvider().fetch(ISBN)
+
+        assert record["title"] == "テスト本"
+        assert record["author"] == "山田太郎, 鈴木花子"
+        assert record["published_date"] == datetime.date(2020, 1, 15)
+        assert record["description"] == "内容紹介です"
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_fetch_returns_none_for_unknown_isbn(self, mock_get):
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = [None]
+
+        assert OpenBDProvider().fetch(ISBN) is None
+
+
+class TestNDLProvider:
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_fetch_parses_rss_item(self, mock_get):
+        mock_get.return_value = Mock(
+            status_code=200,
+            content="""<?xml version="1.0" encoding="UTF-8"?>
+            <rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"
+                 xmlns:dcterms="http://purl.org/dc/terms/">
+              <channel>
+                <item>
+                  <title>テスト本</title>
+                  <dc:title>テスト本</dc:title>
+                  <dc:creator>山田, 太郎</dc:creator>
+                  <dc:creator>鈴木, 花子</dc:creator>
+                  <dc:publisher>テスト出版</dc:publisher>
+                  <dcterms:issued>2020.1</dcterms:issued>
+                </item>
+              </channel>
+            </rss>""".encode(),
+        )
+
+        record = NDLProvider().fetch(ISBN)
+
+        assert record["title"] == "テスト本"
+        assert record["author"] == "山田 太郎, 鈴木 花子"
+        assert record["publisher"] == "テスト出版"
+        assert record["published_date_precision"] == "month"
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_fetch_returns_none_without_items(self, mock_get):
+        mock_get.return_value = Mock(
+            status_code=200, content=b"<rss><channel></channel></rss>"
+        )
+
+        assert NDLProvider().fetch(ISBN) is None
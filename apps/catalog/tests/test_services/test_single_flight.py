@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import cache
+
+from apps.catalog.services.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestSingleFlightWithinProcess:
+
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight(namespace="test")
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(single_flight.do, "key", fn) for _ in range(5)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+
+    def test_exception_is_shared_and_next_call_runs_again(self):
+        single_flight = SingleFlight(namespace="test")
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            single_flight.do("key", fail)
+        assert single_flight.do("key", lambda: "ok") == "ok"
+
+
+class TestSingleFlightAcrossWorkers:
+
+    def test_waits_for_result_written_by_other_worker(self):
+        single_flight = SingleFlight(namespace="test", poll_interval=0.01)
+        # 他のワーカーがロックを保持している状態を再現する
+        cache.add("test:lock:key", 1)
+        threading.Timer(0.1, lambda: cache.set("result", "from other worker")).start()
+
+        def fn():
+            raise AssertionError("should not be called")
+
+        result = single_flight.do("key", fn, peek=lambda: cache.get("result"))
+
+        assert result == "from other worker"
+
+    def test_runs_itself_after_wait_timeout(self):
+        single_flight = SingleFlight(
+            namespace="test", wait_timeout=0.05, poll_interval=0.01
+        )
+        cache.add("test:lock:key", 1)
+
+        result = single_flight.do("key", lambda: "own", peek=lambda: None)
+
+        assert result == "own"
+
+    def test_lock_is_released_after_execution(self):
+        single_flight = SingleFlight(namespace="test")
+
+        single_flight.do("key", lambda: "value", peek=lambda: None)
+
+        assert cache.get("test:lock:key") is None
+
+    def test_does_not_release_lock_taken_over_by_other_worker(self):
+        single_flight = SingleFlight(namespace="test")
+
+        def fn():
+            # lock_timeout が過ぎ、他のワーカーがロックを取り直した状態を再現する
+            cache.set("test:lock:key", "other-token")
+            return "value"
+
+        single_flight.do("key", fn, peek=lambda: None)
+
+        assert cache.get("test:lock:key") == "other-token"
@@ -3,7 +3,17 @@ from datetime import date
 import pytest
 
 from apps.catalog.models import Book
-from apps.catalog.utils import parse_published_date
+from apps.catalog.normalization import normalize_search_text
+from apps.catalog.utils import (
+    is_valid_isbn10,
+    is_valid_isbn13,
+    isbn10_to_isbn13,
+    isbn13_check_digit,
+    isbn_prefix_upper_bound,
+    normalize_isbn,
+    parse_published_date,
+    parse_published_dates,
+)
 
 
 @pytest.mark.parametrize(
@@ -23,3 +33,91 @@ def test_parse_published_date(input_str, expected_date, expected_precision):
     result_date, result_precision = parse_published_date(input_str)
     assert result_date == expected_date
     assert result_precision == expected_precision
+
+
+def test_parse_published_dates_matches_parse_published_date():
+    values = [
+        "2025-08-21",
+        "2025-8-1",
+        "2025-08- 1",
+        "2025-08",
+        "2025",
+        "2025",
+        "",
+        None,
+        "invalid",
+        "2025-13-01",
+        "2025-02-30",
+        "0000",
+        "20250821",
+        "2025-08-21T00:00",
+        "２０２５",
+    ]
+
+    assert parse_published_dates(values) == [parse_published_date(v) for v in values]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("9784000000000", "9784000000000"),
+        ("978-4-00-000000-0", "9784000000000"),
+        ("4-00-000000-4", "9784000000000"),
+        ("123456789X", "9781234567897"),
+        ("123456789x", "9781234567897"),
+        ("9784000000001", None),  # チェックディジット不正
+        ("4000000009", None),  # チェックディジット不正
+        ("978400000000", None),  # 桁数不足
+        ("abcdefghijklm", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_normalize_isbn(value, expected):
+    assert normalize_isbn(value) == expected
+
+
+def test_isbn13_check_digit():
+    assert isbn13_check_digit("978400000000") == "0"
+    assert isbn13_check_digit("978123456789") == "7"
+
+
+def test_is_valid_isbn13_and_isbn10():
+    assert is_valid_isbn13("9781234567897")
+    assert not is_valid_isbn13("9781234567890")
+    assert is_valid_isbn10("123456789X")
+    assert not is_valid_isbn10("1234567890")
+
+
+def test_isbn10_to_isbn13():
+    assert isbn10_to_isbn13("4000000004") == "9784000000000"
+
+
+@pytest.mark.parametrize(
+    "prefix, expected",
+    [
+        ("97848", "97849"),
+        ("97849", "9785"),
+        ("978499", "9785"),
+        ("9", None),
+        ("999", None),
+        ("0", "1"),
+    ],
+)
+def test_isbn_prefix_upper_bound(prefix, expected):
+    assert isbn_prefix_upper_bound(prefix) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Python入門", "python入門"),
+        ("ぱいそん", "パイソン"),
+        ("ﾊﾟｲｿﾝ", "パイソン"),
+        ("ＶＯＬ．２", "vol.2"),
+        ("  山田\u3000 太郎 ", "山田 太郎"),
+        ("", ""),
+    ],
+)
+def test_normalize_search_text(value, expected):
+    assert normalize_search_text(value) == expected
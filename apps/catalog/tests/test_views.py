@@ -1,17 +1,29 @@
 import datetime
+import io
+import tempfile
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from apps.catalog.models import Book, Copy, StorageLocation
+from apps.catalog.services.cover_service import get_cover_client
+from apps.catalog.services.metadata_client import get_google_books_client
 
 User = get_user_model()
 LIBRARIAN = User.UserRole.LIBRARIAN
 GENERAL = User.UserRole.GENERAL
 
 
+# HTTP をモックしているテストでは、取得元を Google Books API のみにする
+GOOGLE_BOOKS_ONLY = ["apps.catalog.services.metadata_providers.GoogleBooksProvider"]
+
+
+@override_settings(BOOK_METADATA_PROVIDERS=GOOGLE_BOOKS_ONLY)
 class TestISBNCheckView(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -22,7 +34,7 @@ class TestISBNCheckView(TestCase):
             username="gen", password="pass", role=GENERAL
         )
         cls.book = Book.objects.create(
-            isbn="1234567890123",
+            isbn="1234567890128",
             title="hogehoge",
             author="hugahuga",
             publisher="A出版社",
@@ -31,6 +43,10 @@ class TestISBNCheckView(TestCase):
             edition=1,
         )
 
+    def setUp(self):
+        cache.clear()
+        get_google_books_client.cache_clear()
+
     def test_redirect_if_not_logged_in(self):
         response = self.client.get(reverse("catalog:isbn_check"))
         self.assertRedirects(
@@ -56,17 +72,48 @@ class TestISBNCheckView(TestCase):
             response, reverse("catalog:copy_new", kwargs={"book_id": self.book.id})
         )
 
-    def test_redirect_to_book_create_from_isbn_if_book_does_not_exist(self):
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_redirect_to_book_create_from_isbn_if_book_does_not_exist(self, mock_get):
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = {"totalItems": 0}
+        self.client.login(username="lib", password="pass")
+        response = self.client.post(
+            reverse("catalog:isbn_check"), data={"isbn": "9999999999994"}
+        )
+        self.assertRedirects(
+            response,
+            reverse("catalog:book_create_from_isbn", kwargs={"isbn": "9999999999994"}),
+        )
+
+    @patch("apps.catalog.views.BookMetadataService.prefetch")
+    def test_isbn10_is_converted_to_isbn13(self, mock_prefetch):
         self.client.login(username="lib", password="pass")
         response = self.client.post(
-            reverse("catalog:isbn_check"), data={"isbn": "9999999999999"}
+            reverse("catalog:isbn_check"), data={"isbn": "4-00-000000-4"}
         )
         self.assertRedirects(
             response,
-            reverse("catalog:book_create_from_isbn", kwargs={"isbn": "9999999999999"}),
+            reverse("catalog:book_create_from_isbn", kwargs={"isbn": "9784000000000"}),
+            fetch_redirect_response=False,
+        )
+        mock_prefetch.assert_called_once_with("9784000000000")
+
+    @patch("apps.catalog.views.BookMetadataService.prefetch")
+    def test_existing_book_is_not_prefetched(self, mock_prefetch):
+        self.client.login(username="lib", password="pass")
+        self.client.post(reverse("catalog:isbn_check"), data={"isbn": self.book.isbn})
+        mock_prefetch.assert_not_called()
+
+    def test_invalid_check_digit_is_rejected(self):
+        self.client.login(username="lib", password="pass")
+        response = self.client.post(
+            reverse("catalog:isbn_check"), data={"isbn": "9784000000001"}
         )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("isbn", response.context["form"].errors)
 
 
+@override_settings(BOOK_METADATA_PROVIDERS=GOOGLE_BOOKS_ONLY)
 class TestBookCreateView(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -75,11 +122,13 @@ class TestBookCreateView(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
+        get_google_books_client.cache_clear()
         self.client.login(username="lib", password="pass")
 
-    @patch("apps.catalog.views.requests.get")
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
     def test_get_initial_with_valid_isbn(self, mock_get):
-        isbn = "1234567890"
+        isbn = "123456789X"  # ISBN-10 は ISBN-13 に変換される
         mock_resp = Mock(status_code=200)
         mock_resp.json.return_value = {
             "totalItems": 1,
@@ -103,7 +152,7 @@ class TestBookCreateView(TestCase):
         self.assertEqual(response.status_code, 200)
         form = response.context["form"]
         initial = form.initial
-        self.assertEqual(initial["isbn"], isbn)
+        self.assertEqual(initial["isbn"], "9781234567897")
         self.assertEqual(initial["title"], "Test Book")
         self.assertIn("Author1, Author2", initial["author"])
         self.assertEqual(initial["publisher"], "Pub")
@@ -113,9 +162,26 @@ class TestBookCreateView(TestCase):
         )
         self.assertEqual(initial["image_url"], "http://image.jpg")
 
-    @patch("apps.catalog.views.requests.get")
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_get_initial_uses_cache_on_second_request(self, mock_get):
+        isbn = "9784000000000"
+        mock_resp = Mock(status_code=200)
+        mock_resp.json.return_value = {
+            "totalItems": 1,
+            "items": [{"volumeInfo": {"title": "Cached Book"}}],
+        }
+        mock_get.return_value = mock_resp
+        url = reverse("catalog:book_create_from_isbn", kwargs={"isbn": isbn})
+
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(response.context["form"].initial["title"], "Cached Book")
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
     def test_get_initial_with_no_items(self, mock_get):
-        isbn = "0000000"
+        isbn = "9784000000017"
         mock_resp = Mock(status_code=200)
         mock_resp.json.return_value = {"totalItems": 0}
         mock_get.return_value = mock_resp
@@ -126,9 +192,19 @@ class TestBookCreateView(TestCase):
         storage = list(response.context["messages"])
         self.assertTrue(any("見つかりません" in m.message for m in storage))
 
-    @patch("apps.catalog.views.requests.get")
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_get_initial_with_invalid_isbn_does_not_call_api(self, mock_get):
+        response = self.client.get(
+            reverse("catalog:book_create_from_isbn", kwargs={"isbn": "0000000"})
+        )
+        mock_get.assert_not_called()
+        storage = list(response.context["messages"])
+        self.assertTrue(any("見つかりません" in m.message for m in storage))
+
+    @override_settings(BOOK_METADATA_MAX_RETRIES=0)
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
     def test_get_initial_with_api_error(self, mock_get):
-        isbn = "error"
+        isbn = "9784000000000"
         mock_resp = Mock(status_code=500)
         mock_get.return_value = mock_resp
 
@@ -138,6 +214,22 @@ class TestBookCreateView(TestCase):
         storage = list(response.context["messages"])
         self.assertTrue(any("失敗しました" in m.message for m in storage))
 
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_get_initial_renders_empty_form_when_circuit_is_open(self, mock_get):
+        breaker = get_google_books_client().breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        response = self.client.get(
+            reverse("catalog:book_create_from_isbn", kwargs={"isbn": "9784000000000"})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_get.assert_not_called()
+        self.assertNotIn("title", response.context["form"].initial)
+        storage = list(response.context["messages"])
+        self.assertTrue(any("失敗しました" in m.message for m in storage))
+
     def test_post_creates_book_and_redirects(self):
         isbn = "1112223334445"
         data = {
@@ -214,6 +306,71 @@ class TestCopyCreateView(TestCase):
             response, reverse("catalog:copy_confirm", kwargs={"pk": copy.pk})
         )
 
+    def test_post_with_quantity_creates_copies_at_once(self):
+        self.client.login(username="lib", password="pass")
+        url = reverse("catalog:copy_new", kwargs={"book_id": self.book.id})
+        data = {
+            "location": self.location.id,
+            "status": Copy.Status.AVAILABLE,
+            "quantity": 30,
+        }
+        response = self.client.post(url, data)
+
+        copies = Copy.objects.filter(book=self.book).order_by("pk")
+        self.assertEqual(copies.count(), 30)
+        self.assertTrue(all(c.location == self.location for c in copies))
+
+        query = "&".join(f"ids={copy.pk}" for copy in copies)
+        self.assertRedirects(
+            response, f"{reverse('catalog:copy_bulk_confirm')}?{query}"
+        )
+
+    def test_post_with_invalid_quantity_shows_error(self):
+        self.client.login(username="lib", password="pass")
+        url = reverse("catalog:copy_new", kwargs={"book_id": self.book.id})
+        data = {
+            "location": self.location.id,
+            "status": Copy.Status.AVAILABLE,
+            "quantity": 101,
+        }
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("quantity", response.context["form"].errors)
+        self.assertFalse(Copy.objects.exists())
+
+
+class TestCopyBulkConfirmView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.librarian = User.objects.create_user(
+            username="lib", password="pass", role=LIBRARIAN
+        )
+        cls.book = Book.objects.create(
+            isbn="1234567890123",
+            title="Test Book",
+            author="Author",
+            publisher="Pub",
+            published_date=datetime.date(2024, 1, 1),
+            edition=1,
+        )
+        cls.location = StorageLocation.objects.create(name="第1書庫")
+        cls.copies = Copy.objects.bulk_create(
+            Copy(book=cls.book, location=cls.location, status=Copy.Status.AVAILABLE)
+            for _ in range(3)
+        )
+
+    def test_lists_registered_copies(self):
+        self.client.login(username="lib", password="pass")
+        ids = [copy.pk for copy in self.copies[:2]]
+        response = self.client.get(
+            reverse("catalog:copy_bulk_confirm"), {"ids": ids + ["x"]}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c.pk for c in response.context["copies"]], ids)
+        self.assertContains(response, "2 冊登録しました")
+
 
 class TestCopyConfirmView(TestCase):
     @classmethod
@@ -258,3 +415,155 @@ class TestCopyConfirmView(TestCase):
         self.client.login(username="lib", password="pass")
         response = self.client.get(self.url)
         self.assertEqual(response.context["copy"], self.copy)
+
+
+class TestCopyManifestUploadView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.librarian = User.objects.create_user(
+            username="lib", password="pass", role=LIBRARIAN
+        )
+        cls.general = User.objects.create_user(
+            username="gen", password="pass", role=GENERAL
+        )
+        cls.book = Book.objects.create(
+            isbn="1234567890128",
+            title="Test Book",
+            author="Author",
+            publisher="Pub",
+            published_date=datetime.date(2024, 1, 1),
+            edition=1,
+        )
+        cls.location = StorageLocation.objects.create(name="第1書庫")
+        cls.url = reverse("catalog:copy_manifest_upload")
+
+    def test_general_user_forbidden(self):
+        self.client.login(username="gen", password="pass")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_csv_upload_creates_copies_and_streams_report(self):
+        self.client.login(username="lib", password="pass")
+        manifest = SimpleUploadedFile(
+            "manifest.csv",
+            "isbn,location,quantity\n"
+            "1234567890128,第1書庫,2\n"
+            "1234567890128,,1\n"
+            "9784000000000,第1書庫,1\n".encode("utf-8"),
+            content_type="text/csv",
+        )
+        response = self.client.post(
+            self.url, {"file": manifest, "status": Copy.Status.AVAILABLE}
+        )
+
+        self.assertTrue(response.streaming)
+        report = b"".join(response.streaming_content).decode("utf-8")
+        lines = report.splitlines()
+        self.assertEqual(lines[0], "行,isbn,location,quantity,理由")
+        self.assertIn("3,1234567890128,,1,保存場所が指定されていません", lines)
+        self.assertIn("4,9784000000000,第1書庫,1,書籍が登録されていません", lines)
+        self.assertIn("登録: 2 冊 / 登録できなかった行: 2 行", lines[-1])
+        self.assertEqual(Copy.objects.filter(book=self.book).count(), 2)
+
+    def test_ndjson_upload_uses_default_location(self):
+        self.client.login(username="lib", password="pass")
+        manifest = SimpleUploadedFile(
+            "manifest.ndjson",
+            b'{"isbn": "1234567890128", "quantity": 3}\n',
+        )
+        response = self.client.post(
+            self.url,
+            {
+                "file": manifest,
+                "location": self.location.id,
+                "status": Copy.Status.AVAILABLE,
+            },
+        )
+        b"".join(response.streaming_content)
+
+        self.assertEqual(
+            Copy.objects.filter(book=self.book, location=self.location).count(), 3
+        )
+
+
+class TestBookCoverView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
+            isbn="1234567890128",
+            title="Test Book",
+            author="Author",
+            publisher="Pub",
+            published_date=datetime.date(2024, 1, 1),
+            image_url="https://example.com/cover.png",
+        )
+        cls.url = reverse("catalog:book_cover", args=[cls.book.pk, "thumb"])
+        User.objects.create_user(username="gen", password="pass", role=GENERAL)
+
+    def setUp(self):
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(
+            override_settings(
+                MEDIA_ROOT=media_root,
+                BOOK_METADATA_MAX_RETRIES=0,
+                BOOK_COVER_ALLOWED_HOSTS=["example.com"],
+            )
+        )
+        get_cover_client.cache_clear()
+        self.client.login(username="gen", password="pass")
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_serves_cached_thumbnail_with_etag(self, mock_get):
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 450), "navy").save(buffer, format="PNG")
+        mock_get.return_value = Mock(
+            status_code=200,
+            headers={},
+            iter_content=Mock(return_value=[buffer.getvalue()]),
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertIn("max-age=", response["Cache-Control"])
+        self.assertFalse(response["ETag"].startswith("W/"))
+        b"".join(response.streaming_content)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_redirects_to_original_when_fetch_fails(self, mock_get):
+        mock_get.return_value = Mock(status_code=404)
+
+        response = self.client.get(self.url)
+
+        self.assertRedirects(
+            response, self.book.image_url, fetch_redirect_response=False
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, f"/accounts/login/?next={self.url}")
+
+    @patch("apps.catalog.services.metadata_client.requests.Session.get")
+    def test_disallowed_host_is_neither_fetched_nor_redirected(self, mock_get):
+        Book.objects.filter(pk=self.book.pk).update(
+            image_url="http://169.254.169.254/latest/meta-data/"
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+        mock_get.assert_not_called()
+
+    def test_unknown_size_returns_404(self):
+        response = self.client.get(
+            reverse("catalog:book_cover", args=[self.book.pk, "huge"])
+        )
+        self.assertEqual(response.status_code, 404)
@@ -3,8 +3,11 @@ from django.urls import path
 from apps.catalog.views import (
     ISBNCheckView,
     BookCreateView,
+    BookCoverView,
     CopyCreateView,
     CopyConfirmView,
+    CopyBulkConfirmView,
+    CopyManifestUploadView,
 )
 
 app_name = "catalog"
@@ -14,6 +17,15 @@ urlpatterns = [
     path(
         "books/new/<str:isbn>/", BookCreateView.as_view(), name="book_create_from_isbn"
     ),
+    path(
+        "books/<int:pk>/cover/<str:size>/", BookCoverView.as_view(), name="book_cover"
+    ),
     path("copies/new/<int:book_id>/", CopyCreateView.as_view(), name="copy_new"),
     path("copies/<int:pk>/confirm/", CopyConfirmView.as_view(), name="copy_confirm"),
+    path(
+        "copies/manifest/",
+        CopyManifestUploadView.as_view(),
+        name="copy_manifest_upload",
+    ),
+    path("copies/confirm/", CopyBulkConfirmView.as_view(), name="copy_bulk_confirm"),
 ]
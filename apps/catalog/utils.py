@@ -1,4 +1,5 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
 
 from apps.catalog.models import Book
 
@@ -35,3 +36,131 @@ def parse_published_date(published_date_str: str):
                 precision = Book.PublishedDatePrecision.UNKNOWN
 
     return published_date, precision
+
+
+# parse_published_date が受け付ける "YYYY", "YYYY-MM", "YYYY-MM-DD" を1回の照合で判定する。
+# 年・月・日の部分は strptime の %Y, %m, %d と同じパターンにしている
+PUBLISHED_DATE_RE = re.compile(
+    r"(\d\d\d\d)"
+    r"(?:-(1[0-2]|0[1-9]|[1-9])"
+    r"(?:-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9]))?)?"
+)
+
+
+def parse_published_dates(published_date_strs):
+    """
+    出版日の文字列の列をまとめて解析する、一括取り込み向けの parse_published_date。
+    strptime を最大3回試す代わりに正規表現1回で書式と精度を判定し、
+    同じ文字列（"2020" など）は1度だけ解析する。
+
+    Args:
+        published_date_strs (Iterable[str]): parse_published_date と同じ書式の文字列
+
+    Returns:
+        list[tuple]: 入力と同じ順の (datetime.date or None, Book.PublishedDatePrecision)
+    """
+    unknown = (None, Book.PublishedDatePrecision.UNKNOWN)
+    fullmatch = PUBLISHED_DATE_RE.fullmatch
+    parsed = {}
+    results = []
+    for value in published_date_strs:
+        if not value:
+            results.append(unknown)
+            continue
+        result = parsed.get(value)
+        if result is None:
+            match = fullmatch(value)
+            result = unknown
+            if match:
+                year, month, day = match.groups()
+                try:
+                    published_date = date(int(year), int(month or 1), int(day or 1))
+                except ValueError:
+                    pass
+                else:
+                    if day:
+                        precision = Book.PublishedDatePrecision.DAY
+                    elif month:
+                        precision = Book.PublishedDatePrecision.MONTH
+                    else:
+                        precision = Book.PublishedDatePrecision.YEAR
+                    result = (published_date, precision)
+            parsed[value] = result
+        results.append(result)
+    return results
+
+
+ISBN_SEPARATORS_RE = re.compile(r"[\s\-]")
+
+
+def isbn13_check_digit(digits: str) -> str:
+    """
+    ISBN-13 の先頭12桁からチェックディジットを計算する。
+    """
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digits[:12]))
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_isbn13(isbn: str) -> bool:
+    """
+    13桁の数字で、チェックディジットが正しい場合に True を返す。
+    """
+    return len(isbn) == 13 and isbn.isdigit() and isbn13_check_digit(isbn) == isbn[-1]
+
+
+def is_valid_isbn10(isbn: str) -> bool:
+    """
+    9桁の数字＋チェックディジット（0-9 または X）で、チェックディジットが正しい場合に True を返す。
+    """
+    if len(isbn) != 10 or not isbn[:9].isdigit():
+        return False
+    check = isbn[-1].upper()
+    if check != "X" and not check.isdigit():
+        return False
+    total = sum((10 - i) * int(d) for i, d in enumerate(isbn[:9]))
+    total += 10 if check == "X" else int(check)
+    return total % 11 == 0
+
+
+def isbn10_to_isbn13(isbn10: str) -> str:
+    """
+    ISBN-10 を 978 で始まる ISBN-13 に変換する（チェックディジットは再計算）。
+    """
+    digits = "978" + isbn10[:9]
+    return digits + isbn13_check_digit(digits)
+
+
+def isbn_prefix_upper_bound(prefix: str):
+    """
+    数字だけの ISBN の前方一致を範囲の条件（prefix <= isbn < 上限）にするための上限を返す。
+    prefix を数値として1増やした値（末尾の 9 は繰り上げて取り除く）で、
+    記号の並び順が照合順序によって変わる文字を使わない。
+
+    Returns:
+        str or None: 上限の値。prefix がすべて 9 の場合は上限がないため None
+    """
+    stripped = prefix.rstrip("9")
+    if not stripped:
+        return None
+    return stripped[:-1] + str(int(stripped[-1]) + 1)
+
+
+def normalize_isbn(value: str):
+    """
+    入力された ISBN からハイフン・空白を取り除き、13桁の ISBN に正規化する。
+
+    Args:
+        value (str): ISBN-10 または ISBN-13（ハイフン・空白を含んでもよい）
+
+    Returns:
+        str or None: 正規化した ISBN-13。形式やチェックディジットが不正な場合は None
+    """
+    if not value:
+        return None
+
+    isbn = ISBN_SEPARATORS_RE.sub("", value).upper()
+    if is_valid_isbn13(isbn):
+        return isbn
+    if is_valid_isbn10(isbn):
+        return isbn10_to_isbn13(isbn)
+    return None
@@ -1,16 +1,32 @@
-import requests
+import codecs
+import csv
 
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.generic import CreateView, DetailView
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django.views.generic import CreateView, DetailView, ListView
 from django.views.generic.edit import FormView
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from apps.core.mixins import IsLibrarianMixin
-from apps.catalog.forms import ISBNCheckForm
+from apps.catalog.forms import CopyForm, CopyManifestForm, ISBNCheckForm
 from apps.catalog.models import Book, Copy
-from apps.catalog.utils import parse_published_date
+from apps.catalog.services.book_metadata_service import (
+    BookMetadataFetchError,
+    BookMetadataService,
+)
+from apps.catalog.services.cover_service import CoverService, CoverUnavailableError
+from apps.catalog.services.copy_manifest import (
+    CopyManifestImporter,
+    iter_csv_rows,
+    iter_ndjson_rows,
+)
 
 
 # Create your views here.
@@ -24,6 +40,8 @@ class ISBNCheckView(LoginRequiredMixin, IsLibrarianMixin, FormView):
             book = Book.objects.get(isbn=isbn)
             return redirect("catalog:copy_new", book_id=book.id)
         except Book.DoesNotExist:
+            # 登録画面へのリダイレクト中に書誌情報を取得し、キャッシュを温めておく
+            BookMetadataService.prefetch(isbn)
             return redirect("catalog:book_create_from_isbn", isbn=isbn)
 
 
@@ -46,42 +64,21 @@ class BookCreateView(LoginRequiredMixin, IsLibrarianMixin, CreateView):
         initial = super().get_initial()
         isbn = self.kwargs.get("isbn")
         if isbn:
-            # Google Books APIから情報取得
-            url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                if data["totalItems"] > 0:
-                    volume_info = data["items"][0]["volumeInfo"]
-                    published_date_str = volume_info.get("publishedDate", "")
-                    published_date, published_date_precision = parse_published_date(
-                        published_date_str
-                    )
+            # 書誌情報サービス（Google Books API など）から情報取得（キャッシュ済みならAPIは呼ばない）
+            try:
+                metadata = BookMetadataService.lookup(isbn)
+            except BookMetadataFetchError:
+                messages.error(
+                    self.request, "書誌情報サービスからの情報取得に失敗しました。"
+                )
+            else:
+                if metadata:
                     # 初期値としてフォームに埋め込む
-                    initial.update(
-                        {
-                            "isbn": isbn,
-                            "title": volume_info.get("title", ""),
-                            "author": ", ".join(
-                                volume_info.get("authors", [])
-                            ),  # 複数の著者をカンマ区切りの文字列に変換
-                            "publisher": volume_info.get("publisher", ""),
-                            "published_date": published_date,
-                            "published_date_precision": published_date_precision,
-                            "image_url": volume_info.get("imageLinks", {}).get(
-                                "thumbnail", ""
-                            ),
-                            "description": volume_info.get("description", ""),
-                        }
-                    )
+                    initial.update(metadata)
                 else:
                     messages.warning(
                         self.request, f"ISBN {isbn} の書籍情報は見つかりませんでした。"
                     )
-            else:
-                messages.error(
-                    self.request, "Google Books API からの情報取得に失敗しました。"
-                )
         return initial
 
     def get_success_url(self):
@@ -90,7 +87,7 @@ class BookCreateView(LoginRequiredMixin, IsLibrarianMixin, CreateView):
 
 class CopyCreateView(LoginRequiredMixin, IsLibrarianMixin, CreateView):
     model = Copy
-    fields = ["location", "status"]
+    form_class = CopyForm
     template_name = "catalog/copy_form.html"
 
     def dispatch(self, request, *args, **kwargs):
@@ -100,7 +97,23 @@ class CopyCreateView(LoginRequiredMixin, IsLibrarianMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.book = self.book
-        return super().form_valid(form)
+        quantity = form.cleaned_data["quantity"]
+        if quantity == 1:
+            return super().form_valid(form)
+
+        # 複数冊は1回の bulk_create でまとめて登録する
+        copies = [
+            Copy(
+                book=self.book,
+                location=form.cleaned_data["location"],
+                status=form.cleaned_data["status"],
+            )
+            for _ in range(quantity)
+        ]
+        with transaction.atomic():
+            copies = Copy.objects.bulk_create(copies)
+        query = "&".join(f"ids={copy.pk}" for copy in copies)
+        return redirect(f"{reverse('catalog:copy_bulk_confirm')}?{query}")
 
     def get_success_url(self):
         return reverse("catalog:copy_confirm", kwargs={"pk": self.object.pk})
@@ -115,3 +128,113 @@ class CopyConfirmView(LoginRequiredMixin, IsLibrarianMixin, DetailView):
     model = Copy
     template_name = "catalog/copy_confirm.html"
     context_object_name = "copy"
+
+
+class CopyBulkConfirmView(LoginRequiredMixin, IsLibrarianMixin, ListView):
+    """
+    まとめて登録した蔵書の確認画面。登録した蔵書の ID をクエリ文字列 ids で受け取る。
+    """
+
+    model = Copy
+    template_name = "catalog/copy_bulk_confirm.html"
+    context_object_name = "copies"
+
+    def get_queryset(self):
+        ids = [pk for pk in self.request.GET.getlist("ids") if pk.isdigit()]
+        return (
+            Copy.objects.filter(pk__in=ids)
+            .select_related("book", "location")
+            .order_by("pk")
+        )
+
+
+class Echo:
+    """csv.writer の書き込み先として、書き込まれた文字列をそのまま返す"""
+
+    def write(self, value):
+        return value
+
+
+class CopyManifestUploadView(LoginRequiredMixin, IsLibrarianMixin, FormView):
+    """
+    納品リスト（CSV / NDJSON）から蔵書をまとめて登録し、登録できなかった行を
+    CSV のレポートとしてストリーミングで返す。
+    """
+
+    template_name = "catalog/copy_manifest_form.html"
+    form_class = CopyManifestForm
+
+    REPORT_HEADER = ["行", "isbn", "location", "quantity", "理由"]
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        # アップロードされたファイルは1行ずつ読み、全体をメモリに載せない
+        lines = codecs.iterdecode(upload, "utf-8-sig")
+        if upload.name.lower().endswith((".ndjson", ".jsonl")):
+            rows = iter_ndjson_rows(lines)
+        else:
+            rows = iter_csv_rows(lines)
+
+        importer = CopyManifestImporter(
+            status=form.cleaned_data["status"],
+            default_location=form.cleaned_data["location"],
+        )
+        response = StreamingHttpResponse(
+            self.iter_report(importer, rows), content_type="text/csv; charset=utf-8"
+        )
+        response["Content-Disposition"] = 'attachment; filename="manifest_report.csv"'
+        return response
+
+    def iter_report(self, importer, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.REPORT_HEADER)
+        for line_number, row, reason in importer.run(rows):
+            yield writer.writerow(
+                [
+                    line_number,
+                    row.get("isbn", ""),
+                    row.get("location", ""),
+                    row.get("quantity", ""),
+                    reason,
+                ]
+            )
+        yield writer.writerow(
+            [
+                "",
+                "",
+                "",
+                "",
+                f"登録: {importer.created} 冊 / 登録できなかった行: {importer.rejected} 行",
+            ]
+        )
+
+
+class BookCoverView(LoginRequiredMixin, View):
+    """
+    書影のプロキシ。外部の画像を一度だけ取得して縮小版を保存し、以降は保存した
+    ファイルを強い ETag と長期の Cache-Control 付きで返す。
+    取得できない場合は、許可された配信元であれば元の image_url にリダイレクトする。
+    """
+
+    def get(self, request, pk, size):
+        if size not in settings.BOOK_COVER_SIZES:
+            raise Http404("unknown cover size")
+        book = get_object_or_404(Book, pk=pk)
+
+        try:
+            path, etag = CoverService.get_variant(book, size)
+        except CoverUnavailableError:
+            if CoverService.is_allowed_url(book.image_url):
+                return redirect(book.image_url)
+            raise Http404("cover is not available")
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = FileResponse(
+                default_storage.open(path, "rb"), content_type="image/jpeg"
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = (
+            f"public, max-age={settings.BOOK_COVER_CACHE_MAX_AGE}"
+        )
+        return response
@@ -0,0 +1,30 @@
+from django.db import models
+from django.db.models import OrderBy
+
+
+class NullsOrderingIndex(models.Index):
+    """
+    NULL の並び（nulls_first / nulls_last）を指定した並び替えの式を使える索引。
+
+    SQLite は索引の定義で NULLS FIRST / NULLS LAST を使えないため、SQLite では
+    指定を外して作成する。SQLite の NULL は最小の値として並ぶため、昇順の
+    NULLS FIRST・降順の NULLS LAST は、指定を外しても同じ順序になる。
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        index = self
+        if schema_editor.connection.vendor == "sqlite":
+            index = self.clone()
+            index.expressions = tuple(
+                self._without_nulls_ordering(expression)
+                for expression in self.expressions
+            )
+        return super(NullsOrderingIndex, index).create_sql(
+            model, schema_editor, using=using, **kwargs
+        )
+
+    @staticmethod
+    def _without_nulls_ordering(expression):
+        if isinstance(expression, OrderBy):
+            return OrderBy(expression.expression, descending=expression.descending)
+        return expression
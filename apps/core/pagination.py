@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+
+class InvalidCursor(Exception):
+    """ページの位置を表すトークン（カーソル）を解釈できない場合に送出される例外"""
+
+
+class KeysetPage:
+    """
+    KeysetPaginator が返す1ページ分の結果。
+    前後のページはページ番号ではなく、カーソル（next_cursor / previous_cursor）で指定する。
+    """
+
+    def __init__(
+        self, object_list, next_cursor, previous_cursor, count=None, count_capped=False
+    ):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        # 件数を数えない場合は None。上限で打ち切った場合は count_capped が True
+        self.count = count
+        self.count_capped = count_capped
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    OFFSET と COUNT(*) を使わず、並べ替えのキーの値（キーセット）で続きを取得するページ分割。
+    ページが深くなっても、索引を使って次の per_page 件を読むだけで済む。
+
+    ordering は order_by と同じ形式のフィールド名のタプルで、最後は一意なキー（pk など）とする。
+    nullable に含めたフィールドの NULL は、昇順・降順とも末尾に並べる。
+    count_limit を指定すると、最大 count_limit 件まで数えた件数を KeysetPage.count に設定する。
+    """
+
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, queryset, per_page, ordering, nullable=(), count_limit=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = [
+            (name.removeprefix("-"), name.startswith("-")) for name in ordering
+        ]
+        self.nullable = set(nullable)
+        if self.keys[-1][0] in self.nullable:
+            raise ValueError(
+                "ordering の最後のキーは NULL にならない一意なキーにしてください"
+            )
+        self.count_limit = count_limit
+
+    def page(self, cursor=None):
+        """
+        cursor（前のページの next_cursor / previous_cursor）が指すページを返す。
+        cursor が None の場合は先頭のページを返す。
+
+        Raises:
+            InvalidCursor: cursor を解釈できない場合
+        """
+        direction, values = self.decode_cursor(cursor) if cursor else (self.NEXT, None)
+        forward = direction == self.NEXT
+
+        queryset = self.queryset.order_by(*self._order_by(forward))
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, forward))
+        # 1件多く読み、さらに続きがあるかを判定する
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = self.encode_cursor(self.NEXT, rows[-1])
+            if values is not None and (has_more or forward):
+                previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0])
+        count = self.count()
+        return KeysetPage(
+            rows,
+            next_cursor,
+            previous_cursor,
+            count=None if count is None else min(count, self.count_limit),
+            count_capped=count is not None and count > self.count_limit,
+        )
+
+    def count(self):
+        """
+        最大 count_limit + 1 件まで数える（超えたかを判定するため1件多く数える）。
+        count_limit が None なら数えずに None を返す。
+        """
+        if self.count_limit is None:
+            return None
+        return self.queryset.order_by()[: self.count_limit + 1].count()
+
+    def encode_cursor(self, direction, obj):
+        values = [getattr(obj, name) for name, _ in self.keys]
+        data = json.dumps([direction, values], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+            raise InvalidCursor(cursor) from e
+        if direction not in (self.NEXT, self.PREVIOUS) or not (
+            isinstance(values, list) and len(values) == len(self.keys)
+        ):
+            raise InvalidCursor(cursor)
+        # 改ざんされたカーソルで、クエリの実行時にエラーにならないよう型を確かめる
+        try:
+            values = [
+                self._to_python(name, value)
+                for (name, _), value in zip(self.keys, values)
+            ]
+        except (ValidationError, TypeError, ValueError) as e:
+            raise InvalidCursor(cursor) from e
+        return direction, values
+
+    def _to_python(self, name, value):
+        if value is None:
+            if name not in self.nullable:
+                raise ValueError(f"{name} must not be null")
+            return None
+        if isinstance(value, (list, dict)):
+            raise TypeError(f"{name} must be a scalar")
+        return self._field(name).to_python(value)
+
+    def _field(self, name):
+        opts = self.queryset.model._meta
+        if name == "pk":
+            return opts.pk
+        try:
+            return opts.get_field(name)
+        except FieldDoesNotExist:
+            # search_rank など、annotate した値で並べ替える場合
+            return self.queryset.query.annotations[name].output_field
+
+    def _order_by(self, forward):
+        ordering = []
+        for name, descending in self.keys:
+            expression = F(name)
+            # 前のページは逆順に読む（NULL は先頭になる）
+            expression = expression.desc if descending == forward else expression.asc
+            if name in self.nullable:
+                ordering.append(
+                    expression(nulls_last=True)
+                    if forward
+                    else expression(nulls_first=True)
+                )
+            else:
+                ordering.append(expression())
+        return ordering
+
+    def _beyond(self, values, forward, index=0):
+        """
+        並び順でカーソルの行より後（forward が False なら前）にある行の条件。
+        """
+        name, descending = self.keys[index]
+        value = values[index]
+        is_last = index == len(self.keys) - 1
+        rest = None if is_last else self._beyond(values, forward, index + 1)
+        nullable = name in self.nullable
+
+        if value is None:
+            # NULL は末尾にあるため、後ろには NULL の行だけ、前には NULL でない行がある
+            condition = Q(**{f"{name}__isnull": True}) & rest
+            if not forward:
+                condition |= Q(**{f"{name}__isnull": False})
+            return condition
+
+        lookup = "lt" if descending == forward else "gt"
+        condition = Q(**{f"{name}__{lookup}": value})
+        if nullable and forward:
+            condition |= Q(**{f"{name}__isnull": True})
+        if rest is not None:
+            condition |= Q(**{name: value}) & rest
+        return condition
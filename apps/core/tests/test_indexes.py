@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection
+from django.db.models import F
+
+from apps.catalog.models import Book
+from apps.core.indexes import NullsOrderingIndex
+
+
+def create_sql(index):
+    with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+        return str(index.create_sql(Book, editor))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_keeps_nulls_ordering_except_on_sqlite():
+    index = NullsOrderingIndex(
+        F("published_date").desc(nulls_last=True), "id", name="test_newest_idx"
+    )
+
+    sql = create_sql(index)
+
+    assert '"published_date" DESC' in sql
+    assert ("NULLS LAST" in sql) is (connection.vendor != "sqlite")
+
+
+def test_deconstructs_to_own_class():
+    index = NullsOrderingIndex(
+        F("published_date").desc(nulls_last=True), "id", name="test_newest_idx"
+    )
+
+    path, args, kwargs = index.deconstruct()
+
+    assert path == "apps.core.indexes.NullsOrderingIndex"
+    assert args[0].nulls_last
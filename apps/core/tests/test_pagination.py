@@ -0,0 +1,139 @@
+import base64
+import datetime
+import json
+
+import pytest
+from django.db.models import FloatField, Value
+
+from apps.catalog.models import Book
+from apps.core.pagination import InvalidCursor, KeysetPaginator
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def books():
+    dates = [
+        datetime.date(2024, 1, 1),
+        None,
+        datetime.date(2023, 1, 1),
+        datetime.date(2024, 1, 1),
+        None,
+        datetime.date(2022, 1, 1),
+        datetime.date(2024, 1, 1),
+    ]
+    return [
+        Book.objects.create(
+            isbn=f"{i:013d}",
+            title=f"本{i}",
+            author="著者",
+            published_date=published_date,
+        )
+        for i, published_date in enumerate(dates, 1)
+    ]
+
+
+def walk(paginator):
+    """先頭から最後まで next_cursor をたどり、ページごとの pk のリストを返す"""
+    pages = []
+    page = paginator.page()
+    while True:
+        pages.append(page)
+        if not page.has_next():
+            return pages
+        page = paginator.page(page.next_cursor)
+
+
+def test_walks_all_rows_in_order_without_duplicates(books):
+    paginator = KeysetPaginator(Book.objects.all(), 3, ("pk",))
+
+    pages = walk(paginator)
+
+    assert [[book.pk for book in page] for page in pages] == [
+        [b.pk for b in books[0:3]],
+        [b.pk for b in books[3:6]],
+        [books[6].pk],
+    ]
+    assert not pages[0].has_previous()
+    assert pages[-1].count is None
+
+
+@pytest.mark.parametrize(
+    "ordering", [("published_date", "pk"), ("-published_date", "pk")]
+)
+def test_nulls_are_last_in_both_directions(books, ordering):
+    paginator = KeysetPaginator(
+        Book.objects.all(), 2, ordering, nullable=("published_date",)
+    )
+
+    rows = [book for page in walk(paginator) for book in page]
+
+    dates = [book.published_date for book in rows]
+    assert dates[-2:] == [None, None]
+    assert dates[:-2] == sorted(dates[:-2], reverse=ordering[0].startswith("-"))
+    assert sorted(book.pk for book in rows) == [book.pk for book in books]
+
+
+def test_previous_cursor_returns_previous_page(books):
+    paginator = KeysetPaginator(
+        Book.objects.all(), 2, ("-published_date", "pk"), nullable=("published_date",)
+    )
+    pages = walk(paginator)
+
+    for before, after in zip(pages, pages[1:]):
+        previous = paginator.page(after.previous_cursor)
+        assert [book.pk for book in previous] == [book.pk for book in before]
+        assert previous.next_cursor is not None
+
+    first = paginator.page(pages[1].previous_cursor)
+    assert not first.has_previous()
+
+
+def test_count_is_capped(books):
+    assert (
+        KeysetPaginator(Book.objects.all(), 2, ("pk",), count_limit=10).page().count
+        == 7
+    )
+
+    page = KeysetPaginator(Book.objects.all(), 2, ("pk",), count_limit=5).page()
+    assert page.count == 5
+    assert page.count_capped
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90LWpzb24", "WyJuIiwgWzFdLCAyXQ"])
+def test_invalid_cursor_raises(cursor):
+    with pytest.raises(InvalidCursor):
+        KeysetPaginator(Book.objects.all(), 2, ("pk",)).page(cursor)
+
+
+def make_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "ordering, values",
+    [
+        (("pk",), ["abc"]),
+        (("pk",), [["abc"]]),
+        (("pk",), [None]),
+        (("-published_date", "pk"), ["not-a-date", 1]),
+        (("-published_date", "pk"), [{"a": 1}, 1]),
+        (("-rank", "pk"), ["abc", 1]),
+    ],
+)
+def test_tampered_cursor_values_raise(books, ordering, values):
+    queryset = Book.objects.annotate(rank=Value(1.0, output_field=FloatField()))
+    paginator = KeysetPaginator(queryset, 2, ordering, nullable=("published_date",))
+
+    with pytest.raises(InvalidCursor):
+        paginator.page(make_cursor(["n", values]))
+
+
+def test_cursor_values_are_converted_to_field_types(books):
+    paginator = KeysetPaginator(
+        Book.objects.all(), 2, ("-published_date", "pk"), nullable=("published_date",)
+    )
+
+    page = paginator.page(make_cursor(["n", ["2024-01-01", str(books[3].pk)]]))
+
+    assert [book.pk for book in page] == [books[6].pk, books[2].pk]
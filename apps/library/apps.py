@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class LibraryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.library"
+
+    def ready(self):
+        from apps.library import signals  # noqa: F401
+        from apps.library.search.backends import ensure_search_index
+
+        post_migrate.connect(ensure_search_index, sender=self)
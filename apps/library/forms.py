@@ -1,20 +1,76 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import models
 from django.utils import timezone
 
+from apps.catalog.utils import ISBN_SEPARATORS_RE, normalize_isbn
 from apps.library.models import LoanHistory, ReservationHistory
 
 
+class LenientFieldMixin:
+    """
+    解釈できない値をエラーにせず、未指定として扱う。
+    リンクで組み立てる検索条件（並べ替え・ファセット）の1つが壊れていても、
+    フォーム全体を不正にしないために使う。
+    """
+
+    def clean(self, value):
+        try:
+            return super().clean(value)
+        except ValidationError:
+            return self.to_python(None)
+
+
+class LenientChoiceField(LenientFieldMixin, forms.ChoiceField):
+    pass
+
+
+class LenientIntegerField(LenientFieldMixin, forms.IntegerField):
+    pass
+
+
 class BookSearchForm(forms.Form):
+    class Sort(models.TextChoices):
+        RELEVANCE = "relevance", "関連度順"
+        AVAILABLE = "available", "貸出可能な蔵書が多い順"
+        TITLE = "title", "タイトル順"
+        NEWEST = "newest", "出版日が新しい順"
+        POPULAR = "popular", "よく借りられている順"
+
     title = forms.CharField(label="タイトル", required=False)
     author = forms.CharField(label="著者名", required=False)
     publisher = forms.CharField(label="出版社", required=False)
     isbn = forms.CharField(
         label="ISBN",
         required=False,
-        max_length=13,
-        help_text="13桁の数字をハイフンなしで入力してください。",
+        # ハイフン区切りの ISBN-13（13桁 + ハイフン4つ）まで受け付ける
+        max_length=17,
+        help_text="13桁の ISBN で本の詳細画面を開きます。途中までの入力では前方一致で検索します。",
     )
+    available_only = forms.BooleanField(label="貸出可能な本のみ", required=False)
+    sort = LenientChoiceField(
+        label="並べ替え", choices=Sort.choices, required=False, initial=Sort.RELEVANCE
+    )
+    # 検索結果のファセット（出版社・出版年代・保存場所）での絞り込み
+    exact_publisher = forms.CharField(required=False, widget=forms.HiddenInput)
+    decade = LenientIntegerField(required=False, widget=forms.HiddenInput)
+    location = LenientIntegerField(required=False, widget=forms.HiddenInput)
+
+    def clean_isbn(self):
+        """
+        ハイフン・空白を取り除く。ISBN-10 は ISBN-13 に変換する。
+        13桁の値は完全一致、それより短い値は前方一致の検索に使う。
+        """
+        value = self.cleaned_data["isbn"]
+        if not value:
+            return value
+        isbn = normalize_isbn(value)
+        if isbn:
+            return isbn
+        digits = ISBN_SEPARATORS_RE.sub("", value)
+        if not digits.isdigit() or len(digits) > 13:
+            raise ValidationError("ISBN は13桁以内の数字で入力してください。")
+        return digits
 
 
 class LoanForm(forms.ModelForm):
@@ -0,0 +1,35 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import Book
+from apps.library.search.ngram import NGRAM_FIELDS, index_books
+
+
+class Command(BaseCommand):
+    help = (
+        "書籍のタイトル・著者の n-gram の索引（BookNGram）を作り直します。"
+        "QuerySet.update などで Book を直接更新した後は、"
+        "backfill_normalized_fields に続けて実行してください。"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="1回に作り直す書籍の数"
+        )
+
+    def handle(self, *args, **options):
+        books = (
+            Book.objects.only(
+                *(f"{field}_normalized" for field in NGRAM_FIELDS),
+                *(f"{field}_reading" for field in NGRAM_FIELDS),
+            )
+            .order_by("pk")
+            .iterator(chunk_size=options["batch_size"])
+        )
+        total = 0
+        while batch := list(islice(books, options["batch_size"])):
+            index_books(batch)
+            total += len(batch)
+            self.stdout.write(f"{total} 冊を処理しました")
+        self.stdout.write(self.style.SUCCESS(f"完了: {total} 冊の索引を作り直しました"))
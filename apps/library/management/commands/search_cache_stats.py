@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.library.search.cache import SearchResultCache
+
+
+class Command(BaseCommand):
+    help = "書籍検索の結果キャッシュのヒット数・ミス数・ヒット率と、カタログのバージョン番号を表示します。"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="表示後にカウンターをリセットする"
+        )
+
+    def handle(self, *args, **options):
+        cache = SearchResultCache()
+        stats = cache.stats()
+        self.stdout.write(
+            f"search cache hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={stats['hit_rate']:.1%} version={cache.version()}"
+        )
+        if options["reset"]:
+            cache.reset_stats()
+            self.stdout.write("カウンターをリセットしました。")
@@ -0,0 +1,90 @@
+from django.db import migrations
+
+# 0009 で正規化した列に作り直すため、この時点の索引の定義をここに固定しておく
+POSTGRES_INSTALL_SQL = [
+    """
+    ALTER TABLE catalog_book ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(author, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(publisher, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_search_vector_idx
+    ON catalog_book USING GIN (search_vector)
+    """,
+]
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_search_vector_idx",
+    "ALTER TABLE catalog_book DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSTALL_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS catalog_book_fts USING fts5(
+        title, author, publisher,
+        content='catalog_book', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    "INSERT INTO catalog_book_fts(catalog_book_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0)')",
+    "INSERT INTO catalog_book_fts(catalog_book_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ai AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(rowid, title, author, publisher)
+        VALUES (new.id, new.title, new.author, new.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ad AFTER DELETE ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, title, author, publisher)
+        VALUES ('delete', old.id, old.title, old.author, old.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_au
+    AFTER UPDATE OF title, author, publisher ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, title, author, publisher)
+        VALUES ('delete', old.id, old.title, old.author, old.publisher);
+        INSERT INTO catalog_book_fts(rowid, title, author, publisher)
+        VALUES (new.id, new.title, new.author, new.publisher);
+    END
+    """,
+]
+SQLITE_UNINSTALL_SQL = [
+    "DROP TRIGGER IF EXISTS catalog_book_fts_ai",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_ad",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_au",
+    "DROP TABLE IF EXISTS catalog_book_fts",
+]
+
+SQL_BY_VENDOR = {
+    "postgresql": (POSTGRES_INSTALL_SQL, POSTGRES_UNINSTALL_SQL),
+    "sqlite": (SQLITE_INSTALL_SQL, SQLITE_UNINSTALL_SQL),
+}
+
+
+def execute(schema_editor, index):
+    statements = SQL_BY_VENDOR.get(schema_editor.connection.vendor, ([], []))[index]
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def install_search_index(apps, schema_editor):
+    execute(schema_editor, 0)
+
+
+def uninstall_search_index(apps, schema_editor):
+    execute(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_book_cover_path"),
+        ("library", "0006_reservationhistory_library_res_user_id_2597de_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 0009 で正規化した列に作り直すため、この時点の索引の定義をここに固定しておく
+TRIGRAM_INSTALL_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS catalog_book_title_trgm_idx "
+    "ON catalog_book USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS catalog_book_author_trgm_idx "
+    "ON catalog_book USING GIN (author gin_trgm_ops)",
+]
+TRIGRAM_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_title_trgm_idx",
+    "DROP INDEX IF EXISTS catalog_book_author_trgm_idx",
+]
+NGRAM_FIELDS = ("title", "author")
+
+
+def ngrams(text):
+    grams = set()
+    for chunk in text.casefold().split():
+        grams.update(chunk)
+        grams.update(chunk[i : i + 2] for i in range(len(chunk) - 1))
+    return grams
+
+
+def install_ngram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in TRIGRAM_INSTALL_SQL:
+            schema_editor.execute(sql)
+        return
+
+    # 既存の書籍の n-gram を登録する
+    Book = apps.get_model("catalog", "Book")
+    BookNGram = apps.get_model("library", "BookNGram")
+    grams = []
+    for book in Book.objects.only(*NGRAM_FIELDS).iterator(chunk_size=1000):
+        grams.extend(
+            BookNGram(book_id=book.pk, field=field, gram=gram)
+            for field in NGRAM_FIELDS
+            for gram in ngrams(getattr(book, field))
+        )
+        if len(grams) >= 10000:
+            BookNGram.objects.bulk_create(grams)
+            grams = []
+    BookNGram.objects.bulk_create(grams)
+
+
+def uninstall_ngram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in TRIGRAM_UNINSTALL_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_book_cover_path"),
+        ("library", "0007_book_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookNGram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[("title", "タイトル"), ("author", "著者")],
+                        max_length=10,
+                        verbose_name="項目",
+                    ),
+                ),
+                ("gram", models.CharField(max_length=2, verbose_name="n-gram")),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ngrams",
+                        to="catalog.book",
+                        verbose_name="書籍",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "書籍の n-gram",
+                "verbose_name_plural": "書籍の n-gram",
+                "indexes": [
+                    models.Index(
+                        fields=["field", "gram"], name="library_boo_field_b7ecab_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("book", "field", "gram"), name="unique_book_field_gram"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(install_ngram_index, uninstall_ngram_index),
+    ]
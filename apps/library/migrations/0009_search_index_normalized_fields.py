@@ -0,0 +1,174 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# この時点の n-gram の索引の定義（apps.library.search.ngram）をここに固定しておく
+NGRAM_FIELDS = ("title", "author")
+
+
+def ngrams(text):
+    grams = set()
+    for chunk in text.casefold().split():
+        grams.update(chunk)
+        grams.update(chunk[i : i + 2] for i in range(len(chunk) - 1))
+    return grams
+
+
+# 0007・0008 で元の列（title など）に作成した索引
+OLD_POSTGRES_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_title_trgm_idx",
+    "DROP INDEX IF EXISTS catalog_book_author_trgm_idx",
+    "DROP INDEX IF EXISTS catalog_book_search_vector_idx",
+    "ALTER TABLE catalog_book DROP COLUMN IF EXISTS search_vector",
+]
+OLD_SQLITE_SQL = [
+    "DROP TRIGGER IF EXISTS catalog_book_fts_ai",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_ad",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_au",
+    "DROP TABLE IF EXISTS catalog_book_fts",
+]
+
+# 0010 で読みの列を加えるため、この時点の索引の定義をここに固定しておく
+POSTGRES_INSTALL_SQL = [
+    """
+    ALTER TABLE catalog_book ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title_normalized, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(author_normalized, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(publisher_normalized, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_search_vector_idx
+    ON catalog_book USING GIN (search_vector)
+    """,
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_title_normalized_trgm_idx
+    ON catalog_book USING GIN (title_normalized gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_author_normalized_trgm_idx
+    ON catalog_book USING GIN (author_normalized gin_trgm_ops)
+    """,
+]
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_search_vector_idx",
+    "ALTER TABLE catalog_book DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS catalog_book_title_normalized_trgm_idx",
+    "DROP INDEX IF EXISTS catalog_book_author_normalized_trgm_idx",
+]
+
+SQLITE_INSTALL_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS catalog_book_fts USING fts5(
+        title_normalized, author_normalized, publisher_normalized,
+        content='catalog_book', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    "INSERT INTO catalog_book_fts(catalog_book_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0)')",
+    "INSERT INTO catalog_book_fts(catalog_book_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ai AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(rowid, title_normalized, author_normalized, publisher_normalized)
+        VALUES (new.id, new.title_normalized, new.author_normalized, new.publisher_normalized);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ad AFTER DELETE ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, title_normalized, author_normalized, publisher_normalized)
+        VALUES ('delete', old.id, old.title_normalized, old.author_normalized, old.publisher_normalized);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_au
+    AFTER UPDATE OF title_normalized, author_normalized, publisher_normalized ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, title_normalized, author_normalized, publisher_normalized)
+        VALUES ('delete', old.id, old.title_normalized, old.author_normalized, old.publisher_normalized);
+        INSERT INTO catalog_book_fts(rowid, title_normalized, author_normalized, publisher_normalized)
+        VALUES (new.id, new.title_normalized, new.author_normalized, new.publisher_normalized);
+    END
+    """,
+]
+SQLITE_UNINSTALL_SQL = OLD_SQLITE_SQL
+
+
+def rebuild_ngrams(apps, normalized):
+    Book = apps.get_model("catalog", "Book")
+    BookNGram = apps.get_model("library", "BookNGram")
+    BookNGram.objects.all().delete()
+    columns = {
+        field: f"{field}_normalized" if normalized else field for field in NGRAM_FIELDS
+    }
+    grams = []
+    for book in Book.objects.only(*columns.values()).iterator(chunk_size=1000):
+        grams.extend(
+            BookNGram(book_id=book.pk, field=field, gram=gram)
+            for field, column in columns.items()
+            for gram in ngrams(getattr(book, column))
+        )
+        if len(grams) >= 10000:
+            BookNGram.objects.bulk_create(grams)
+            grams = []
+    BookNGram.objects.bulk_create(grams)
+
+
+def install_search_index(apps, schema_editor):
+    """正規化した列に索引を作成する（0010 の巻き戻しからも呼ぶ）。"""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_INSTALL_SQL:
+            schema_editor.execute(sql)
+        return
+
+    if vendor == "sqlite":
+        for sql in SQLITE_INSTALL_SQL:
+            schema_editor.execute(sql)
+    rebuild_ngrams(apps, normalized=True)
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {
+        "postgresql": POSTGRES_UNINSTALL_SQL,
+        "sqlite": SQLITE_UNINSTALL_SQL,
+    }.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def use_normalized_fields(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {"postgresql": OLD_POSTGRES_SQL, "sqlite": OLD_SQLITE_SQL}.get(
+        vendor, []
+    ):
+        schema_editor.execute(sql)
+    install_search_index(apps, schema_editor)
+
+
+def use_original_fields(apps, schema_editor):
+    connection = schema_editor.connection
+    uninstall_search_index(apps, schema_editor)
+
+    # 0007・0008 の索引を作り直す
+    import_module(
+        "apps.library.migrations.0007_book_search_index"
+    ).install_search_index(apps, schema_editor)
+    if connection.vendor == "postgresql":
+        import_module("apps.library.migrations.0008_bookngram").install_ngram_index(
+            apps, schema_editor
+        )
+    else:
+        rebuild_ngrams(apps, normalized=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_book_normalized_fields"),
+        ("library", "0008_bookngram"),
+    ]
+
+    operations = [
+        migrations.RunPython(use_normalized_fields, use_original_fields),
+    ]
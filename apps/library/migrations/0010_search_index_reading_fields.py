@@ -0,0 +1,106 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# タイトル・著者の読みの列（catalog 0015）を検索用の索引に加える。
+# 既存の書籍の読みは 0012 で設定するため、ここでは索引の定義だけを作り直す
+POSTGRES_INSTALL_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_title_reading_trgm_idx
+    ON catalog_book USING GIN (title_reading gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_author_reading_trgm_idx
+    ON catalog_book USING GIN (author_reading gin_trgm_ops)
+    """,
+]
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_title_reading_trgm_idx",
+    "DROP INDEX IF EXISTS catalog_book_author_reading_trgm_idx",
+]
+
+SQLITE_COLUMNS = (
+    "title_normalized, author_normalized, publisher_normalized, "
+    "title_reading, author_reading"
+)
+SQLITE_NEW_VALUES = (
+    "new.title_normalized, new.author_normalized, new.publisher_normalized, "
+    "new.title_reading, new.author_reading"
+)
+SQLITE_OLD_VALUES = (
+    "old.title_normalized, old.author_normalized, old.publisher_normalized, "
+    "old.title_reading, old.author_reading"
+)
+SQLITE_INSTALL_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS catalog_book_fts USING fts5(
+        {SQLITE_COLUMNS},
+        content='catalog_book', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    "INSERT INTO catalog_book_fts(catalog_book_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 10.0, 5.0)')",
+    "INSERT INTO catalog_book_fts(catalog_book_fts) VALUES ('rebuild')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ai AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(rowid, {SQLITE_COLUMNS})
+        VALUES (new.id, {SQLITE_NEW_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_ad AFTER DELETE ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_au
+    AFTER UPDATE OF {SQLITE_COLUMNS} ON catalog_book BEGIN
+        INSERT INTO catalog_book_fts(catalog_book_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD_VALUES});
+        INSERT INTO catalog_book_fts(rowid, {SQLITE_COLUMNS})
+        VALUES (new.id, {SQLITE_NEW_VALUES});
+    END
+    """,
+]
+
+
+def previous_migration():
+    return import_module("apps.library.migrations.0009_search_index_normalized_fields")
+
+
+def add_reading_fields(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_INSTALL_SQL:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        for sql in previous_migration().SQLITE_UNINSTALL_SQL:
+            schema_editor.execute(sql)
+        for sql in SQLITE_INSTALL_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_reading_fields(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_UNINSTALL_SQL:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        previous = previous_migration()
+        for sql in previous.SQLITE_UNINSTALL_SQL:
+            schema_editor.execute(sql)
+        for sql in previous.SQLITE_INSTALL_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0015_book_reading_fields"),
+        ("library", "0009_search_index_normalized_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_reading_fields, remove_reading_fields),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_loan_count(apps, schema_editor):
+    # 貸出履歴は library にあるため、catalog 0016 で追加した列をここで設定する
+    Book = apps.get_model("catalog", "Book")
+    LoanHistory = apps.get_model("library", "LoanHistory")
+    counts = (
+        LoanHistory.objects.filter(copy__book=OuterRef("pk"))
+        .order_by()
+        .values("copy__book")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Book.objects.update(loan_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0016_book_sort_indexes"),
+        ("library", "0010_search_index_reading_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_loan_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+import unicodedata
+
+from django.db import migrations
+
+# 読みの変換器は、このマイグレーションに固定せず現在の設定のものを使う。
+# 変換器は CATALOG_READING_CONVERTER で差し替えられる辞書（pykakasi など）の呼び出しで、
+# モデルには触れない。既存の書籍にも、以降の保存時（Book.save）と同じ変換器の読みを
+# 設定しないと、同じ本が登録した時期によって読みで見つかったり見つからなかったりする
+from apps.catalog.readings import get_reading_converter
+from apps.library.search.backends import get_search_backend
+
+READING_FIELDS = ("title", "author")
+
+# この時点の正規化の規則（apps.catalog.normalization）と n-gram の索引の定義
+# （apps.library.search.ngram）をここに固定しておく
+HIRAGANA_TO_KATAKANA = {
+    code: code + 0x60 for code in [*range(0x3041, 0x3097), 0x309D, 0x309E]
+}
+NGRAM_FIELDS = ("title", "author")
+
+
+def normalize_search_text(value):
+    text = unicodedata.normalize("NFKC", value or "").casefold()
+    return " ".join(text.translate(HIRAGANA_TO_KATAKANA).split())
+
+
+def ngrams(text):
+    grams = set()
+    for chunk in text.casefold().split():
+        grams.update(chunk)
+        grams.update(chunk[i : i + 2] for i in range(len(chunk) - 1))
+    return grams
+
+
+def backfill_readings(apps, schema_editor):
+    """
+    読みの列（catalog 0015）を追加する前に登録された書籍の読みを設定し、
+    n-gram の索引を使う検索の実装なら、その索引に読みを加える。
+    全文検索・pg_trgm の索引は列の更新に追従する。
+    """
+    converter = get_reading_converter()
+    if not converter.available:
+        return
+
+    Book = apps.get_model("catalog", "Book")
+    BookNGram = apps.get_model("library", "BookNGram")
+    # 保存時の更新（apps.library.signals）と同じく、LIBRARY_SEARCH_BACKEND の設定を含めて
+    # 検索の実装が n-gram の索引を使うかどうかで決める
+    use_ngrams = get_search_backend(schema_editor.connection.alias).uses_ngram_index
+    columns = [f"{field}_reading" for field in READING_FIELDS]
+
+    def flush(books):
+        Book.objects.bulk_update(books, columns)
+        if not use_ngrams:
+            return
+        BookNGram.objects.filter(book_id__in=[book.pk for book in books]).delete()
+        BookNGram.objects.bulk_create(
+            [
+                BookNGram(book_id=book.pk, field=field, gram=gram)
+                for book in books
+                for field in NGRAM_FIELDS
+                for gram in ngrams(getattr(book, f"{field}_normalized"))
+                | ngrams(getattr(book, f"{field}_reading"))
+            ],
+            batch_size=1000,
+        )
+
+    fields = [*READING_FIELDS, *(f"{field}_normalized" for field in NGRAM_FIELDS)]
+    books = []
+    for book in Book.objects.only(*fields).iterator(chunk_size=1000):
+        for field in READING_FIELDS:
+            reading = converter.reading(getattr(book, field))
+            setattr(book, f"{field}_reading", normalize_search_text(reading)[:255])
+        books.append(book)
+        if len(books) >= 1000:
+            flush(books)
+            books = []
+    if books:
+        flush(books)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_remove_book_reading_btree_indexes"),
+        ("library", "0011_backfill_book_loan_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_readings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# 出版社も pg_trgm の部分一致（LIKE）で引くため、正規化した出版社の列に索引を作る。
+# 出版社だけで使っていた全文検索の列（search_vector）は不要になるため削除する
+POSTGRES_INSTALL_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_publisher_normalized_trgm_idx
+    ON catalog_book USING GIN (publisher_normalized gin_trgm_ops)
+    """,
+    "DROP INDEX IF EXISTS catalog_book_search_vector_idx",
+    "ALTER TABLE catalog_book DROP COLUMN IF EXISTS search_vector",
+]
+# 巻き戻しでは 0009 の定義で search_vector を作り直す
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS catalog_book_publisher_normalized_trgm_idx",
+    """
+    ALTER TABLE catalog_book ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title_normalized, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(author_normalized, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(publisher_normalized, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS catalog_book_search_vector_idx
+    ON catalog_book USING GIN (search_vector)
+    """,
+]
+
+
+def install_publisher_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_INSTALL_SQL:
+            schema_editor.execute(sql)
+
+
+def uninstall_publisher_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_UNINSTALL_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0012_backfill_book_readings"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_publisher_index, uninstall_publisher_index),
+    ]
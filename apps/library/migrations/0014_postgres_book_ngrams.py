@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# PostgreSQL でもタイトル・著者の1〜2文字の語を n-gram の索引で引くため、
+# それまで SQLite などでだけ作っていた索引（BookNGram）を登録する。
+# この時点の n-gram の索引の定義（apps.library.search.ngram）をここに固定しておく
+NGRAM_FIELDS = ("title", "author")
+
+
+def ngrams(text):
+    grams = set()
+    for chunk in text.casefold().split():
+        grams.update(chunk)
+        grams.update(chunk[i : i + 2] for i in range(len(chunk) - 1))
+    return grams
+
+
+def build_postgres_ngrams(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Book = apps.get_model("catalog", "Book")
+    BookNGram = apps.get_model("library", "BookNGram")
+    columns = [
+        f"{field}_{suffix}"
+        for field in NGRAM_FIELDS
+        for suffix in ("normalized", "reading")
+    ]
+    BookNGram.objects.all().delete()
+    grams = []
+    for book in Book.objects.only(*columns).iterator(chunk_size=1000):
+        grams.extend(
+            BookNGram(book_id=book.pk, field=field, gram=gram)
+            for field in NGRAM_FIELDS
+            for gram in ngrams(getattr(book, f"{field}_normalized"))
+            | ngrams(getattr(book, f"{field}_reading"))
+        )
+        if len(grams) >= 10000:
+            BookNGram.objects.bulk_create(grams)
+            grams = []
+    BookNGram.objects.bulk_create(grams)
+
+
+def remove_postgres_ngrams(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        apps.get_model("library", "BookNGram").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0013_publisher_trigram_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_postgres_ngrams, remove_postgres_ngrams),
+    ]
@@ -7,7 +7,7 @@ from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from apps.catalog.models import Copy
+from apps.catalog.models import Book, Copy
 
 User = get_user_model()
 
@@ -151,3 +151,35 @@ class ReservationHistory(models.Model):
             models.Index(fields=["copy"]),
             models.Index(fields=["status"]),
         ]
+
+
+class BookNGram(models.Model):
+    """
+    書籍のタイトル・著者の n-gram（1文字・2文字）の転置索引。
+    日本語の部分一致検索を索引で引くために使う（PostgreSQL では pg_trgm を使うため不要）。
+    """
+
+    class Field(models.TextChoices):
+        TITLE = "title", "タイトル"
+        AUTHOR = "author", "著者"
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="ngrams", verbose_name="書籍"
+    )
+    field = models.CharField(max_length=10, choices=Field.choices, verbose_name="項目")
+    gram = models.CharField(max_length=2, verbose_name="n-gram")
+
+    def __str__(self):
+        return f"{self.book_id} - {self.field} - {self.gram}"
+
+    class Meta:
+        verbose_name = "書籍の n-gram"
+        verbose_name_plural = "書籍の n-gram"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "field", "gram"], name="unique_book_field_gram"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["field", "gram"]),
+        ]
@@ -0,0 +1,262 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from apps.catalog.models import Book
+from apps.catalog.normalization import normalize_search_text
+from apps.library.search.ngram import NGRAM_FIELDS, filter_by_ngrams
+
+# キーワード検索の対象とする Book のフィールド（先頭ほど関連度の重みが大きい）
+SEARCH_FIELDS = ("title", "author", "publisher")
+
+
+def normalized_column(field):
+    """
+    検索で実際に照合する、正規化した値の列名（Book.normalize_search_fields）。
+    """
+    return f"{field}_normalized"
+
+
+def match_columns(field):
+    """
+    検索語を照合する列。読みを持つフィールド（Book.READING_FIELDS）は、
+    正規化した列に加えて読みの列（title_reading など）とも照合する。
+    """
+    if field in Book.READING_FIELDS:
+        return [normalized_column(field), f"{field}_reading"]
+    return [normalized_column(field)]
+
+
+def split_terms(value):
+    """
+    検索語を Book の検索用の列と同じ規則で正規化し、空白で区切る。
+    区切った語はすべてを含む書籍に絞り込む（AND 検索）。
+    """
+    return normalize_search_text(value).split()
+
+
+class SearchBackend:
+    """
+    BookSearchView のキーワード検索の実装。
+
+    search は criteria（{フィールド名: 入力された検索語}）に一致する書籍に絞り込み、
+    関連度を search_rank（大きいほど関連度が高い）として付けた queryset を返す。
+    検索用の索引そのものはマイグレーション（library 0007〜0014）で作成する。
+    ensure_installed はマイグレーションのたびに呼ばれ、消えたトリガーなどを作り直す。
+    uses_ngram_index が True の実装では、Book の保存時に n-gram の索引（BookNGram）を更新する。
+    """
+
+    uses_ngram_index = False
+
+    def search(self, queryset, criteria):
+        raise NotImplementedError
+
+    def ensure_installed(self, connection):
+        pass
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    タイトル・著者は n-gram の索引（BookNGram）で、出版社は部分一致（contains）で
+    絞り込む。関連度はすべて 0。
+    """
+
+    uses_ngram_index = True
+
+    def search(self, queryset, criteria):
+        for field, value in criteria.items():
+            for term in split_terms(value):
+                if field in NGRAM_FIELDS:
+                    queryset = filter_by_ngrams(queryset, field, term)
+                else:
+                    queryset = queryset.filter(
+                        **{f"{normalized_column(field)}__contains": term}
+                    )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    タイトル・著者・出版社を、pg_trgm の GIN 索引を使った部分一致（LIKE）で絞り込み、
+    word_similarity にフィールドごとの重みを掛けて関連度を付ける。
+    単語に区切りにくい日本語でも、語の途中（「書店」で「岩波書店」など）に一致する。
+    照合する列はすでに casefold してあるため、索引を使えない ILIKE（UPPER での比較）ではなく
+    LIKE（contains）で比較する。
+    pg_trgm が日本語の文字を n-gram にするには、データベースのロケール（LC_CTYPE）が
+    C 以外（ja_JP.UTF-8 など）である必要がある。
+
+    索引はいずれも正規化した列（title_normalized など）に対して作成する。
+    タイトル・著者は読みの列（title_reading など）にも pg_trgm の索引を作り、
+    表記と読みのどちらかに一致する書籍を索引の OR（BitmapOr）で引く。
+
+    pg_trgm は3文字未満の語では索引を引けない（LIKE '%xx%' は全件を走査する）ため、
+    タイトル・著者の1〜2文字の語は n-gram の索引（BookNGram）で絞り込む。
+    出版社の1〜2文字の語は索引を使わない部分一致になる。
+    """
+
+    uses_ngram_index = True
+
+    # pg_trgm で部分一致を引くフィールドと、関連度の重み
+    TRIGRAM_WEIGHTS = {"title": 1.0, "author": 0.5, "publisher": 0.2}
+    # pg_trgm で索引を引ける最短の語の長さ
+    MIN_TERM_LENGTH = 3
+
+    def search(self, queryset, criteria):
+        rank_sql = []
+        rank_params = []
+        for field, weight in self.TRIGRAM_WEIGHTS.items():
+            columns = match_columns(field)
+            for term in split_terms(criteria.get(field, "")):
+                if field in NGRAM_FIELDS and len(term) < self.MIN_TERM_LENGTH:
+                    queryset = filter_by_ngrams(queryset, field, term)
+                else:
+                    condition = Q()
+                    for column in columns:
+                        condition |= Q(**{f"{column}__contains": term})
+                    queryset = queryset.filter(condition)
+                # 表記と読みのうち、よく一致する方で関連度を付ける
+                similarities = ", ".join(
+                    f'word_similarity(%s, "catalog_book"."{column}")'
+                    for column in columns
+                )
+                rank_sql.append(f"{weight} * GREATEST({similarities})")
+                rank_params.extend([term] * len(columns))
+
+        if not rank_sql:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset.annotate(
+            search_rank=RawSQL(
+                " + ".join(rank_sql), rank_params, output_field=FloatField()
+            )
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    catalog_book を外部コンテンツとする FTS5 の仮想テーブル catalog_book_fts で検索する。
+    トークナイザーは trigram のため、3文字以上の語は部分一致で索引を引ける。
+    索引はトリガーで Book の保存・更新・削除に追従する。
+    trigram で引けない1〜2文字の語は、タイトル・著者なら n-gram の索引（BookNGram）で絞り込む。
+    索引には正規化した列（title_normalized など）と、タイトル・著者の読みの列を登録する。
+    """
+
+    uses_ngram_index = True
+
+    table = "catalog_book_fts"
+    # trigram で索引を引ける最短の語の長さ
+    MIN_TERM_LENGTH = 3
+    # 索引に登録する列と、トリガーで渡す値
+    INDEXED_COLUMNS = [
+        *(normalized_column(field) for field in SEARCH_FIELDS),
+        *(f"{field}_reading" for field in Book.READING_FIELDS),
+    ]
+    COLUMNS = ", ".join(INDEXED_COLUMNS)
+    NEW_VALUES = ", ".join(f"new.{column}" for column in INDEXED_COLUMNS)
+    OLD_VALUES = ", ".join(f"old.{column}" for column in INDEXED_COLUMNS)
+    TRIGGERS_SQL = [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON catalog_book BEGIN
+            INSERT INTO {table}(rowid, {COLUMNS})
+            VALUES (new.id, {NEW_VALUES});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON catalog_book BEGIN
+            INSERT INTO {table}({table}, rowid, {COLUMNS})
+            VALUES ('delete', old.id, {OLD_VALUES});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_au
+        AFTER UPDATE OF {COLUMNS} ON catalog_book BEGIN
+            INSERT INTO {table}({table}, rowid, {COLUMNS})
+            VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO {table}(rowid, {COLUMNS})
+            VALUES (new.id, {NEW_VALUES});
+        END
+        """,
+    ]
+
+    def build_match(self, criteria):
+        """
+        criteria を FTS5 の MATCH 式にする。
+
+        Returns:
+            tuple: (MATCH 式の文字列, 索引を引けない短い語の (フィールド, 語) のリスト)
+        """
+        phrases = []
+        short_terms = []
+        for field, value in criteria.items():
+            for term in split_terms(value):
+                if len(term) < self.MIN_TERM_LENGTH:
+                    short_terms.append((field, term))
+                    continue
+                quoted = term.replace('"', '""')
+                columns = " ".join(match_columns(field))
+                phrases.append(f'{{{columns}}} : "{quoted}"')
+        return " AND ".join(phrases), short_terms
+
+    def search(self, queryset, criteria):
+        match, short_terms = self.build_match(criteria)
+        for field, term in short_terms:
+            if field in NGRAM_FIELDS:
+                queryset = filter_by_ngrams(queryset, field, term)
+            else:
+                queryset = queryset.filter(
+                    **{f"{normalized_column(field)}__contains": term}
+                )
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]
+            )
+        ).annotate(
+            # rank は bm25 の値（小さいほど関連度が高い）のため、符号を反転する
+            search_rank=RawSQL(
+                f"SELECT -rank FROM {self.table} "
+                f'WHERE {self.table} MATCH %s AND rowid = "catalog_book"."id"',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def ensure_installed(self, connection):
+        # SQLite ではテーブルを作り直すマイグレーション（列の追加など）で
+        # catalog_book のトリガーが消えるため、マイグレーションのたびに作り直す
+        with connection.cursor() as cursor:
+            if self.table not in connection.introspection.table_names(cursor):
+                return
+            for sql in self.TRIGGERS_SQL:
+                cursor.execute(sql)
+
+
+BACKENDS_BY_VENDOR = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def backend_for_vendor(vendor):
+    return BACKENDS_BY_VENDOR.get(vendor, SimpleSearchBackend)()
+
+
+def get_search_backend(using="default"):
+    """
+    settings.LIBRARY_SEARCH_BACKEND に設定された検索の実装を返す。
+    未設定の場合は、データベースの種類に応じた実装を返す。
+    """
+    if settings.LIBRARY_SEARCH_BACKEND:
+        return import_string(settings.LIBRARY_SEARCH_BACKEND)()
+    return backend_for_vendor(connections[using].vendor)
+
+
+def ensure_search_index(using="default", **kwargs):
+    """
+    post_migrate で呼ばれ、検索用の索引のトリガーなどが消えていれば作り直す。
+    """
+    connection = connections[using]
+    backend_for_vendor(connection.vendor).ensure_installed(connection)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class SearchResultCache:
+    """
+    書籍検索の結果（1ページ分の書籍の pk・前後のカーソル・件数）を保持するキャッシュ。
+
+    キーは正規化した検索条件・カーソル・件数と、カタログのバージョン番号から作る。
+    Book・Copy が変更されるとバージョン番号を上げるため、古い結果は参照されなくなる
+    （古いキーは保持期間 settings.LIBRARY_SEARCH_CACHE_TIMEOUT が過ぎると消える）。
+    ヒット数・ミス数は MetadataCache と同じく、同じキャッシュに記録する。
+    """
+
+    key_prefix = "library:search"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        # キャッシュのインスタンスはスレッドごとに異なるため、毎回取得する
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return settings.LIBRARY_SEARCH_CACHE_TIMEOUT > 0
+
+    def _stats_key(self, name):
+        return f"{self.key_prefix}:stats:{name}"
+
+    def _key(self, query, version=None):
+        data = json.dumps(query, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(data.encode()).hexdigest()
+        if version is None:
+            version = self.version()
+        return f"{self.key_prefix}:{version}:{digest}"
+
+    @property
+    def _version_key(self):
+        return f"{self.key_prefix}:version"
+
+    def _initial_version(self):
+        # 追い出された後に作り直しても以前の番号と重ならないよう、時刻（ミリ秒）から始める
+        return time.time_ns() // 1_000_000
+
+    def version(self):
+        """
+        カタログのバージョン番号。Book・Copy が変更されるたびに増える。
+        """
+        version = self.cache.get(self._version_key)
+        if version is None:
+            self.cache.add(self._version_key, self._initial_version(), timeout=None)
+            version = self.cache.get(self._version_key)
+        return version
+
+    def invalidate(self):
+        """
+        バージョン番号を上げる。トランザクション内で呼ばれた場合はコミット後に上げる
+        （コミット前に上げると、他のリクエストが変更前の結果を新しいバージョンで保存しうる）。
+        """
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        if not self.cache.add(self._version_key, self._initial_version(), timeout=None):
+            try:
+                self.cache.incr(self._version_key)
+            except ValueError:
+                # add と incr の間に追い出された場合は、次の version() で作り直される
+                pass
+
+    def get(self, query, version=None):
+        """
+        query（正規化した検索条件の dict）に対応する結果を返す。なければ None。
+
+        検索を実行する前に version() で読んだ番号を version に渡し、set にも同じ番号を
+        渡すこと。検索中に Book・Copy が変更されても、変更前の結果が新しい番号で
+        保存されなくなる。省略した場合は現在の番号を使う。
+        """
+        if not self.enabled:
+            return None
+        result = self.cache.get(self._key(query, version))
+        self._increment("hits" if result is not None else "misses")
+        return result
+
+    def set(self, query, result, version=None):
+        if self.enabled:
+            self.cache.set(
+                self._key(query, version),
+                result,
+                timeout=settings.LIBRARY_SEARCH_CACHE_TIMEOUT,
+            )
+
+    def stats(self):
+        """
+        ヒット数・ミス数・ヒット率を返す。
+        """
+        hits = self.cache.get(self._stats_key("hits"), 0)
+        misses = self.cache.get(self._stats_key("misses"), 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([self._stats_key("hits"), self._stats_key("misses")])
+
+    def _increment(self, name, delta=1):
+        key = self._stats_key(name)
+        # add はキーが存在しない場合のみ成功するため、初回の競合でも値を失わない
+        if not self.cache.add(key, delta, timeout=None):
+            try:
+                self.cache.incr(key, delta)
+            except ValueError:
+                # add と incr の間に追い出された場合は、カウントを諦める
+                pass
@@ -0,0 +1,76 @@
+from django.db.models import CharField, Count, F, IntegerField, Value
+from django.db.models.functions import Cast, ExtractYear
+
+from apps.catalog.models import Book, Copy
+
+# ファセットごとの、表示する項目の上限
+FACET_LIMIT = 10
+
+
+def decade_of(field):
+    """出版日の年代（1990 年代なら 1990）"""
+    # PostgreSQL の EXTRACT は numeric を返すため、整数にしてから切り捨てる
+    year = Cast(ExtractYear(field), output_field=IntegerField())
+    return year / Value(10) * Value(10)
+
+
+def compute_facets(queryset):
+    """
+    queryset の書籍の、出版社・出版年代・保存場所ごとの冊数を返す。
+
+    3つのファセットの集計は UNION ALL で1つのクエリにまとめる。
+    出版年代は、出版日の精度が「不明」の書籍を数えない。
+    保存場所は、廃棄済みでない蔵書がある書籍を保存場所ごとに数える。
+
+    Returns:
+        dict: {"publisher" / "decade" / "location": [(値, 表示名, 冊数), ...]}
+        各ファセットは冊数の多い順（出版年代は新しい順）に最大 FACET_LIMIT 件
+    """
+    books = Book.objects.filter(pk__in=queryset.order_by().values("pk"))
+
+    def facet(queryset, name, key, label, count):
+        return (
+            queryset.order_by()
+            .values(
+                facet=Value(name, output_field=CharField()),
+                key=Cast(key, output_field=CharField()),
+                label=Cast(label, output_field=CharField()),
+            )
+            .annotate(count=count)
+        )
+
+    publisher = facet(
+        books.exclude(publisher=""),
+        "publisher",
+        F("publisher"),
+        F("publisher"),
+        Count("pk"),
+    )
+    decade = facet(
+        books.exclude(published_date=None).exclude(
+            published_date_precision=Book.PublishedDatePrecision.UNKNOWN
+        ),
+        "decade",
+        decade_of("published_date"),
+        decade_of("published_date"),
+        Count("pk"),
+    )
+    location = facet(
+        books.filter(copies__status__in=[Copy.Status.AVAILABLE, Copy.Status.LOANED]),
+        "location",
+        F("copies__location"),
+        F("copies__location__name"),
+        Count("pk", distinct=True),
+    )
+
+    facets = {"publisher": [], "decade": [], "location": []}
+    for row in publisher.union(decade, location, all=True):
+        facets[row["facet"]].append((row["key"], row["label"], row["count"]))
+
+    for name, items in facets.items():
+        if name == "decade":
+            items.sort(key=lambda item: int(item[0]), reverse=True)
+        else:
+            items.sort(key=lambda item: (-item[2], item[1]))
+        del items[FACET_LIMIT:]
+    return facets
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class SharedVersionIndex:
+    """
+    プロセスごとのメモリに持つ、Book から作る索引の基底クラス。
+
+    索引は起動時（warm_up）か最初の問い合わせで作成し（_build）、以降は差分だけ更新する。
+    他のプロセスでの変更は、共有キャッシュのバージョン番号（version_key）で検知する。
+    自分の変更以外で番号が進んでいれば、次の問い合わせで索引を作り直す。
+
+    作り直しは別のインスタンスにロックの外で読み込み、読み終えてから入れ替える。
+    作り直している間の他の問い合わせは、待たずに入れ替える前の索引で答える。
+    """
+
+    # 入れ替えない属性（それ以外は _reset で作る索引の中身）
+    _own_attributes = {"alias", "_lock", "_built_version", "_building"}
+
+    version_key = None
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self._lock = threading.RLock()
+        self._built_version = None
+        self._building = False
+        self._reset()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def clear(self):
+        with self._lock:
+            self._built_version = None
+            self._reset()
+
+    def _reset(self):
+        """索引を空にする。"""
+        raise NotImplementedError
+
+    def _build(self):
+        """空の索引に、データベースの全書籍を読み込む。"""
+        raise NotImplementedError
+
+    def _ensure_built(self):
+        """
+        索引が古ければ作り直す。ロックを持たずに呼ぶこと。
+        他のスレッドが作り直している場合は、待たずに戻る。
+        """
+        version = self._shared_version()
+        with self._lock:
+            if self._building or (
+                self._built_version is not None and self._built_version == version
+            ):
+                return
+            self._building = True
+
+        try:
+            fresh = type(self)(self.alias)
+            fresh._build()
+            with self._lock:
+                for name, value in vars(fresh).items():
+                    if name not in self._own_attributes:
+                        setattr(self, name, value)
+                # 読み込み中に変更があれば番号が進んでいるため、次の問い合わせで作り直す
+                self._built_version = version
+        finally:
+            with self._lock:
+                self._building = False
+
+    def _shared_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # 追い出された後に作り直しても以前の番号と重ならないよう、時刻（ミリ秒）から始める
+            self.cache.add(self.version_key, time.time_ns() // 1_000_000, timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def _mark_changed(self):
+        """
+        他のプロセスに変更を知らせる。番号が自分の索引の次の値なら、
+        間に他のプロセスの変更はないため、作り直さずに済む。
+        """
+        try:
+            version = self.cache.incr(self.version_key)
+        except ValueError:
+            # 番号が追い出されていれば、次の問い合わせで作り直す
+            self._built_version = None
+            return
+        if self._built_version is not None and version == self._built_version + 1:
+            self._built_version = version
+        else:
+            self._built_version = None
+
+
+def warm_up(indexes):
+    """
+    indexes をバックグラウンドのスレッドで作成する。起動直後の最初の問い合わせで
+    全書籍の読み込みを待たずに済むよう、WSGI アプリケーションの起動時に呼ぶ。
+    """
+
+    def run():
+        try:
+            for index in indexes:
+                try:
+                    index._ensure_built()
+                except Exception:
+                    logger.exception("failed to warm up %s", type(index).__name__)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run, name="warm-up-indexes", daemon=True)
+    thread.start()
+    return thread
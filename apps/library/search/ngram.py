@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models import Q
+
+from apps.library.models import BookNGram
+
+# n-gram の索引を作る Book のフィールド
+NGRAM_FIELDS = tuple(BookNGram.Field.values)
+
+
+def ngrams(text):
+    """
+    text の1文字・2文字の n-gram の集合を返す。大文字・小文字は区別せず、
+    空白をまたぐ n-gram は作らない。text には正規化した値（normalize_search_text）を渡す。
+    """
+    grams = set()
+    for chunk in text.casefold().split():
+        grams.update(chunk)
+        grams.update(chunk[i : i + 2] for i in range(len(chunk) - 1))
+    return grams
+
+
+def build_ngrams(book):
+    # 表記と読みの n-gram を同じフィールドに登録し、どちらの語でも引けるようにする
+    return [
+        BookNGram(book_id=book.pk, field=field, gram=gram)
+        for field in NGRAM_FIELDS
+        for gram in ngrams(getattr(book, f"{field}_normalized"))
+        | ngrams(getattr(book, f"{field}_reading"))
+    ]
+
+
+def index_books(books):
+    """
+    books の n-gram の索引を作り直す。
+    """
+    books = list(books)
+    with transaction.atomic():
+        BookNGram.objects.filter(book__in=[book.pk for book in books]).delete()
+        BookNGram.objects.bulk_create(
+            [gram for book in books for gram in build_ngrams(book)], batch_size=1000
+        )
+
+
+def filter_by_ngrams(queryset, field, term):
+    """
+    field の表記か読みに term を含む書籍に絞り込む。term は正規化した語を渡す。
+
+    1〜2文字の語はその n-gram を持つ書籍を索引から引く。3文字以上の語は
+    語に含まれるすべての2文字の n-gram を持つ書籍に索引で候補を絞ってから、
+    部分一致で確かめる。
+    """
+    folded = term.casefold()
+    if len(folded) <= 2:
+        grams = {folded}
+    else:
+        grams = {folded[i : i + 2] for i in range(len(folded) - 1)}
+
+    for gram in grams:
+        queryset = queryset.filter(
+            pk__in=BookNGram.objects.filter(field=field, gram=gram).values("book_id")
+        )
+    if len(folded) > 2:
+        queryset = queryset.filter(
+            Q(**{f"{field}_normalized__contains": term})
+            | Q(**{f"{field}_reading__contains": term})
+        )
+    return queryset
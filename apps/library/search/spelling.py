@@ -0,0 +1,170 @@
+from apps.catalog.models import Book
+from apps.library.search.backends import split_terms
+from apps.library.search.memory import SharedVersionIndex
+
+# 綴りの修正候補を出す Book のフィールド
+SPELLING_FIELDS = ("title", "author")
+
+
+def edit_distance(a, b, limit):
+    """
+    a と b の編集距離（隣り合う文字の入れ替えも1回と数える）。
+    limit を超えることが分かった時点で打ち切り、limit + 1 を返す。
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SpellingIndex(SharedVersionIndex):
+    """
+    検索語の綴りの誤りを直す、タイトル・著者の語の辞書（SymSpell の削除辞書）。
+
+    辞書の語から最大 max_distance 文字を削除した文字列ごとに、元の語を登録しておく。
+    検索語も同じように削除した文字列で辞書を引き、得られた候補とだけ編集距離を比べる。
+    削除は語の先頭 prefix_length 文字だけに行い、辞書の大きさを抑える。
+
+    語は検索用に正規化した列（title_normalized など）を空白で区切ったもので、
+    検索語を区切る split_terms と同じ単位になる。
+    """
+
+    version_key = "library:spelling:version"
+    max_distance = 2
+    prefix_length = 5
+
+    def _reset(self):
+        # フィールドごとの、語 → その語を含む書籍の数
+        self._words = {field: {} for field in SPELLING_FIELDS}
+        # フィールドごとの、削除した文字列 → 元の語の集合
+        self._deletes = {field: {} for field in SPELLING_FIELDS}
+        # 書籍ごとに登録した (フィールド, 語)
+        self._by_book = {}
+
+    def correct(self, value, field):
+        """
+        検索語 value の各語を、辞書にある最も近い語に直した文字列を返す。
+        直す語がなければ None。
+        """
+        terms = split_terms(value)
+        self._ensure_built()
+        with self._lock:
+            corrected = [self._correct_term(term, field) or term for term in terms]
+        if corrected == terms:
+            return None
+        return " ".join(corrected)
+
+    def update_book(self, book):
+        with self._lock:
+            # 索引を作る前なら、作るときに読み込まれる
+            if self._built_version is not None:
+                self._remove(book.pk)
+                self._add(book.pk, self._words_of(book))
+            self._mark_changed()
+
+    def remove_book(self, pk):
+        with self._lock:
+            if self._built_version is not None:
+                self._remove(pk)
+            self._mark_changed()
+
+    def _build(self):
+        rows = Book.objects.values_list(
+            "pk", *(f"{field}_normalized" for field in SPELLING_FIELDS)
+        ).iterator(chunk_size=2000)
+        for pk, *values in rows:
+            self._add(
+                pk,
+                {
+                    (field, word)
+                    for field, value in zip(SPELLING_FIELDS, values)
+                    for word in value.split()
+                },
+            )
+
+    def _words_of(self, book):
+        return {
+            (field, word)
+            for field in SPELLING_FIELDS
+            for word in getattr(book, f"{field}_normalized").split()
+        }
+
+    def _allowed_distance(self, term):
+        # 短い語ほど別の語と取り違えやすいため、直す文字数を減らす
+        return min(self.max_distance, len(term) // 3)
+
+    def _deletes_of(self, word, distance):
+        word = word[: self.prefix_length]
+        deletes = {word}
+        edge = {word}
+        for _ in range(distance):
+            edge = {
+                candidate[:i] + candidate[i + 1 :]
+                for candidate in edge
+                for i in range(len(candidate))
+            }
+            deletes |= edge
+        return deletes
+
+    def _correct_term(self, term, field):
+        words = self._words[field]
+        if term in words:
+            return None
+        distance = self._allowed_distance(term)
+        if not distance:
+            return None
+
+        deletes = self._deletes[field]
+        candidates = set()
+        for delete in self._deletes_of(term, distance):
+            candidates |= deletes.get(delete, set())
+
+        best = None
+        for candidate in candidates:
+            found = edit_distance(term, candidate, distance)
+            if found > distance:
+                continue
+            # 距離が近く、多くの書籍に現れる語を優先する
+            rank = (found, -words[candidate], candidate)
+            if best is None or rank < best:
+                best = rank
+        return best and best[2]
+
+    def _add(self, pk, words):
+        for field, word in words:
+            count = self._words[field].get(word, 0)
+            if not count:
+                for delete in self._deletes_of(word, self.max_distance):
+                    self._deletes[field].setdefault(delete, set()).add(word)
+            self._words[field][word] = count + 1
+        self._by_book[pk] = words
+
+    def _remove(self, pk):
+        for field, word in self._by_book.pop(pk, ()):
+            count = self._words[field][word] - 1
+            if count:
+                self._words[field][word] = count
+                continue
+            del self._words[field][word]
+            for delete in self._deletes_of(word, self.max_distance):
+                originals = self._deletes[field][delete]
+                originals.discard(word)
+                if not originals:
+                    del self._deletes[field][delete]
+
+
+spelling_index = SpellingIndex()
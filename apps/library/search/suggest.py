@@ -0,0 +1,181 @@
+import heapq
+from bisect import bisect_left, insort
+
+from apps.catalog.models import Book
+from apps.catalog.normalization import normalize_search_text
+from apps.library.search.memory import SharedVersionIndex
+
+# 候補にする Book のフィールド
+SUGGEST_FIELDS = ("title", "author")
+
+
+class SuggestionIndex(SharedVersionIndex):
+    """
+    検索フォームの入力補完用の、タイトル・著者の前方一致の索引。
+
+    正規化した値の昇順に並べた配列を二分探索して、前方一致する候補の範囲を求める。
+    1〜2文字の前方一致は範囲が広く、ロックを持ったまま走査すると更新を待たせるため、
+    前方一致ごとの上位の候補を作成時に求めておき（_top）、更新時に差分で保つ。
+    索引はプロセスごとのメモリに持ち、起動時（warm_up）か最初の問い合わせで作成する。
+    Book の保存・削除時は update_book / remove_book で差分だけ更新する。
+    """
+
+    version_key = "library:suggest:version"
+    # 上位の候補を持っておく前方一致の長さ
+    short_prefix_length = 2
+    # 前方一致ごとに持つ候補の数（削除で減っても limit 件を下回りにくいよう多めに持つ）
+    top_size = 50
+
+    def _reset(self):
+        # (正規化した値, フィールド, 表示する値) の昇順の配列
+        self._entries = []
+        # (フィールド, 表示する値) ごとの書籍の数（候補の順位に使う）
+        self._counts = {}
+        # 書籍ごとに登録した (フィールド, 表示する値)
+        self._by_book = {}
+        # (短い前方一致, フィールドまたは None) ごとの、順位の昇順の候補（_rank の値）
+        self._top = {}
+        # 前方一致するすべての候補を _top に持っているキー
+        self._complete = set()
+
+    def suggest(self, prefix, field=None, limit=10):
+        """
+        正規化した値が prefix で始まる候補を、書籍の数が多い順に最大 limit 件返す。
+
+        Returns:
+            list[dict]: {"value": 表示する値, "field": フィールド名} のリスト
+        """
+        prefix = normalize_search_text(prefix)
+        if not prefix:
+            return []
+
+        self._ensure_built()
+        with self._lock:
+            if len(prefix) <= self.short_prefix_length and limit <= self.top_size:
+                top = self._short_prefix_top(prefix, field, limit)
+            else:
+                top = self._scan(prefix, field, limit)
+        return [{"value": value, "field": kind} for _, _, value, kind in top]
+
+    def _rank(self, field, value):
+        # 書籍の数が多い順、同数なら短い順に並ぶ
+        return (-self._counts[field, value], len(value), value, field)
+
+    def _top_keys(self, normalized, field):
+        for length in range(1, min(len(normalized), self.short_prefix_length) + 1):
+            yield normalized[:length], None
+            yield normalized[:length], field
+
+    def _scan(self, prefix, field, limit):
+        """配列の前方一致の範囲を走査して、上位 limit 件を求める。"""
+        matches = []
+        for index in range(bisect_left(self._entries, (prefix,)), len(self._entries)):
+            normalized, kind, value = self._entries[index]
+            if not normalized.startswith(prefix):
+                break
+            if field is None or kind == field:
+                matches.append(self._rank(kind, value))
+        return heapq.nsmallest(limit, matches)
+
+    def _short_prefix_top(self, prefix, field, limit):
+        key = (prefix, field)
+        top = self._top.get(key)
+        if top is None or (len(top) < limit and key not in self._complete):
+            # 削除で候補が足りなくなった場合だけ、範囲を走査して求め直す
+            top = self._top[key] = self._scan(prefix, field, self.top_size)
+            if len(top) < self.top_size:
+                self._complete.add(key)
+        return top[:limit]
+
+    def _update_top(self, normalized, field, value, old_count, new_count):
+        """
+        (field, value) の書籍の数が変わったときに、短い前方一致の上位の候補を更新する。
+        持っていない候補より順位が上のものだけを持つように保つ。
+        """
+        old = (-old_count, len(value), value, field)
+        new = (-new_count, len(value), value, field)
+        for key in self._top_keys(normalized, field):
+            top = self._top.get(key)
+            if top is None:
+                continue
+            index = bisect_left(top, old)
+            if index < len(top) and top[index] == old:
+                del top[index]
+            if not new_count:
+                continue
+            if key in self._complete or (top and new < top[-1]):
+                insort(top, new)
+            if len(top) > self.top_size:
+                top.pop()
+                self._complete.discard(key)
+
+    def update_book(self, book):
+        with self._lock:
+            # 索引を作る前なら、作るときに読み込まれる
+            if self._built_version is not None:
+                self._remove(book.pk)
+                values = [
+                    (field, value)
+                    for field in SUGGEST_FIELDS
+                    if (value := getattr(book, field).strip())
+                ]
+                for field, value in values:
+                    self._add(field, value)
+                self._by_book[book.pk] = values
+            self._mark_changed()
+
+    def remove_book(self, pk):
+        with self._lock:
+            if self._built_version is not None:
+                self._remove(pk)
+            self._mark_changed()
+
+    def _build(self):
+        rows = Book.objects.values_list("pk", *SUGGEST_FIELDS).iterator(chunk_size=2000)
+        for pk, *values in rows:
+            values = [
+                (field, value.strip())
+                for field, value in zip(SUGGEST_FIELDS, values)
+                if value.strip()
+            ]
+            for field, value in values:
+                if (field, value) not in self._counts:
+                    self._entries.append((normalize_search_text(value), field, value))
+                self._counts[field, value] = self._counts.get((field, value), 0) + 1
+            self._by_book[pk] = values
+        self._entries.sort()
+
+        candidates = {}
+        for normalized, field, value in self._entries:
+            rank = self._rank(field, value)
+            for key in self._top_keys(normalized, field):
+                candidates.setdefault(key, []).append(rank)
+        for key, ranks in candidates.items():
+            self._top[key] = heapq.nsmallest(self.top_size, ranks)
+            if len(ranks) <= self.top_size:
+                self._complete.add(key)
+
+    def _add(self, field, value):
+        normalized = normalize_search_text(value)
+        count = self._counts.get((field, value), 0)
+        if not count:
+            insort(self._entries, (normalized, field, value))
+        self._counts[field, value] = count + 1
+        self._update_top(normalized, field, value, count, count + 1)
+
+    def _remove(self, pk):
+        for field, value in self._by_book.pop(pk, []):
+            normalized = normalize_search_text(value)
+            count = self._counts[field, value] - 1
+            self._update_top(normalized, field, value, count + 1, count)
+            if count:
+                self._counts[field, value] = count
+                continue
+            del self._counts[field, value]
+            entry = (normalized, field, value)
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+
+
+suggestion_index = SuggestionIndex()
@@ -1,9 +1,10 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
-from apps.catalog.models import Copy
+from apps.catalog.models import Book, Copy
 from apps.library.models import LoanHistory, ReservationHistory
 
 
@@ -68,4 +69,9 @@ class LoanService:
         copy_locked.status = Copy.Status.LOANED
         copy_locked.save()
 
+        # 人気順の並べ替えに使う貸出回数を増やす
+        Book.objects.filter(pk=copy_locked.book_id).update(
+            loan_count=F("loan_count") + 1
+        )
+
         return loan_history
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.catalog.models import Book, Copy
+from apps.catalog.signals import books_bulk_created, copies_bulk_created
+from apps.library.search.backends import get_search_backend
+from apps.library.search.cache import SearchResultCache
+from apps.library.search.ngram import NGRAM_FIELDS, index_books
+from apps.library.search.spelling import spelling_index
+from apps.library.search.suggest import SUGGEST_FIELDS, suggestion_index
+
+
+@receiver(post_save, sender=Book)
+def update_book_ngrams(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not get_search_backend().uses_ngram_index:
+        return
+    # タイトル・著者を更新しない保存では作り直さない
+    if update_fields is not None and not set(update_fields) & {
+        f"{field}_normalized" for field in NGRAM_FIELDS
+    }:
+        return
+    index_books([instance])
+
+
+@receiver(books_bulk_created)
+def index_bulk_created_books(sender, books, **kwargs):
+    if get_search_backend().uses_ngram_index:
+        index_books(books)
+
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Copy)
+@receiver(books_bulk_created)
+@receiver(copies_bulk_created)
+def invalidate_search_results(sender, **kwargs):
+    # 書籍・蔵書が変わると検索結果や貸出状態が変わるため、キャッシュを無効にする
+    SearchResultCache().invalidate()
+
+
+# Book から作る、プロセスごとのメモリ上の索引（入力補完・綴りの修正候補）
+IN_MEMORY_INDEXES = (suggestion_index, spelling_index)
+
+
+@receiver(post_save, sender=Book)
+def update_in_memory_indexes(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(SUGGEST_FIELDS):
+        return
+
+    # ロールバックされた変更を索引に出さないよう、コミット後に反映する
+    def update():
+        for index in IN_MEMORY_INDEXES:
+            index.update_book(instance)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=Book)
+def remove_from_in_memory_indexes(sender, instance, **kwargs):
+    pk = instance.pk
+
+    def remove():
+        for index in IN_MEMORY_INDEXES:
+            index.remove_book(pk)
+
+    transaction.on_commit(remove)
+
+
+@receiver(books_bulk_created)
+def add_bulk_created_books_to_in_memory_indexes(sender, books, **kwargs):
+    def update():
+        for index in IN_MEMORY_INDEXES:
+            for book in books:
+                index.update_book(book)
+
+    transaction.on_commit(update)
@@ -36,6 +36,9 @@ def valid_reservation_data(today):
         ({"isbn": "9781234567890"}, True),
         ({"isbn": "978123456789"}, True),  # 12桁 → OK（max_length制限ではない）
         ({"isbn": "97812345678901"}, False),  # 14桁 → NG（max_length超え）
+        ({"isbn": "978-4-00-310101-8"}, True),  # ハイフン区切り → OK
+        ({"isbn": "978-4-00"}, True),  # 途中まで → 前方一致
+        ({"isbn": "978a"}, False),  # 数字以外 → NG
     ],
 )
 def test_book_search_form_validation(data, is_valid):
@@ -43,6 +46,20 @@ def test_book_search_form_validation(data, is_valid):
     assert form.is_valid() == is_valid
 
 
+@pytest.mark.parametrize(
+    "isbn, expected",
+    [
+        ("978-4-00-310101-8", "9784003101018"),
+        ("4-00-310101-4", "9784003101018"),  # ISBN-10 は ISBN-13 に変換
+        ("978 4 00", "978400"),
+    ],
+)
+def test_book_search_form_cleans_isbn(isbn, expected):
+    form = BookSearchForm(data={"isbn": isbn})
+    assert form.is_valid()
+    assert form.cleaned_data["isbn"] == expected
+
+
 @pytest.mark.django_db
 class TestLoanForm:
 
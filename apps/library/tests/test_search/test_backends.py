@@ -0,0 +1,189 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from apps.catalog.models import Book
+from apps.catalog.tests.test_readings import TEST_CONVERTER
+from apps.library.search.backends import (
+    PostgresSearchBackend,
+    SimpleSearchBackend,
+    SQLiteSearchBackend,
+    ensure_search_index,
+    get_search_backend,
+)
+
+pytestmark = pytest.mark.django_db
+
+requires_sqlite = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="FTS5 は SQLite のみ"
+)
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="pg_trgm は PostgreSQL のみ"
+)
+
+
+def create_book(isbn, title, author="著者", publisher="出版社"):
+    return Book.objects.create(
+        isbn=isbn,
+        title=title,
+        author=author,
+        publisher=publisher,
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+def search(backend, **criteria):
+    return list(
+        backend.search(Book.objects.all(), criteria).order_by("-search_rank", "pk")
+    )
+
+
+def test_get_search_backend_uses_setting(settings):
+    settings.LIBRARY_SEARCH_BACKEND = "apps.library.search.backends.SimpleSearchBackend"
+    assert isinstance(get_search_backend(), SimpleSearchBackend)
+
+
+def test_matches_reading_with_default_converter(settings):
+    pytest.importorskip("pykakasi")
+    # 未設定なら pykakasi で読みを求める
+    settings.CATALOG_READING_CONVERTER = ""
+    book = create_book("1111111111111", "吾輩は猫である", author="夏目漱石")
+    create_book("2222222222222", "坊っちゃん", author="夏目")
+
+    assert search(get_search_backend(), title="わがはい", author="なつめそうせき") == [
+        book
+    ]
+    assert search(get_search_backend(), title="ねこ") == [book]
+
+
+@requires_postgresql
+@pytest.mark.parametrize(
+    "field, index",
+    [
+        ("title", "catalog_book_title_normalized_trgm_idx"),
+        ("author", "catalog_book_author_normalized_trgm_idx"),
+        ("publisher", "catalog_book_publisher_normalized_trgm_idx"),
+    ],
+)
+def test_postgres_trigram_search_uses_index(field, index):
+    create_book(
+        "1111111111111", "吾輩は猫である", author="夏目漱石", publisher="猫である書店"
+    )
+    queryset = PostgresSearchBackend().search(Book.objects.all(), {field: "猫である"})
+
+    with connection.cursor() as cursor:
+        # 件数が少なくても索引を使う計画になるよう、逐次走査を避けさせる
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+    assert index in plan
+
+
+@requires_postgresql
+def test_postgres_matches_publisher_substring():
+    book = create_book("1111111111111", "広辞苑", publisher="岩波書店")
+    create_book("2222222222222", "吾輩は猫である", publisher="新潮社")
+
+    assert search(PostgresSearchBackend(), publisher="書店") == [book]
+
+
+@requires_postgresql
+def test_postgres_short_terms_use_ngram_index():
+    book = create_book("1111111111111", "Python入門", author="田中一郎")
+    create_book("2222222222222", "Python実践", author="佐藤")
+    queryset = PostgresSearchBackend().search(Book.objects.all(), {"title": "入"})
+
+    assert list(queryset) == [book]
+    assert "library_bookngram" in str(queryset.query)
+
+
+@requires_sqlite
+class TestSQLiteSearchBackend:
+
+    def test_index_follows_save_and_delete(self):
+        backend = SQLiteSearchBackend()
+        book = create_book("1111111111111", "Python入門")
+        assert search(backend, title="python") == [book]
+
+        book.title = "Django実践"
+        book.save()
+        assert search(backend, title="python") == []
+        assert search(backend, title="Django") == [book]
+
+        book.delete()
+        assert search(backend, title="Django") == []
+
+    def test_index_follows_queryset_update(self):
+        backend = SQLiteSearchBackend()
+        book = create_book("1111111111111", "Python入門")
+
+        Book.objects.filter(pk=book.pk).update(publisher="技術評論社")
+        # 検索用の列は save でしか設定されないため、コマンドで設定し直す
+        assert search(backend, publisher="技術評論") == []
+        call_command("backfill_normalized_fields", stdout=StringIO())
+
+        assert search(backend, publisher="技術評論") == [book]
+
+    def test_matches_regardless_of_kana_and_width(self):
+        backend = SQLiteSearchBackend()
+        book = create_book(
+            "1111111111111", "ぱいそん入門 ＶＯＬ２", publisher="ｵｰﾗｲﾘｰ･ｼﾞｬﾊﾟﾝ"
+        )
+
+        assert search(backend, title="パイソン") == [book]
+        assert search(backend, title="vol2") == [book]
+        assert search(backend, title="ﾊﾟｲ") == [book]
+        assert search(backend, publisher="オーライリー") == [book]
+
+    def test_title_match_ranks_above_publisher_match(self):
+        backend = SQLiteSearchBackend()
+        by_publisher = create_book("1111111111111", "入門書", publisher="Python出版")
+        by_title = create_book("2222222222222", "Pythonクックブック")
+
+        assert search(backend, title="Python") == [by_title]
+
+        # 同じ語でも、タイトルでの一致が出版社での一致より関連度が高い
+        title_rank = (
+            backend.search(Book.objects.filter(pk=by_title.pk), {"title": "Python"})
+            .get()
+            .search_rank
+        )
+        publisher_rank = (
+            backend.search(
+                Book.objects.filter(pk=by_publisher.pk), {"publisher": "Python"}
+            )
+            .get()
+            .search_rank
+        )
+        assert title_rank > publisher_rank
+
+    def test_short_terms_use_ngram_index(self):
+        backend = SQLiteSearchBackend()
+        book = create_book("1111111111111", "Python入門", author="田中一郎")
+        create_book("2222222222222", "Python実践", author="佐藤")
+
+        assert search(backend, title="Python 入門", author="田中") == [book]
+        assert search(backend, title="入") == [book]
+
+    def test_matches_reading_of_kanji_title_and_author(self, settings):
+        settings.CATALOG_READING_CONVERTER = TEST_CONVERTER
+        backend = SQLiteSearchBackend()
+        book = create_book("1111111111111", "吾輩は猫である", author="山田太郎")
+        create_book("2222222222222", "坊っちゃん", author="夏目")
+
+        assert search(backend, author="やまだ") == [book]
+        assert search(backend, title="わがはい", author="山田") == [book]
+        # 1〜2文字の読みは n-gram の索引で引く
+        assert search(backend, title="ねこ") == [book]
+
+    def test_ensure_search_index_recreates_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER catalog_book_fts_ai")
+
+        ensure_search_index()
+        book = create_book("1111111111111", "Python入門")
+
+        assert search(SQLiteSearchBackend(), title="Python") == [book]
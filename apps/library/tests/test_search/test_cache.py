@@ -0,0 +1,153 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.catalog.models import Book, Copy, StorageLocation
+from apps.core.pagination import KeysetPaginator
+from apps.library.search.cache import SearchResultCache
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def general():
+    return User.objects.create_user(
+        username="gen", password="pass", role=User.UserRole.GENERAL
+    )
+
+
+def create_book(isbn, title):
+    return Book.objects.create(
+        isbn=isbn,
+        title=title,
+        author="著者",
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+def test_get_and_set_records_hits_and_misses():
+    result_cache = SearchResultCache()
+    query = {"title": "python", "cursor": None}
+
+    assert result_cache.get(query) is None
+    result_cache.set(query, {"pks": [1]})
+    assert result_cache.get(query) == {"pks": [1]}
+
+    assert result_cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_invalidate_bumps_version_after_commit(django_capture_on_commit_callbacks):
+    result_cache = SearchResultCache()
+    query = {"title": "python"}
+    result_cache.set(query, {"pks": [1]})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        result_cache.invalidate()
+
+    assert result_cache.get(query) is None
+
+
+def test_result_computed_before_invalidation_is_not_served():
+    result_cache = SearchResultCache()
+    query = {"title": "python"}
+    version = result_cache.version()
+
+    # 検索の実行中に変更がコミットされ、バージョン番号が上がった場合
+    result_cache._bump()
+    result_cache.set(query, {"pks": [1]}, version)
+
+    assert result_cache.get(query) is None
+
+
+def test_disabled_when_timeout_is_zero(settings):
+    settings.LIBRARY_SEARCH_CACHE_TIMEOUT = 0
+    result_cache = SearchResultCache()
+
+    result_cache.set({"title": "python"}, {"pks": [1]})
+
+    assert result_cache.get({"title": "python"}) is None
+
+
+class TestBookSearchViewCache:
+
+    def test_same_normalised_query_is_served_from_cache(self, client, general):
+        book = create_book("1111111111111", "Python入門")
+        client.force_login(general)
+        url = reverse("library:book_search")
+
+        client.get(url, {"title": "Python"})
+        response = client.get(url, {"title": " ＰＹＴＨＯＮ "})
+
+        assert list(response.context["books"]) == [book]
+        # 結果のページとファセットの集計の両方がキャッシュから返る
+        assert SearchResultCache().stats()["hits"] == 2
+
+    def test_change_during_search_is_not_cached_as_current(
+        self, client, general, monkeypatch
+    ):
+        create_book("1111111111111", "Python入門")
+        client.force_login(general)
+        url = reverse("library:book_search")
+        original_page = KeysetPaginator.page
+
+        def page_with_concurrent_change(self, cursor=None):
+            page = original_page(self, cursor)
+            # ページを読んだ後、保存する前に他のリクエストの変更がコミットされた場合
+            SearchResultCache()._bump()
+            return page
+
+        monkeypatch.setattr(KeysetPaginator, "page", page_with_concurrent_change)
+        client.get(url, {"title": "Python"})
+        monkeypatch.setattr(KeysetPaginator, "page", original_page)
+        client.get(url, {"title": "Python"})
+
+        assert SearchResultCache().stats()["hits"] == 0
+
+    def test_book_and_copy_changes_invalidate(
+        self, client, general, django_capture_on_commit_callbacks, settings
+    ):
+        # 読みの列で関連度が変わらないよう、読みを設定しない
+        settings.CATALOG_READING_CONVERTER = "apps.catalog.readings.ReadingConverter"
+        book = create_book("1111111111111", "Python入門")
+        client.force_login(general)
+        url = reverse("library:book_search")
+        params = {"title": "Python", "available_only": "on"}
+        assert list(client.get(url, params).context["books"]) == []
+
+        location = StorageLocation.objects.create(name="第1書庫")
+        with django_capture_on_commit_callbacks(execute=True):
+            Copy.objects.bulk_create(
+                [Copy(book=book, location=location, status=Copy.Status.AVAILABLE)]
+            )
+        assert list(client.get(url, params).context["books"]) == [book]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other = create_book("2222222222222", "Python実践")
+            Copy.objects.create(
+                book=other, location=location, status=Copy.Status.AVAILABLE
+            )
+        assert list(client.get(url, params).context["books"]) == [book, other]
+
+
+def test_search_cache_stats_command():
+    SearchResultCache().get({"title": "python"})
+    out = StringIO()
+
+    call_command("search_cache_stats", reset=True, stdout=out)
+
+    assert "hits=0 misses=1" in out.getvalue()
+    assert SearchResultCache().stats()["misses"] == 0
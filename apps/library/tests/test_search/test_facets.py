@@ -0,0 +1,160 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.catalog.models import Book, Copy, StorageLocation
+from apps.library.search.facets import compute_facets
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def general():
+    return User.objects.create_user(
+        username="gen", password="pass", role=User.UserRole.GENERAL
+    )
+
+
+@pytest.fixture
+def books():
+    first = StorageLocation.objects.create(name="第1書庫")
+    second = StorageLocation.objects.create(name="第2書庫")
+    rows = [
+        ("1111111111111", "技術出版", datetime.date(1995, 1, 1), "year"),
+        ("2222222222222", "技術出版", datetime.date(2012, 5, 1), "month"),
+        ("3333333333333", "文芸社", datetime.date(2018, 1, 1), "day"),
+        ("4444444444444", "", datetime.date(1980, 1, 1), "unknown"),
+    ]
+    books = [
+        Book.objects.create(
+            isbn=isbn,
+            title=f"Python {index}",
+            author="著者",
+            publisher=publisher,
+            published_date=date,
+            published_date_precision=precision,
+        )
+        for index, (isbn, publisher, date, precision) in enumerate(rows)
+    ]
+    Copy.objects.create(book=books[0], location=first, status=Copy.Status.AVAILABLE)
+    Copy.objects.create(book=books[0], location=first, status=Copy.Status.LOANED)
+    Copy.objects.create(book=books[1], location=second, status=Copy.Status.AVAILABLE)
+    Copy.objects.create(book=books[2], location=second, status=Copy.Status.DISCARDED)
+    return books, first, second
+
+
+def test_compute_facets_counts_in_one_query(books, django_assert_num_queries):
+    _, first, second = books
+
+    with django_assert_num_queries(1):
+        facets = compute_facets(Book.objects.all())
+
+    assert facets == {
+        "publisher": [("技術出版", "技術出版", 2), ("文芸社", "文芸社", 1)],
+        # 出版日の精度が「不明」の書籍は数えない
+        "decade": [("2010", "2010", 2), ("1990", "1990", 1)],
+        # 廃棄済みの蔵書は数えず、同じ書籍の複数の蔵書は1冊と数える
+        "location": [(str(first.pk), "第1書庫", 1), (str(second.pk), "第2書庫", 1)],
+    }
+
+
+def test_compute_facets_limits_to_queryset(books):
+    facets = compute_facets(Book.objects.filter(publisher="文芸社"))
+
+    assert facets == {
+        "publisher": [("文芸社", "文芸社", 1)],
+        "decade": [("2010", "2010", 1)],
+        "location": [],
+    }
+
+
+class TestBookSearchViewFacets:
+
+    def test_facets_are_shown_with_links(self, client, general, books):
+        client.force_login(general)
+
+        response = client.get(reverse("library:book_search"), {"title": "Python"})
+
+        publisher = response.context["facets"][0]
+        assert publisher["title"] == "出版社"
+        assert publisher["clear_url"] is None
+        assert publisher["items"][0] == {
+            "label": "技術出版",
+            "count": 2,
+            "active": False,
+            "url": "?title=Python&exact_publisher=%E6%8A%80%E8%A1%93%E5%87%BA%E7%89%88",
+        }
+        assert response.context["facets"][1]["items"][0]["label"] == "2010年代"
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"exact_publisher": "技術出版"}, [0, 1]),
+            ({"decade": "1990"}, [0]),
+            # 出版日の精度が「不明」の書籍は年代で絞り込まない
+            ({"decade": "1980"}, []),
+            ({"location": "second"}, [1]),
+        ],
+    )
+    def test_facet_filters(self, client, general, books, params, expected):
+        books, _, second = books
+        if params.get("location") == "second":
+            params = {"location": second.pk}
+        client.force_login(general)
+
+        response = client.get(
+            reverse("library:book_search"), {"title": "Python", **params}
+        )
+
+        assert list(response.context["books"]) == [books[i] for i in expected]
+
+    def test_active_facet_has_clear_link(self, client, general, books):
+        client.force_login(general)
+
+        response = client.get(
+            reverse("library:book_search"),
+            {"title": "Python", "decade": "1990"},
+        )
+
+        decade = response.context["facets"][1]
+        assert decade["items"] == [
+            {
+                "label": "1990年代",
+                "count": 1,
+                "active": True,
+                "url": "?title=Python&decade=1990",
+            }
+        ]
+        assert decade["clear_url"] == "?title=Python"
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"decade": "x"}, {"location": "1; DROP"}, {"sort": "unknown"}],
+    )
+    def test_malformed_facet_or_sort_is_ignored(self, client, general, books, params):
+        books, _, _ = books
+        client.force_login(general)
+
+        # 壊れたパラメーターは無視し、キーワードの絞り込みは効かせる
+        response = client.get(
+            reverse("library:book_search"), {"title": "zzz", **params}
+        )
+        assert list(response.context["books"]) == []
+        assert not response.context["form"].errors
+
+        response = client.get(
+            reverse("library:book_search"), {"title": "Python 1", **params}
+        )
+        assert list(response.context["books"]) == [books[1]]
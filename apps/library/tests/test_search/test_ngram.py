@@ -0,0 +1,122 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.catalog.models import Book
+from apps.catalog.signals import books_bulk_created
+from apps.catalog.tests.test_readings import TEST_CONVERTER
+from apps.library.models import BookNGram
+from apps.library.search.backends import SimpleSearchBackend
+from apps.library.search.ngram import filter_by_ngrams, ngrams
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def use_ngram_backend(settings):
+    settings.LIBRARY_SEARCH_BACKEND = "apps.library.search.backends.SimpleSearchBackend"
+
+
+def create_book(isbn, title, author="著者"):
+    return Book.objects.create(
+        isbn=isbn,
+        title=title,
+        author=author,
+        publisher="出版社",
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+def test_ngrams_are_unigrams_and_bigrams_within_words():
+    assert ngrams("Ab 入門") == {"a", "b", "ab", "入", "門", "入門"}
+
+
+def test_save_indexes_title_and_author():
+    book = create_book("1111111111111", "銀河鉄道の夜", author="宮沢賢治")
+
+    grams = set(BookNGram.objects.filter(book=book).values_list("field", "gram"))
+    assert ("title", "鉄道") in grams
+    assert ("author", "賢治") in grams
+
+    book.title = "風の又三郎"
+    book.save()
+    assert not BookNGram.objects.filter(book=book, gram="鉄道").exists()
+    assert BookNGram.objects.filter(book=book, field="title", gram="三郎").exists()
+
+
+def test_save_without_title_or_author_does_not_reindex(django_assert_num_queries):
+    book = create_book("1111111111111", "銀河鉄道の夜")
+
+    book.publisher = "別の出版社"
+    with django_assert_num_queries(1):
+        book.save(update_fields=["publisher"])
+
+
+def test_bulk_created_books_are_indexed_by_signal():
+    book = Book(
+        isbn="1111111111111",
+        title="銀河鉄道の夜",
+        published_date=datetime.date(2024, 1, 1),
+    )
+    book.normalize_search_fields()
+    books = Book.objects.bulk_create([book])
+
+    books_bulk_created.send(sender=Book, books=books)
+
+    assert BookNGram.objects.filter(book=books[0], gram="鉄道").exists()
+
+
+@pytest.mark.parametrize(
+    "term, expected",
+    [
+        ("鉄", True),
+        ("鉄道", True),
+        ("河鉄道", True),
+        ("道鉄", False),
+        ("鉄道夜", False),
+    ],
+)
+def test_filter_by_ngrams(term, expected):
+    book = create_book("1111111111111", "銀河鉄道の夜")
+
+    matched = filter_by_ngrams(Book.objects.all(), "title", term)
+
+    assert (book in matched) is expected
+
+
+def test_simple_backend_searches_substrings_with_ngrams():
+    book = create_book(
+        "1111111111111", "ハリー・ポッターと賢者の石", author="J.K.ローリング"
+    )
+    create_book("2222222222222", "ハリー・ポッターと秘密の部屋")
+
+    results = SimpleSearchBackend().search(
+        Book.objects.all(), {"title": "賢者", "author": "ローリング"}
+    )
+
+    assert list(results) == [book]
+
+
+def test_simple_backend_searches_readings(settings):
+    settings.CATALOG_READING_CONVERTER = TEST_CONVERTER
+    book = create_book("1111111111111", "吾輩は猫である", author="山田太郎")
+    create_book("2222222222222", "坊っちゃん", author="夏目")
+
+    results = SimpleSearchBackend().search(
+        Book.objects.all(), {"title": "わがはい", "author": "やまだ"}
+    )
+
+    assert list(results) == [book]
+
+
+def test_rebuild_book_ngrams_command():
+    book = create_book("1111111111111", "銀河鉄道の夜")
+    Book.objects.filter(pk=book.pk).update(title="風の又三郎")
+
+    call_command("backfill_normalized_fields", stdout=StringIO())
+    call_command("rebuild_book_ngrams", stdout=StringIO())
+
+    assert BookNGram.objects.filter(book=book, gram="三郎").exists()
+    assert not BookNGram.objects.filter(book=book, gram="鉄道").exists()
@@ -0,0 +1,107 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.catalog.models import Book
+from apps.library.search.spelling import SpellingIndex, edit_distance, spelling_index
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    cache.clear()
+    spelling_index.clear()
+    yield
+    cache.clear()
+    spelling_index.clear()
+
+
+def create_book(isbn, title, author="著者"):
+    return Book.objects.create(
+        isbn=isbn,
+        title=title,
+        author=author,
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("python", "python", 0),
+        ("python", "pyhton", 1),
+        ("python", "pythn", 1),
+        ("kitten", "sitting", 3),
+        # limit を超えたら limit + 1 で打ち切る
+        ("python", "django", 3),
+    ],
+)
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b, limit=2) == min(expected, 3)
+
+
+def test_corrects_each_term_to_the_closest_word():
+    create_book("1111111111111", "Django Book", author="Guido Rossum")
+    create_book("2222222222222", "Python Cookbook", author="Guido Rossum")
+    create_book("3333333333333", "Python Tricks", author="Dan Bader")
+    index = SpellingIndex()
+
+    assert index.correct("Pyhton cookbok", "title") == "python cookbook"
+    assert index.correct("ＧＵＩＤＯ Rosum", "author") == "guido rossum"
+    # 辞書にある語・短い語は直さない
+    assert index.correct("python", "title") is None
+    assert index.correct("pyt", "title") is None
+    # フィールドごとに別の辞書を引く
+    assert index.correct("bader", "title") is None
+
+
+def test_incremental_updates_do_not_query_database(django_assert_num_queries):
+    book = create_book("1111111111111", "Python入門")
+    index = SpellingIndex()
+    index.correct("python入問", "title")
+
+    book.title = "Django入門"
+    book.save()
+    with django_assert_num_queries(0):
+        index.update_book(book)
+        assert index.correct("python入問", "title") is None
+        assert index.correct("django入問", "title") == "django入門"
+
+        index.remove_book(book.pk)
+        assert index.correct("django入問", "title") is None
+
+
+def test_book_signals_update_index(django_capture_on_commit_callbacks):
+    spelling_index.correct("python", "title")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_book("1111111111111", "Python Cookbook")
+
+    assert spelling_index.correct("cookbok", "title") == "cookbook"
+
+
+def test_search_view_suggests_correction_when_nothing_found(client):
+    create_book("1111111111111", "Python Cookbook", author="山田太郎")
+    user = User.objects.create_user(
+        username="gen", password="pass", role=User.UserRole.GENERAL
+    )
+    client.force_login(user)
+    url = reverse("library:book_search")
+
+    response = client.get(url, {"title": "Pyhton", "author": "山田太朗"})
+
+    assert list(response.context["books"]) == []
+    assert response.context["did_you_mean"] == {
+        "corrections": {"title": "python", "author": "山田太郎"},
+        "url": "?title=python&author=%E5%B1%B1%E7%94%B0%E5%A4%AA%E9%83%8E",
+    }
+    assert "もしかして" in response.content.decode()
+
+    response = client.get(url, {"title": "Python"})
+    assert "did_you_mean" not in response.context
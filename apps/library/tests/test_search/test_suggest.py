@@ -0,0 +1,185 @@
+import datetime
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.catalog.models import Book
+from apps.library.search.memory import warm_up
+from apps.library.search.suggest import SuggestionIndex, suggestion_index
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    cache.clear()
+    suggestion_index.clear()
+    yield
+    cache.clear()
+    suggestion_index.clear()
+
+
+def create_book(isbn, title, author="著者"):
+    return Book.objects.create(
+        isbn=isbn,
+        title=title,
+        author=author,
+        published_date=datetime.date(2024, 1, 1),
+    )
+
+
+def values(suggestions):
+    return [suggestion["value"] for suggestion in suggestions]
+
+
+def test_suggests_normalised_prefix_matches_ranked_by_book_count():
+    create_book("1111111111111", "Python入門", author="山田太郎")
+    create_book("2222222222222", "Pythonクックブック", author="山田太郎")
+    create_book("3333333333333", "パイソン実践", author="山本花子")
+    index = SuggestionIndex()
+
+    assert values(index.suggest("ｐｙｔｈｏｎ")) == ["Python入門", "Pythonクックブック"]
+    assert values(index.suggest("ぱい")) == ["パイソン実践"]
+    assert values(index.suggest("山", field="author")) == ["山田太郎", "山本花子"]
+    assert index.suggest("") == []
+
+
+def test_incremental_updates_do_not_query_database(django_assert_num_queries):
+    book = create_book("1111111111111", "Python入門")
+    index = SuggestionIndex()
+    index.suggest("py")
+
+    book.title = "Django入門"
+    with django_assert_num_queries(0):
+        index.update_book(book)
+        assert values(index.suggest("py")) == []
+        assert values(index.suggest("dj")) == ["Django入門"]
+
+        index.remove_book(book.pk)
+        assert values(index.suggest("dj")) == []
+
+
+def test_rebuilds_after_change_in_another_process():
+    create_book("1111111111111", "Python入門")
+    index = SuggestionIndex()
+    other_process = SuggestionIndex()
+    index.suggest("py")
+
+    book = create_book("2222222222222", "Pythonクックブック")
+    other_process.update_book(book)
+
+    assert values(index.suggest("py")) == ["Python入門", "Pythonクックブック"]
+
+
+def test_answers_without_waiting_while_another_thread_rebuilds(
+    django_assert_num_queries,
+):
+    create_book("1111111111111", "Python入門")
+    index = SuggestionIndex()
+    index.suggest("py")
+    # 他のプロセスの変更で索引が古くなり、別のスレッドが作り直している場合
+    SuggestionIndex().update_book(create_book("2222222222222", "Pythonクックブック"))
+    index._building = True
+
+    with django_assert_num_queries(0):
+        assert values(index.suggest("py")) == ["Python入門"]
+
+
+def test_build_does_not_hold_the_lock(monkeypatch):
+    create_book("1111111111111", "Python入門")
+    index = SuggestionIndex()
+    original_build = SuggestionIndex._build
+    answered = []
+
+    def build_while_other_thread_suggests(self):
+        original_build(self)
+        other = threading.Thread(target=lambda: answered.append(index.suggest("py")))
+        other.start()
+        other.join(timeout=5)
+
+    monkeypatch.setattr(SuggestionIndex, "_build", build_while_other_thread_suggests)
+    assert values(index.suggest("py")) == ["Python入門"]
+    # 作り直している間の問い合わせは、作り直す前の（空の）索引で答える
+    assert answered == [[]]
+
+
+def test_short_prefix_does_not_scan_entries(monkeypatch):
+    create_book("1111111111111", "Python入門")
+    create_book("2222222222222", "Pythonクックブック")
+    index = SuggestionIndex()
+    index.suggest("pyth")
+
+    def scan(*args):
+        raise AssertionError("scanned the entries")
+
+    monkeypatch.setattr(index, "_scan", scan)
+    assert values(index.suggest("p")) == ["Python入門", "Pythonクックブック"]
+    assert values(index.suggest("py", field="title")) == [
+        "Python入門",
+        "Pythonクックブック",
+    ]
+
+
+def test_short_prefix_top_follows_incremental_updates(monkeypatch):
+    monkeypatch.setattr(SuggestionIndex, "top_size", 3)
+    books = [
+        create_book(f"{i:013d}", f"P{i % 5}", author=f"P{i % 3}") for i in range(1, 16)
+    ]
+    index = SuggestionIndex()
+    index.suggest("p")
+
+    for book in books[:8]:
+        index.remove_book(book.pk)
+        book.title = f"P{book.pk % 4}x"
+        index.update_book(book)
+        for field in (None, "title", "author"):
+            # 差分で保った上位の候補が、範囲を走査した結果と一致する
+            assert index.suggest("p", field=field, limit=3) == [
+                {"value": value, "field": kind}
+                for _, _, value, kind in index._scan("p", field, 3)
+            ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_up_builds_indexes_in_background(django_assert_num_queries):
+    create_book("1111111111111", "Python入門")
+    index = SuggestionIndex()
+
+    warm_up([index]).join(timeout=5)
+
+    with django_assert_num_queries(0):
+        assert values(index.suggest("py")) == ["Python入門"]
+
+
+def test_book_signals_update_index(django_capture_on_commit_callbacks):
+    suggestion_index.suggest("py")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book = create_book("1111111111111", "Python入門")
+    assert values(suggestion_index.suggest("py")) == ["Python入門"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book.delete()
+    assert values(suggestion_index.suggest("py")) == []
+
+
+def test_suggest_view(client):
+    create_book("1111111111111", "Python入門", author="Pyle")
+    user = User.objects.create_user(
+        username="gen", password="pass", role=User.UserRole.GENERAL
+    )
+    client.force_login(user)
+
+    response = client.get(
+        reverse("library:book_suggest"), {"q": "py", "field": "title"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "suggestions": [{"value": "Python入門", "field": "title"}]
+    }
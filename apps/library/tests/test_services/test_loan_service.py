@@ -94,6 +94,23 @@ class TestLoanService:
         copy.refresh_from_db()
         assert copy.status == Copy.Status.LOANED
 
+    def test_loan_and_return_update_book_counters(self, general, copy, today, due):
+        book = copy.book
+        book.refresh_from_db()
+        assert (book.available_copies, book.loaned_copies) == (1, 0)
+
+        loan = LoanService.loan_copy(
+            user=general, copy=copy, loan_date=today, due_date=due
+        )
+        book.refresh_from_db()
+        assert (book.available_copies, book.loaned_copies) == (0, 1)
+
+        loan.mark_returned(return_date=today)
+        book.refresh_from_db()
+        assert (book.available_copies, book.loaned_copies) == (1, 0)
+        # 貸出回数は返却しても減らない
+        assert book.loan_count == 1
+
     def test_loan_copy_succeeds_when_reservation_period_does_not_overlap(
         self, general, copy, today, due
     ):
@@ -2,15 +2,25 @@ import datetime
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 
 from apps.catalog.models import Book, Copy, StorageLocation
+from apps.library.views import BookSearchView
 
 User = get_user_model()
 LIBRARIAN = User.UserRole.LIBRARIAN
 GENERAL = User.UserRole.GENERAL
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # 検索結果のキャッシュがテスト間で残らないようにする
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def general(db):
     return User.objects.create_user(username="gen", password="pass", role=GENERAL)
@@ -42,6 +52,12 @@ def books_with_copies(db, location):
     return book1, book2
 
 
+@pytest.fixture
+def without_readings(settings):
+    # 読みの列で関連度が変わらないよう、読みを設定しない（書籍の作成より前に使う）
+    settings.CATALOG_READING_CONVERTER = "apps.catalog.readings.ReadingConverter"
+
+
 @pytest.fixture
 def book_search_url():
     return reverse("library:book_search")
@@ -71,11 +87,11 @@ class TestBookSearchView:
         assert book1 in books
         assert book2 not in books
 
-        # annotateの検証
+        # 蔵書数のカウンターの検証
         book = next((b for b in books if b.pk == book1.pk), None)
         assert book is not None
-        assert book.available_count == 1
-        assert book.loaned_count == 1
+        assert book.available_copies == 1
+        assert book.loaned_copies == 1
 
     def test_filter_by_author(
         self, client, general, books_with_copies, book_search_url
@@ -103,10 +119,33 @@ class TestBookSearchView:
         assert book1 in books
         assert book2 not in books
 
-    def test_filter_by_isbn(self, client, general, books_with_copies, book_search_url):
+    def test_exact_isbn_redirects_to_detail(
+        self, client, general, books_with_copies, book_search_url
+    ):
         client.force_login(general)
         response = client.get(book_search_url, {"isbn": "1111111111111"})
 
+        book1, book2 = books_with_copies
+        assert response.status_code == 302
+        assert response.url == (
+            reverse("library:book_detail", args=[book1.pk]) + "?isbn=1111111111111"
+        )
+
+    def test_unknown_exact_isbn_shows_no_results(
+        self, client, general, books_with_copies, book_search_url
+    ):
+        client.force_login(general)
+        response = client.get(book_search_url, {"isbn": "3333333333333"})
+
+        assert response.status_code == 200
+        assert list(response.context["books"]) == []
+
+    def test_filter_by_isbn_prefix(
+        self, client, general, books_with_copies, book_search_url
+    ):
+        client.force_login(general)
+        response = client.get(book_search_url, {"isbn": "111-11"})
+
         assert response.status_code == 200
         books = response.context["books"]
         book1, book2 = books_with_copies
@@ -114,6 +153,22 @@ class TestBookSearchView:
         assert book1 in books
         assert book2 not in books
 
+    @pytest.mark.parametrize("prefix", ["97849", "9"])
+    def test_filter_by_isbn_prefix_ending_in_9(
+        self, client, general, book_search_url, prefix
+    ):
+        book = Book.objects.create(
+            isbn="9784900000009",
+            title="Test Book",
+            author="Author",
+            publisher="Pub",
+            published_date=datetime.date(2024, 1, 1),
+        )
+        client.force_login(general)
+        response = client.get(book_search_url, {"isbn": prefix})
+
+        assert list(response.context["books"]) == [book]
+
     def test_get_context_data_contains_form(self, client, general, book_search_url):
         client.force_login(general)
         response = client.get(book_search_url, {"title": "Python"})
@@ -123,19 +178,142 @@ class TestBookSearchView:
         assert form is not None
         assert form.is_bound  # フォームはバインドされている
 
-    def test_invalid_form_returns_unfiltered_queryset_with_annotation(
-        self, client, general, books_with_copies, book_search_url
+    @pytest.mark.parametrize(
+        "converter, shown",
+        [
+            ("apps.catalog.readings.ReadingConverter", False),
+            ("apps.catalog.tests.test_readings.DictReadingConverter", True),
+        ],
+    )
+    def test_reading_search_hint_depends_on_converter(
+        self, client, general, book_search_url, settings, converter, shown
     ):
+        settings.CATALOG_READING_CONVERTER = converter
         client.force_login(general)
-        response = client.get(book_search_url, {"isbn": " "})  # 空白だけの不正値
+        response = client.get(book_search_url)
+
+        assert ("読みでも検索できます" in response.content.decode()) is shown
+
+    @pytest.mark.parametrize("isbn", ["abc", "97840000000001"])
+    def test_invalid_form_returns_no_books(
+        self, client, general, books_with_copies, book_search_url, isbn
+    ):
+        client.force_login(general)
+        response = client.get(book_search_url, {"isbn": isbn})
 
         assert response.status_code == 200
-        books = response.context["books"]
+        assert list(response.context["books"]) == []
+        assert response.context["form"].errors
+
+    def test_pages_with_cursor(self, client, general, book_search_url, settings):
+        settings.LIBRARY_SEARCH_COUNT_LIMIT = 20
+        books = [
+            Book.objects.create(
+                title=f"Python {i}",
+                author="田中",
+                isbn=f"{i:013d}",
+                published_date=datetime.date(2024, 1, 1),
+            )
+            for i in range(1, 26)
+        ]
+        client.force_login(general)
+
+        first = client.get(book_search_url, {"author": "田中"})
+        page = first.context["page_obj"]
+        assert list(first.context["books"]) == books[:10]
+        assert page.count == 20 and page.count_capped
+        assert "20件以上" in first.content.decode()
+
+        second = client.get(
+            book_search_url, {"author": "田中", "cursor": page.next_cursor}
+        )
+        assert list(second.context["books"]) == books[10:20]
+
+        back = client.get(
+            book_search_url,
+            {"author": "田中", "cursor": second.context["page_obj"].previous_cursor},
+        )
+        assert list(back.context["books"]) == books[:10]
+
+    def test_available_only(self, client, general, books_with_copies, book_search_url):
         book1, book2 = books_with_copies
+        client.force_login(general)
 
-        # フィルターがかからず両方表示される
-        assert book1 in books
-        assert book2 in books
+        response = client.get(book_search_url, {"available_only": "on"})
+
+        assert list(response.context["books"]) == [book1]
+
+    def test_sort_by_available_copies(
+        self,
+        without_readings,
+        client,
+        general,
+        books_with_copies,
+        location,
+        book_search_url,
+    ):
+        book1, book2 = books_with_copies
+        Copy.objects.bulk_create(
+            Copy(book=book2, location=location, status=Copy.Status.AVAILABLE)
+            for _ in range(2)
+        )
+        client.force_login(general)
+
+        response = client.get(book_search_url, {"publisher": "出版社"})
+        assert list(response.context["books"]) == [book1, book2]
+
+        response = client.get(
+            book_search_url, {"publisher": "出版社", "sort": "available"}
+        )
+        assert list(response.context["books"]) == [book2, book1]
+
+    @pytest.mark.parametrize(
+        "sort, expected",
+        [
+            ("title", ["Django入門", "Python入門", "python実践", "Ruby入門"]),
+            ("newest", ["python実践", "Django入門", "Ruby入門", "Python入門"]),
+            ("popular", ["Ruby入門", "Python入門", "Django入門", "python実践"]),
+        ],
+    )
+    def test_sort_options_page_with_cursor(
+        self, client, general, book_search_url, monkeypatch, sort, expected
+    ):
+        monkeypatch.setattr(BookSearchView, "paginate_by", 3)
+        rows = [
+            ("Python入門", None, 5),
+            ("Ruby入門", datetime.date(2010, 1, 1), 9),
+            ("Django入門", datetime.date(2020, 1, 1), 5),
+            ("python実践", datetime.date(2024, 1, 1), 0),
+        ]
+        for index, (title, published_date, loan_count) in enumerate(rows):
+            book = Book.objects.create(
+                title=title,
+                author="著者",
+                isbn=f"{index + 1}" * 13,
+                published_date=published_date,
+            )
+            Book.objects.filter(pk=book.pk).update(loan_count=loan_count)
+        client.force_login(general)
+
+        first = client.get(book_search_url, {"author": "著者", "sort": sort})
+        second = client.get(
+            book_search_url,
+            {
+                "author": "著者",
+                "sort": sort,
+                "cursor": first.context["page_obj"].next_cursor,
+            },
+        )
+
+        titles = [book.title for book in first.context["books"]]
+        titles += [book.title for book in second.context["books"]]
+        assert titles == expected
+
+    def test_invalid_cursor_returns_404(self, client, general, book_search_url):
+        client.force_login(general)
+        response = client.get(book_search_url, {"title": "Python", "cursor": "!!"})
+
+        assert response.status_code == 404
 
 
 @pytest.fixture
@@ -3,6 +3,7 @@ from django.urls import path
 from apps.library.views import (
     BookDetailView,
     BookSearchView,
+    BookSuggestView,
     LoanCreateView,
     ReservationCreateView,
 )
@@ -11,6 +12,7 @@ app_name = "library"
 
 urlpatterns = [
     path("books/search/", BookSearchView.as_view(), name="book_search"),
+    path("books/suggest/", BookSuggestView.as_view(), name="book_suggest"),
     path("books/<int:pk>/", BookDetailView.as_view(), name="book_detail"),
     path(
         "copies/<int:copy_pk>/loan/new/", LoanCreateView.as_view(), name="loan_create"
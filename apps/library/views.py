@@ -1,17 +1,28 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
-from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.db.models import Case, IntegerField, Value, When
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
-from django.views.generic import DetailView, ListView
+from django.views.generic import DetailView, ListView, View
 from django.views.generic.edit import CreateView
 
 from apps.catalog.models import Book, Copy
+from apps.catalog.normalization import normalize_search_text
+from apps.catalog.readings import get_reading_converter
+from apps.catalog.utils import isbn_prefix_upper_bound
 from apps.core.mixins import IsGeneralMixin
+from apps.core.pagination import InvalidCursor, KeysetPage, KeysetPaginator
 from apps.library.forms import BookSearchForm, LoanForm, ReservationForm
 from apps.library.models import LoanHistory, ReservationHistory
+from apps.library.search.backends import SEARCH_FIELDS, get_search_backend
+from apps.library.search.cache import SearchResultCache
+from apps.library.search.facets import compute_facets
+from apps.library.search.spelling import SPELLING_FIELDS, spelling_index
+from apps.library.search.suggest import SUGGEST_FIELDS, suggestion_index
 from apps.library.services.loan_service import LoanService
 from apps.library.services.reservation_service import ReservationService
 
@@ -22,45 +33,274 @@ class BookSearchView(LoginRequiredMixin, IsGeneralMixin, ListView):
     template_name = "library/book_search.html"
     context_object_name = "books"
     paginate_by = 10
+    # 次・前のページを指すカーソルのクエリパラメーター名
+    cursor_kwarg = "cursor"
+    result_cache = SearchResultCache()
+    # 関連度順以外の並べ替えの順序。Book の複合索引と同じ順序にして、索引の順に読む
+    sort_orderings = {
+        BookSearchForm.Sort.AVAILABLE: ("-available_copies", "pk"),
+        BookSearchForm.Sort.TITLE: ("title_normalized", "pk"),
+        BookSearchForm.Sort.NEWEST: ("-published_date", "pk"),
+        BookSearchForm.Sort.POPULAR: ("-loan_count", "pk"),
+    }
+    # 並べ替えのキーのうち NULL になりうるもの（末尾に並べる）
+    nullable_sort_keys = ("published_date",)
+    # ファセットの表示名と、絞り込みに使うクエリパラメーター名
+    facet_params = {
+        "publisher": ("出版社", "exact_publisher"),
+        "decade": ("出版年代", "decade"),
+        "location": ("保存場所", "location"),
+    }
+
+    def get(self, request, *args, **kwargs):
+        self.form = BookSearchForm(request.GET)
+        # 13桁の ISBN は一意索引で完全一致を引き、見つかれば詳細画面へ直接移動する
+        if self.form.is_valid() and len(self.form.cleaned_data["isbn"]) == 13:
+            book = Book.objects.filter(isbn=self.form.cleaned_data["isbn"]).first()
+            if book:
+                return redirect(
+                    f"{reverse('library:book_detail', args=[book.pk])}"
+                    f"?{request.GET.urlencode()}"
+                )
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        self.form = BookSearchForm(self.request.GET)
 
         # 初期表示（クエリなし）は空クエリセットを返す
         if not self.request.GET:
             return queryset.none()
 
-        if self.form.is_valid():
-            title = self.form.cleaned_data.get("title")
-            author = self.form.cleaned_data.get("author")
-            publisher = self.form.cleaned_data.get("publisher")
-            isbn = self.form.cleaned_data.get("isbn")
+        criteria = {}
+        sort = BookSearchForm.Sort.RELEVANCE
+        # 結果のキャッシュのキーにする、正規化した検索条件（フォームが不正なら None）
+        self.cache_query = None
+        self.cache_version = None
+        if not self.form.is_valid():
+            # 条件を解釈できない検索で全件を返さないよう、結果は0件にする
+            # （エラーはフォームに表示する）
+            queryset = queryset.none()
+        else:
+            # タイトル・著者名・出版社は検索用の索引で絞り込む
+            criteria = {
+                field: self.form.cleaned_data[field]
+                for field in SEARCH_FIELDS
+                if self.form.cleaned_data.get(field)
+            }
+            if criteria:
+                queryset = get_search_backend().search(queryset, criteria)
 
-            if title:
-                queryset = queryset.filter(title__icontains=title)
-            if author:
-                queryset = queryset.filter(author__icontains=author)
-            if publisher:
-                queryset = queryset.filter(publisher__icontains=publisher)
+            isbn = self.form.cleaned_data.get("isbn")
             if isbn:
-                queryset = queryset.filter(isbn__icontains=isbn)
-
-        # 各本に貸出可能なコピーの数を追加
-        queryset = queryset.annotate(
-            available_count=Count(
-                "copies", filter=Q(copies__status=Copy.Status.AVAILABLE)
-            ),
-            loaned_count=Count("copies", filter=Q(copies__status=Copy.Status.LOANED)),
+                # 前方一致は ISBN の一意索引で引ける範囲の条件にする
+                queryset = queryset.filter(isbn__gte=isbn)
+                upper_bound = isbn_prefix_upper_bound(isbn)
+                if upper_bound is not None:
+                    queryset = queryset.filter(isbn__lt=upper_bound)
+
+            # 貸出可能な書籍の部分索引（catalog_book_available_now_idx）で絞り込む
+            if self.form.cleaned_data.get("available_only"):
+                queryset = queryset.filter(available_copies__gt=0)
+            sort = self.form.cleaned_data.get("sort") or sort
+
+            queryset = self.filter_by_facets(queryset, self.form.cleaned_data)
+
+            self.cache_query = {
+                **{
+                    field: normalize_search_text(value)
+                    for field, value in criteria.items()
+                },
+                "isbn": isbn,
+                "available_only": self.form.cleaned_data.get("available_only"),
+                "sort": sort,
+                **{
+                    param: self.form.cleaned_data.get(param)
+                    for _, param in self.facet_params.values()
+                },
+            }
+
+        if self.cache_query and self.result_cache.enabled:
+            # 検索の実行前に一度だけ読み、結果の参照・保存の両方に使う
+            # （検索中に変更されても、変更前の結果を新しい番号で保存しないため）
+            self.cache_version = self.result_cache.version()
+
+        # キーワード検索では関連度の高い順に並べる（並べ替えはページ分割時に行う）
+        self.ordering = ("-search_rank", "pk") if criteria else ("pk",)
+        self.ordering = self.sort_orderings.get(sort, self.ordering)
+        self.criteria = criteria
+        self.search_queryset = queryset
+        return queryset
+
+    def filter_by_facets(self, queryset, cleaned_data):
+        """
+        ファセットで選んだ出版社・出版年代・保存場所で絞り込む。
+        条件は compute_facets の集計と揃える。
+        """
+        if cleaned_data.get("exact_publisher"):
+            queryset = queryset.filter(publisher=cleaned_data["exact_publisher"])
+        if cleaned_data.get("decade") is not None:
+            decade = cleaned_data["decade"]
+            queryset = queryset.filter(
+                published_date__year__gte=decade,
+                published_date__year__lt=decade + 10,
+            ).exclude(published_date_precision=Book.PublishedDatePrecision.UNKNOWN)
+        if cleaned_data.get("location") is not None:
+            queryset = queryset.filter(
+                pk__in=Copy.objects.filter(
+                    location_id=cleaned_data["location"],
+                    status__in=[Copy.Status.AVAILABLE, Copy.Status.LOANED],
+                ).values("book_id")
+            )
+        return queryset
+
+    def get_facets(self):
+        """
+        検索結果のファセットを、項目ごとの絞り込み・解除のリンクとともに返す。
+        集計結果は検索条件ごとにキャッシュする。
+        """
+        query = self.cache_query and {**self.cache_query, "facets": True}
+        facets = self.result_cache.get(query, self.cache_version) if query else None
+        if facets is None:
+            facets = compute_facets(self.search_queryset)
+            if query:
+                self.result_cache.set(query, facets, self.cache_version)
+
+        results = []
+        for name, items in facets.items():
+            title, param = self.facet_params[name]
+            current = self.request.GET.get(param)
+            results.append(
+                {
+                    "title": title,
+                    "items": [
+                        {
+                            "label": f"{label}年代" if name == "decade" else label,
+                            "count": count,
+                            "active": key == current,
+                            "url": self.facet_url(param, key),
+                        }
+                        for key, label, count in items
+                    ],
+                    "clear_url": self.facet_url(param, None) if current else None,
+                }
+            )
+        return results
+
+    def facet_url(self, param, value):
+        query = self.request.GET.copy()
+        query.pop(self.cursor_kwarg, None)
+        query.pop(param, None)
+        if value is not None:
+            query[param] = value
+        return f"?{query.urlencode()}"
+
+    def paginate_queryset(self, queryset, page_size):
+        # 初期表示は検索しない
+        if not self.request.GET:
+            return None, None, queryset, False
+
+        # COUNT(*) と OFFSET の代わりに、並べ替えのキーの値でページを分割する
+        count_limit = settings.LIBRARY_SEARCH_COUNT_LIMIT or None
+        paginator = KeysetPaginator(
+            queryset,
+            page_size,
+            self.ordering,
+            nullable=self.nullable_sort_keys,
+            count_limit=count_limit,
+        )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        query = self.cache_query and {
+            **self.cache_query,
+            "cursor": cursor,
+            "per_page": page_size,
+        }
+        cached = self.result_cache.get(query, self.cache_version) if query else None
+        if cached:
+            page = self.page_from_cache(cached)
+        else:
+            try:
+                page = paginator.page(cursor)
+            except InvalidCursor:
+                raise Http404("ページの指定が正しくありません。")
+            if query:
+                self.result_cache.set(
+                    query, self.page_to_cache(page), self.cache_version
+                )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def page_to_cache(self, page):
+        return {
+            "pks": [book.pk for book in page.object_list],
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+            "count": page.count,
+            "count_capped": page.count_capped,
+        }
+
+    def page_from_cache(self, cached):
+        # 検索・並べ替えはせず、pk で書籍を読むだけにする
+        books = Book.objects.in_bulk(cached["pks"])
+        return KeysetPage(
+            [books[pk] for pk in cached["pks"] if pk in books],
+            cached["next"],
+            cached["previous"],
+            count=cached["count"],
+            count_capped=cached["count_capped"],
         )
-
-        return queryset.order_by("pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = self.form
+        # ページ送りのリンク用に、カーソル以外の検索条件を残したクエリ文字列
+        query = self.request.GET.copy()
+        query.pop(self.cursor_kwarg, None)
+        context["search_query"] = query.urlencode()
+        # 読みの変換器が使えない環境では、読みでの検索を案内しない
+        context["reading_search_available"] = get_reading_converter().available
+        if self.request.GET:
+            context["facets"] = self.get_facets()
+            # 見つからなかった場合は、綴りを直した検索条件を提案する
+            if not context["object_list"]:
+                context["did_you_mean"] = self.get_did_you_mean()
         return context
 
+    def get_did_you_mean(self):
+        """
+        タイトル・著者の検索語を辞書の語に直した検索条件と、そのリンクを返す。
+        直す語がなければ None。
+        """
+        corrections = {
+            field: corrected
+            for field, value in self.criteria.items()
+            if field in SPELLING_FIELDS
+            and (corrected := spelling_index.correct(value, field))
+        }
+        if not corrections:
+            return None
+        query = self.request.GET.copy()
+        query.pop(self.cursor_kwarg, None)
+        for field, corrected in corrections.items():
+            query[field] = corrected
+        return {"corrections": corrections, "url": f"?{query.urlencode()}"}
+
+
+class BookSuggestView(LoginRequiredMixin, IsGeneralMixin, View):
+    """
+    検索フォームの入力補完。q で始まるタイトル・著者の候補を JSON で返す。
+    field（title / author）を指定すると、そのフィールドの候補だけを返す。
+    """
+
+    def get(self, request, *args, **kwargs):
+        field = request.GET.get("field")
+        if field not in SUGGEST_FIELDS:
+            field = None
+        suggestions = suggestion_index.suggest(
+            request.GET.get("q", ""),
+            field=field,
+            limit=settings.LIBRARY_SUGGEST_LIMIT,
+        )
+        return JsonResponse({"suggestions": suggestions})
+
 
 class BookDetailView(LoginRequiredMixin, IsGeneralMixin, DetailView):
     model = Book
@@ -95,6 +95,11 @@ WSGI_APPLICATION = "django_project.wsgi.application"
 
 DATABASES = {"default": env.dj_db_url("DATABASE_URL", default="sqlite:///db.sqlite3")}
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {"default": env.dj_cache_url("CACHE_URL", default="locmem://")}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -135,6 +140,10 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# User-uploaded and generated files (book covers)
+MEDIA_URL = "media/"
+MEDIA_ROOT = env.path("MEDIA_ROOT", default=BASE_DIR / "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -151,3 +160,68 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 MAX_LOAN_COUNT = 10
 MAX_RESERVATION_COUNT = 7
 FORMS_URLFIELD_ASSUME_HTTPS = True
+
+# Google Books API
+GOOGLE_BOOKS_API_URL = env.str(
+    "GOOGLE_BOOKS_API_URL", default="https://www.googleapis.com/books/v1/volumes"
+)
+# openBD / 国立国会図書館サーチ（OpenSearch）
+OPENBD_API_URL = env.str("OPENBD_API_URL", default="https://api.openbd.jp/v1/get")
+NDL_OPENSEARCH_URL = env.str(
+    "NDL_OPENSEARCH_URL", default="https://ndlsearch.ndl.go.jp/api/opensearch"
+)
+# 書誌情報の取得元。並列に問い合わせ、先に揃った結果を採用する（先頭ほど優先）
+BOOK_METADATA_PROVIDERS = [
+    "apps.catalog.services.metadata_providers.GoogleBooksProvider",
+    "apps.catalog.services.metadata_providers.OpenBDProvider",
+    "apps.catalog.services.metadata_providers.NDLProvider",
+]
+# 書誌情報の取得を待つ上限（秒）と、取得に使うスレッド数
+BOOK_METADATA_LATENCY_BUDGET = env.float("BOOK_METADATA_LATENCY_BUDGET", default=2.0)
+BOOK_METADATA_FETCH_WORKERS = 16
+# ISBN 確認画面で未登録と分かった本の書誌情報を、先読みするスレッド数
+BOOK_METADATA_PREFETCH_WORKERS = 4
+# 書誌情報APIの接続・読み込みタイムアウト（秒）と再試行回数
+BOOK_METADATA_CONNECT_TIMEOUT = env.float("BOOK_METADATA_CONNECT_TIMEOUT", default=3.05)
+BOOK_METADATA_READ_TIMEOUT = env.float("BOOK_METADATA_READ_TIMEOUT", default=5.0)
+BOOK_METADATA_MAX_RETRIES = env.int("BOOK_METADATA_MAX_RETRIES", default=2)
+# 連続失敗がこの回数に達するとサーキットブレーカーを開き、指定秒数リクエストを遮断する
+BOOK_METADATA_CIRCUIT_FAILURE_THRESHOLD = 5
+BOOK_METADATA_CIRCUIT_RESET_TIMEOUT = 30
+
+# 書誌情報（Google Books API など）のキャッシュ保持期間（秒）
+BOOK_METADATA_CACHE_TIMEOUT = env.int(
+    "BOOK_METADATA_CACHE_TIMEOUT", default=60 * 60 * 24 * 7
+)
+# 「見つからなかった」結果のキャッシュ保持期間（秒）
+BOOK_METADATA_NEGATIVE_CACHE_TIMEOUT = env.int(
+    "BOOK_METADATA_NEGATIVE_CACHE_TIMEOUT", default=60 * 10
+)
+
+# 書籍のタイトル・著者の読みを求める変換器（ドット区切りのパス）。空の場合は
+# pykakasi がインストールされていれば使い、なければ読みを設定しない
+CATALOG_READING_CONVERTER = env.str("CATALOG_READING_CONVERTER", default="")
+
+# 書籍検索の実装（ドット区切りのパス）。空の場合はデータベースの種類に応じて選ぶ
+# （PostgreSQL: tsvector + GIN 索引, SQLite: FTS5, それ以外: 部分一致）
+LIBRARY_SEARCH_BACKEND = env.str("LIBRARY_SEARCH_BACKEND", default="")
+# 書籍検索の件数を数える上限。これを超える件数は「○件以上」と表示する（0 なら数えない）
+LIBRARY_SEARCH_COUNT_LIMIT = env.int("LIBRARY_SEARCH_COUNT_LIMIT", default=1000)
+# 書籍検索の結果をキャッシュする期間（秒）。0 ならキャッシュしない
+LIBRARY_SEARCH_CACHE_TIMEOUT = env.int("LIBRARY_SEARCH_CACHE_TIMEOUT", default=60 * 5)
+# 書籍検索フォームの入力補完で返す候補の数
+LIBRARY_SUGGEST_LIMIT = 10
+
+# 書影のプロキシ: 縮小版の名前と最大幅（px）、ブラウザにキャッシュさせる期間（秒）
+BOOK_COVER_SIZES = {"thumb": 128, "medium": 320}
+BOOK_COVER_CACHE_MAX_AGE = env.int(
+    "BOOK_COVER_CACHE_MAX_AGE", default=60 * 60 * 24 * 30
+)
+# 書影を取得してよい配信元のホスト（先頭が "." の項目はサブドメインにも一致）
+BOOK_COVER_ALLOWED_HOSTS = env.list(
+    "BOOK_COVER_ALLOWED_HOSTS",
+    default=["books.google.com", "books.googleusercontent.com", "cover.openbd.jp"],
+)
+# 取得する書影の上限（バイト数・画素数）
+BOOK_COVER_MAX_BYTES = env.int("BOOK_COVER_MAX_BYTES", default=5 * 1024 * 1024)
+BOOK_COVER_MAX_PIXELS = env.int("BOOK_COVER_MAX_PIXELS", default=4096 * 4096)
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_project.settings')
 
 application = get_wsgi_application()
+
+# 入力補完・綴りの修正候補の索引を、最初の問い合わせを待たずに作成しておく
+from apps.library.search.memory import warm_up  # noqa: E402
+from apps.library.signals import IN_MEMORY_INDEXES  # noqa: E402
+
+warm_up(IN_MEMORY_INDEXES)
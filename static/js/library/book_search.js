@@ -12,4 +12,64 @@ document.addEventListener('DOMContentLoaded', function () {
             noResults.scrollIntoView({ behavior: 'smooth' });
         }
     }
+
+    setUpSuggestions();
 });
+
+// タイトル・著者の入力欄に、入力補完の候補（datalist）を表示する
+function setUpSuggestions() {
+    const form = document.getElementById('book-search-form');
+    if (!form) {
+        return;
+    }
+    const suggestUrl = form.dataset.suggestUrl;
+    // 入力が止まってから問い合わせるまでの時間（ミリ秒）
+    const delay = 150;
+
+    ['title', 'author'].forEach(function (field) {
+        const input = form.querySelector(`[name="${field}"]`);
+        if (!input) {
+            return;
+        }
+        const datalist = document.createElement('datalist');
+        datalist.id = `${field}-suggestions`;
+        form.appendChild(datalist);
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+
+        let timer = null;
+        let controller = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            const q = input.value.trim();
+            if (!q) {
+                datalist.replaceChildren();
+                return;
+            }
+            timer = setTimeout(function () {
+                // 前の問い合わせの結果が後から届いて上書きしないよう、中断する
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                const params = new URLSearchParams({ q: q, field: field });
+                fetch(`${suggestUrl}?${params}`, { signal: controller.signal })
+                    .then(function (response) {
+                        return response.ok ? response.json() : { suggestions: [] };
+                    })
+                    .then(function (data) {
+                        datalist.replaceChildren(...data.suggestions.map(function (suggestion) {
+                            const option = document.createElement('option');
+                            option.value = suggestion.value;
+                            return option;
+                        }));
+                    })
+                    .catch(function (error) {
+                        if (error.name !== 'AbortError') {
+                            console.error(error);
+                        }
+                    });
+            }, delay);
+        });
+    });
+}